@@ -0,0 +1,66 @@
+import json
+import sys
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from benchmarks.runner import compare, metadata
+from benchmarks.suite import BENCHMARKS, BenchmarkSuite
+
+
+class Command(BaseCommand):
+    help = 'Runs the benchmark suite against a freshly seeded scratch database and writes the results as JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--only', nargs='+', choices=BENCHMARKS, default=BENCHMARKS)
+        parser.add_argument('--scale', type=float, default=1.0, help='Multiplier for every dataset size (default: 1).')
+        parser.add_argument('--iterations', type=int, default=50, help='Maximum timed calls per benchmark.')
+        parser.add_argument('--max-seconds', type=float, default=10.0, help='Time budget per benchmark.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help='File to write the JSON report to (default: stdout).')
+        parser.add_argument('--baseline', help='JSON report of an earlier run to compare the p50 latencies with.')
+        parser.add_argument(
+            '--threshold', type=float, default=20.0,
+            help='Fail when a benchmark is this many percent slower than the baseline (default: 20).',
+        )
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf-8') as file:
+                baseline = json.load(file)
+
+        # Like the test runner: a scratch database, so local data is never touched.
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            report = {'meta': metadata(), 'benchmarks': []}
+            suite = BenchmarkSuite(
+                scale=options['scale'],
+                iterations=options['iterations'],
+                max_seconds=options['max_seconds'],
+                seed=options['seed'],
+                log=lambda message: self.stderr.write(message),
+            )
+            report['meta'].update(scale=options['scale'], seed=options['seed'])
+            report['benchmarks'] = suite.run(options['only'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(output + '\n')
+        else:
+            sys.stdout.write(output + '\n')
+
+        if baseline:
+            changes, regressions = compare(report['benchmarks'], baseline, options['threshold'])
+            for result, before, change in changes:
+                self.stderr.write(f'{result["name"]} {result["params"]}: {before} -> {result["p50_ms"]} ms ({change:+}%)')
+            if regressions:
+                raise CommandError(f'{len(regressions)} benchmarks regressed by more than {options["threshold"]}%.')
+
+        if options['output']:
+            self.stdout.write(self.style.SUCCESS(f'Wrote the benchmark report to {options["output"]}.'))
@@ -0,0 +1,100 @@
+"""
+Timing, summarizing and comparing benchmark results.
+
+A result is a dict with the benchmark ``name``, its ``params`` and latency
+statistics in milliseconds; a report bundles the results with enough metadata
+(commit, versions, backends) to compare two runs.
+"""
+import platform
+import subprocess
+import time
+import django
+from django.conf import settings
+from django.db import connection
+
+MIN_SAMPLES = 3
+
+
+def _percentile(ordered, fraction):
+    # Nearest-rank percentile of an already sorted list.
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    total = sum(ordered)
+    return {
+        'iterations': len(ordered),
+        'mean_ms': round(total / len(ordered) * 1000, 3),
+        'p50_ms': round(_percentile(ordered, 0.5) * 1000, 3),
+        'p95_ms': round(_percentile(ordered, 0.95) * 1000, 3),
+        'p99_ms': round(_percentile(ordered, 0.99) * 1000, 3),
+        'min_ms': round(ordered[0] * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3),
+        'ops_per_second': round(len(ordered) / total, 2) if total else None,
+    }
+
+
+def measure(run, iterations, max_seconds, warmup=1, setup=None):
+    """
+    Time ``run()`` up to ``iterations`` times, stopping early once ``max_seconds``
+    have passed (but never before MIN_SAMPLES). ``setup()``, if given, runs
+    untimed before every call.
+    """
+    for _ in range(warmup):
+        if setup:
+            setup()
+        run()
+
+    samples = []
+    deadline = time.perf_counter() + max_seconds
+    for _ in range(iterations):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        run()
+        samples.append(time.perf_counter() - started)
+        if len(samples) >= MIN_SAMPLES and time.perf_counter() > deadline:
+            break
+    return summarize(samples)
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metadata():
+    return {
+        'commit': _commit(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': f'{connection.vendor} {connection.pg_version}' if connection.vendor == 'postgresql' else connection.vendor,
+        'cache': settings.CACHES['default']['BACKEND'],
+        'started_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+    }
+
+
+def _key(result):
+    return result['name'], tuple(sorted(result['params'].items()))
+
+
+def compare(results, baseline, threshold):
+    """
+    Compare the p50 latency of ``results`` with the matching results of a
+    baseline report. Returns ``(changes, regressions)``, where each change is
+    ``(result, baseline p50, percent change)`` and regressions are the changes
+    slower by more than ``threshold`` percent.
+    """
+    before = {_key(result): result for result in baseline['benchmarks']}
+    changes = []
+    for result in results:
+        previous = before.get(_key(result))
+        if previous and previous['p50_ms']:
+            change = (result['p50_ms'] - previous['p50_ms']) / previous['p50_ms'] * 100
+            changes.append((result, previous['p50_ms'], round(change, 1)))
+    return changes, [change for change in changes if change[2] > threshold]
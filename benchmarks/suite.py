@@ -0,0 +1,151 @@
+"""
+End-to-end benchmarks of the hot paths, run against a seeded database.
+
+Geocoding is replaced by a deterministic stub and Celery tasks are not
+published, so the numbers only cover this code and its queries. Restaurant
+counts grow in stages (100, 10k and 100k at scale 1), and the restaurant-bound
+benchmarks run at every stage.
+"""
+import hashlib
+import itertools
+import random
+from datetime import datetime, timezone as dt_timezone
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+from menu.cache import invalidate_menu
+from menu.models import FoodComment, FoodRating
+from order.seeding import SEED_EMAIL_DOMAIN, SEED_PASSWORD, DatasetSeeder
+from order.tasks import engage_restaurant_and_courier
+from order.utils import find_nearest_restaurant
+from restaurants.menus import invalidate_restaurant_menus
+from users.authentication import tokens_for_user
+from .runner import measure
+
+RESTAURANT_STAGES = [100, 10_000, 100_000]
+BENCHMARKS = ['login', 'food_list', 'find_nearest_restaurant', 'create_order']
+
+
+def _expect(response, status_code):
+    if response.status_code != status_code:
+        raise RuntimeError(f'Expected {status_code}, got {response.status_code}: {response.content[:500]!r}')
+
+
+class StubGeocoder:
+    """
+    Stands in for OpenCageGeocode: every address maps to its own point near central Belgrade.
+    """
+    def __init__(self, key=None):
+        pass
+
+    def geocode(self, address):
+        digest = hashlib.blake2b(address.encode(), digest_size=4).digest()
+        lat_offset, lng_offset = (byte / 255 - 0.5 for byte in digest[:2])
+        return [{'geometry': {'lat': 44.8125 + lat_offset * 0.1, 'lng': 20.4612 + lng_offset * 0.1}}]
+
+
+class BenchmarkSuite:
+    def __init__(self, scale=1.0, iterations=50, max_seconds=10.0, seed=0, log=None):
+        self.scale = scale
+        self.iterations = iterations
+        self.max_seconds = max_seconds
+        self.rng = random.Random(seed)
+        self.log = log or (lambda message: None)
+        self.results = []
+        now = datetime.now(dt_timezone.utc)
+        self.seeder = DatasetSeeder(
+            end=datetime(now.year, now.month, now.day, tzinfo=dt_timezone.utc), seed=seed, months=6, log=self.log
+        )
+
+    def authenticated_client(self):
+        client = APIClient()
+        user = get_user_model().objects.get(id=self.seeder.user_id(1))
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {tokens_for_user(user).access_token}')
+        return client
+
+    def size(self, count):
+        return max(1, int(count * self.scale))
+
+    def record(self, name, params, run, **options):
+        result = {'name': name, 'params': params, **measure(
+            run, self.iterations, self.max_seconds, **options
+        )}
+        self.log(f'{name} {params}: p50 {result["p50_ms"]} ms, p95 {result["p95_ms"]} ms')
+        self.results.append(result)
+
+    def run(self, names=BENCHMARKS):
+        self.seeder.seed_users(self.size(5000))
+        self.seeder.seed_foods(self.size(1000))
+        self.seeder.seed_ratings(self.size(200_000))
+        self.seeder.seed_comments(self.size(50_000))
+
+        with mock.patch('utils.coordinates.OpenCageGeocode', StubGeocoder), \
+                mock.patch.object(engage_restaurant_and_courier, 'delay'):
+            if 'login' in names:
+                self.bench_login()
+            if 'food_list' in names:
+                self.bench_food_list()
+            if not {'find_nearest_restaurant', 'create_order'} & set(names):
+                return self.results
+            for stage in sorted({self.size(count) for count in RESTAURANT_STAGES}):
+                self.seeder.seed_restaurants(stage - len(self.seeder.restaurants))
+                self.seeder.seed_menus(30)
+                invalidate_restaurant_menus()
+                if 'find_nearest_restaurant' in names:
+                    self.bench_find_nearest_restaurant(stage)
+                if 'create_order' in names:
+                    self.bench_create_order(stage)
+        return self.results
+
+    def bench_login(self):
+        client = APIClient()
+        users = itertools.count()
+
+        def login():
+            # A different user and address each time, so the rate limits never kick in.
+            index = next(users)
+            response = client.post(
+                reverse('login'),
+                {'email': f'user{index % self.seeder.users}@{SEED_EMAIL_DOMAIN}', 'password': SEED_PASSWORD},
+                REMOTE_ADDR=f'10.{index >> 16 & 255}.{index >> 8 & 255}.{index & 255}',
+            )
+            _expect(response, 200)
+
+        self.record('login', {}, login)
+
+    def bench_food_list(self):
+        client = self.authenticated_client()
+        url = reverse('food_list')
+
+        def food_list():
+            _expect(client.get(url), 200)
+
+        params = {'foods': len(self.seeder.foods), 'ratings': FoodRating.objects.count(), 'comments': FoodComment.objects.count()}
+        self.record('food_list', {**params, 'cache': 'cold'}, food_list, setup=invalidate_menu)
+        self.record('food_list', {**params, 'cache': 'warm'}, food_list)
+
+    def bench_find_nearest_restaurant(self, restaurants):
+        addresses = itertools.count()
+
+        def find_nearest():
+            restaurant, _ = find_nearest_restaurant(f'Knez Mihailova {next(addresses)}, Belgrade, Serbia')
+            if restaurant is None:
+                raise RuntimeError('No restaurant found.')
+
+        self.record('find_nearest_restaurant', {'restaurants': restaurants}, find_nearest)
+
+    def bench_create_order(self, restaurants):
+        client = self.authenticated_client()
+        url = reverse('create_order')
+        menus = list(self.seeder.menus.values())
+
+        def create_order():
+            menu = self.rng.choice(menus)
+            food_ids = self.rng.sample(menu, k=self.rng.randint(1, min(3, len(menu))))
+            response = client.post(
+                url, {'food_item_ids': food_ids, 'address': 'Skadarska 29, Belgrade, Serbia'}, format='json'
+            )
+            _expect(response, 201)
+
+        self.record('create_order', {'restaurants': restaurants}, create_order)
@@ -0,0 +1,51 @@
+from django.core.cache import cache
+from django.test import TestCase
+from .runner import compare, summarize
+from .suite import BENCHMARKS, BenchmarkSuite
+
+
+class BenchmarkRunnerTests(TestCase):
+    def test_summary_reports_latency_percentiles(self):
+        """
+        Ensure samples in seconds are summarized as millisecond percentiles and throughput.
+        """
+        summary = summarize([0.001 * n for n in range(1, 101)])
+
+        self.assertEqual(summary['iterations'], 100)
+        self.assertEqual((summary['p50_ms'], summary['p95_ms'], summary['max_ms']), (50.0, 95.0, 100.0))
+        self.assertAlmostEqual(summary['ops_per_second'], 19.8, places=1)
+
+    def test_comparison_flags_regressions_beyond_threshold(self):
+        """
+        Ensure only benchmarks slower than the baseline by more than the threshold are regressions.
+        """
+        baseline = {'benchmarks': [
+            {'name': 'login', 'params': {}, 'p50_ms': 100.0},
+            {'name': 'find_nearest_restaurant', 'params': {'restaurants': 100}, 'p50_ms': 10.0},
+        ]}
+        results = [
+            {'name': 'login', 'params': {}, 'p50_ms': 110.0},
+            {'name': 'find_nearest_restaurant', 'params': {'restaurants': 100}, 'p50_ms': 15.0},
+            {'name': 'find_nearest_restaurant', 'params': {'restaurants': 10000}, 'p50_ms': 900.0},
+        ]
+
+        changes, regressions = compare(results, baseline, threshold=20)
+
+        self.assertEqual([change for _, _, change in changes], [10.0, 50.0])
+        self.assertEqual([result['params'] for result, _, _ in regressions], [{'restaurants': 100}])
+
+
+class BenchmarkSuiteTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_suite_runs_every_benchmark_on_a_small_dataset(self):
+        """
+        Ensure the whole suite runs against a tiny seeded dataset and reports every stage.
+        """
+        results = BenchmarkSuite(scale=0.001, iterations=2, max_seconds=1).run()
+
+        self.assertEqual({result['name'] for result in results}, set(BENCHMARKS))
+        stages = [result['params']['restaurants'] for result in results if result['name'] == 'create_order']
+        self.assertEqual(stages, [1, 10, 100])
+        self.assertTrue(all(result['iterations'] >= 2 for result in results))
@@ -1,6 +1,9 @@
 from __future__ import absolute_import, unicode_literals
 import os
+import threading
+import time
 from celery import Celery
+from celery.signals import after_task_publish, before_task_publish
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fooddelivery.settings')
 
@@ -10,6 +13,28 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 
 app.autodiscover_tasks()
 
+_publishing = threading.local()
+
+
+@before_task_publish.connect
+def start_publish_timer(**kwargs):
+    _publishing.started = time.perf_counter()
+
+
+@after_task_publish.connect
+def record_publish_time(sender=None, **kwargs):
+    """
+    Observe how long publishing a task to the broker took (see utils.instrumentation).
+    """
+    from utils import metrics
+
+    started = getattr(_publishing, 'started', None)
+    if started is not None:
+        metrics.observe('celery.publish_seconds', time.perf_counter() - started, task=sender)
+        _publishing.started = None
+
+
 @app.task(bind=True)
 def debug_task(self):
     print(f'Request: {self.request!r}')
+
@@ -3,13 +3,15 @@ Django settings for fooddelivery project.
 """
 from pathlib import Path
 from datetime import timedelta
-from decouple import config
+from celery.schedules import crontab
+from decouple import Csv, config
+from django.core.exceptions import ImproperlyConfigured
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = config('SECRET_KEY')
 
-DEBUG = True
+DEBUG = config('DEBUG', default=True, cast=bool)
 
 ALLOWED_HOSTS = []
 
@@ -20,6 +22,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     # Third party packages
     'rest_framework',
@@ -32,9 +35,11 @@ INSTALLED_APPS = [
     'restaurants.apps.RestaurantsConfig',
     'menu.apps.MenuConfig',
     'order.apps.OrderConfig',
+    'benchmarks.apps.BenchmarksConfig',
 ]
 
 MIDDLEWARE = [
+    'utils.instrumentation.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -47,6 +52,9 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'fooddelivery.urls'
 
+# Addresses allowed to scrape /metrics (see utils.instrumentation)
+METRICS_ALLOWED_IPS = config('METRICS_ALLOWED_IPS', default='127.0.0.1,::1', cast=Csv())
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -75,6 +83,26 @@ DATABASES = {
         'PORT': config('DATABASE_PORT', default='5432'),
     },
 }
+
+# Shared cache (menu pages, counters). Without REDIS_URL every process gets its own memory cache,
+# which misses version bumps, OTPs and rate limits from other processes: development only.
+REDIS_URL = config('REDIS_URL', default=None)
+if not REDIS_URL and not DEBUG:
+    raise ImproperlyConfigured('REDIS_URL must be set when DEBUG is off.')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+    }
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -112,7 +140,7 @@ AUTH_USER_MODEL = 'users.CustomUser'
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.SessionAuthentication', 
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -126,6 +154,10 @@ AUTHENTICATION_BACKENDS = [
     'django.contrib.auth.backends.ModelBackend',  # fallback to default 
 ]
 
+# Authenticate API requests from the is_admin/email claims of the access token, without
+# loading the user (see users.authentication). Role changes then apply from the next login.
+JWT_TRUST_TOKEN_CLAIMS = config('JWT_TRUST_TOKEN_CLAIMS', default=False, cast=bool)
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
@@ -154,3 +186,17 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP = True
 
+CELERY_BEAT_SCHEDULE = {
+    'create-order-partitions': {
+        'task': 'order.tasks.create_order_partitions',
+        'schedule': crontab(hour=3, minute=0),
+    },
+    'purge-expired-tokens': {
+        'task': 'users.tasks.purge_expired_tokens',
+        'schedule': crontab(hour=4, minute=0),
+    },
+    'release-delivered-orders': {
+        'task': 'order.tasks.release_delivered_orders',
+        'schedule': crontab(minute=15),
+    },
+}
@@ -0,0 +1,288 @@
+import itertools
+from datetime import timedelta
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, get_resolver, reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from benchmarks.suite import StubGeocoder
+from menu.models import Food, FoodComment, FoodRating
+from order.heatmap import record_order_demand
+from order.models import Order
+from order.stats import record_order_created
+from order.tasks import engage_restaurant_and_courier
+from restaurants.models import Restaurant, RestaurantMenuItem
+from users.authentication import _local_users, tokens_for_user
+from users.otp import issue_otp
+from utils import geohash, metrics
+from utils.query_budget import get_query_budget
+
+CustomUser = get_user_model()
+
+SMALL, LARGE = 2, 8  # Rows per relation; both fit on one page, so LARGE serializes four times as much
+API_PREFIX = 'api/v1/'
+_sequence = itertools.count()
+
+
+def api_endpoints(patterns=None, prefix=''):
+    """
+    Yield ``(route, name, view class)`` for every named API URL.
+    """
+    for pattern in get_resolver().url_patterns if patterns is None else patterns:
+        route = prefix + str(pattern.pattern)
+        if isinstance(pattern, URLResolver):
+            yield from api_endpoints(pattern.url_patterns, route)
+        elif pattern.name and route.startswith(API_PREFIX):
+            yield route, pattern.name, pattern.callback.view_class
+
+
+def unique(value):
+    return f'{next(_sequence)}{value}'
+
+
+# URL name -> calls, each (method, role, request builder). A builder returns the
+# URL kwargs, request data and expected status for the current dataset.
+CALLS = {
+    'register': [('post', None, lambda t: ({}, {
+        'email': unique('@example.com'), 'first_name': 'New', 'last_name': 'User',
+        'address': 'Skadarska 29, Belgrade', 'password': 'password123',
+    }, 201))],
+    'register_admin': [('post', None, lambda t: ({}, {
+        'email': unique('@example.com'), 'first_name': 'New', 'last_name': 'Admin',
+        'address': 'Skadarska 29, Belgrade', 'password': 'password123', 'is_admin': True,
+    }, 201))],
+    'login': [('post', None, lambda t: ({}, {'email': t.user.email, 'password': 'password123'}, 200))],
+    'password_reset_request': [('post', None, lambda t: ({}, {'email': t.user.email}, 200))],
+    'password_reset_verify': [('post', None, lambda t: ({}, {
+        'email': t.user.email, 'otp': issue_otp(t.user), 'new_password': 'password123',
+    }, 200))],
+    'logout': [('post', 'user', lambda t: ({}, {'refresh_token': str(tokens_for_user(t.user))}, 205))],
+    'token_refresh': [('post', None, lambda t: ({}, {'refresh': str(tokens_for_user(t.user))}, 200))],
+
+    'restaurant_list_create': [
+        ('get', 'admin', lambda t: ({}, {}, 200)),
+        ('post', 'admin', lambda t: ({}, {'name': unique(' Grill'), 'address': 'Skadarska 32, Belgrade'}, 201)),
+    ],
+    'restaurant_detail': [
+        ('get', 'admin', lambda t: ({'pk': t.restaurants[0].pk}, {}, 200)),
+        ('patch', 'admin', lambda t: ({'pk': t.restaurants[0].pk}, {'name': unique(' Grill')}, 200)),
+        ('delete', 'admin', lambda t: ({'pk': t.make_restaurant().pk}, {}, 204)),
+    ],
+
+    'food_list': [('get', 'user', lambda t: ({}, {}, 200))],
+    'food_autocomplete': [('get', 'user', lambda t: ({}, {'q': 'dish'}, 200))],
+    'food_detail_for_users': [('get', 'user', lambda t: ({'pk': t.foods[0].pk}, {}, 200))],
+    'food_comments': [('get', 'user', lambda t: ({'pk': t.foods[0].pk}, {}, 200))],
+    'food_rate': [('post', 'user', lambda t: ({}, {'food': t.foods[0].pk, 'rating': 4}, 201))],
+    'food_rate_batch': [('post', 'user', lambda t: ({}, {
+        'ratings': [{'food': food.pk, 'rating': 5} for food in t.foods],
+    }, 201))],
+    'food_comment': [('post', 'user', lambda t: ({}, {'food': t.foods[0].pk, 'comment': 'Tasty.'}, 201))],
+    'food_create': [('post', 'admin', lambda t: ({}, {'name': unique(' dish'), 'price': '9.50'}, 201))],
+    'food_bulk_update': [('patch', 'admin', lambda t: ({}, {
+        'items': [{'id': food.pk, 'price': '11.00'} for food in t.foods],
+    }, 200))],
+    'food_cache_stats': [('get', 'admin', lambda t: ({}, {}, 200))],
+    'food_detail_admin': [
+        ('get', 'admin', lambda t: ({'pk': t.foods[0].pk}, {}, 200)),
+        ('patch', 'admin', lambda t: ({'pk': t.foods[0].pk}, {'price': '12.00'}, 200)),
+        ('delete', 'admin', lambda t: ({'pk': Food.objects.create(name='Spare dish', price=1).pk}, {}, 204)),
+    ],
+
+    'create_order': [('post', 'user', lambda t: ({}, {
+        'food_item_ids': [food.pk for food in t.foods[:2]], 'address': 'Skadarska 29, Belgrade',
+    }, 201))],
+    'order_detail': [('get', 'user', lambda t: ({'pk': t.orders[0].pk}, {}, 200))],
+    'list_orders': [('get', 'admin', lambda t: ({}, {}, 200))],
+    'export_orders': [('get', 'admin', lambda t: ({'export_format': 'csv'}, {}, 200))],
+    'order_stats': [('get', 'admin', lambda t: ({}, {}, 200))],
+    'demand_heatmap': [('get', 'admin', lambda t: ({}, {
+        'min_lat': 44, 'min_lng': 20, 'max_lat': 45, 'max_lng': 21,
+        'start': (timezone.now() - timedelta(days=1)).isoformat(), 'end': (timezone.now() + timedelta(hours=1)).isoformat(),
+    }, 200))],
+}
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class QueryBudgetTests(APITestCase):
+    """
+    Calls every API endpoint with cold caches at two dataset sizes and checks
+    the query count against the view's declared ``query_budget``.
+    """
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(email='user@example.com', password='password123')
+        self.admin = CustomUser.objects.create_user(email='admin@example.com', password='password123', is_admin=True)
+        self.foods, self.restaurants, self.orders, self.raters = [], [], [], []
+
+    def make_restaurant(self):
+        return Restaurant.objects.create(
+            name=unique(' Kafana'), address='Skadarska 29, Belgrade', latitude=44.8184, longitude=20.4660
+        )
+
+    def populate(self, size):
+        """
+        Grow every relation to ``size`` rows: foods, their ratings and comments,
+        restaurants serving every food, and the user's orders.
+        """
+        while len(self.raters) < size:
+            self.raters.append(CustomUser.objects.create_user(email=unique('@raters.example.com')))
+        while len(self.foods) < size:
+            self.foods.append(Food.objects.create(name=unique(' dish'), price=10))
+        for food in self.foods:
+            for rater in self.raters:
+                FoodRating.objects.get_or_create(food=food, user=rater, defaults={'rating': 4})
+            for _ in range(size - food.comments.count()):
+                FoodComment.objects.create(food=food, user=self.raters[0], comment='Good.')
+        while len(self.restaurants) < size:
+            self.restaurants.append(self.make_restaurant())
+        RestaurantMenuItem.objects.bulk_create(
+            [RestaurantMenuItem(restaurant=restaurant, food=food) for restaurant in self.restaurants for food in self.foods],
+            ignore_conflicts=True,
+        )
+        while len(self.orders) < size:
+            order = Order.objects.create(
+                user=self.user, restaurant=self.restaurants[0], total_price=20, distance=1.0,
+                delivery_latitude=44.81, delivery_longitude=20.46, geohash=geohash.encode(44.81, 20.46),
+                estimated_delivery_time=timezone.now() + timedelta(minutes=15),
+            )
+            order.food_items.set(self.foods[:2], through_defaults={'created_at': order.created_at})
+            record_order_created(order)
+            record_order_demand(order)
+            self.orders.append(order)
+
+    def call(self, name, method, role, build):
+        """
+        Make one request with cold caches; returns the response and the captured queries.
+        """
+        cache.clear()
+        _local_users.clear()
+        kwargs, data, expected = build(self)
+        self.client.credentials()
+        if role:
+            user = self.admin if role == 'admin' else self.user
+            self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {tokens_for_user(user).access_token}')
+
+        request = getattr(self.client, method)
+        with CaptureQueriesContext(connection) as context:
+            if method == 'get':
+                response = request(reverse(name, kwargs=kwargs), data)
+            else:
+                response = request(reverse(name, kwargs=kwargs), data, format='json')
+            if response.streaming:
+                b''.join(response.streaming_content)
+        self.assertEqual(
+            response.status_code, expected, f'{method.upper()} {name}: {getattr(response, "data", None)}'
+        )
+        return context.captured_queries
+
+    def test_every_api_endpoint_is_exercised_and_budgeted(self):
+        """
+        Ensure every API URL has a call in CALLS and every view declares a budget for it.
+        """
+        for route, name, view_class in api_endpoints():
+            with self.subTest(name=name):
+                self.assertIn(name, CALLS, f'{route} has no call in fooddelivery/tests.py')
+                for method, _, _ in CALLS[name]:
+                    self.assertIsNotNone(
+                        get_query_budget(view_class, method), f'{view_class.__name__} declares no query_budget'
+                    )
+
+    def test_query_counts_are_within_budget_and_do_not_grow_with_results(self):
+        """
+        Ensure no endpoint exceeds its budget or runs more queries on a larger dataset.
+        """
+        views = {name: view_class for _, name, view_class in api_endpoints()}
+        counts = {}
+        failures = []
+        with mock.patch('utils.coordinates.OpenCageGeocode', StubGeocoder), \
+                mock.patch.object(engage_restaurant_and_courier, 'delay'):
+            for size in (SMALL, LARGE):
+                self.populate(size)
+                for name, calls in CALLS.items():
+                    for method, role, build in calls:
+                        queries = self.call(name, method, role, build)
+                        budget = get_query_budget(views[name], method)
+                        key = f'{method.upper()} {name}'
+                        problem = None
+                        if budget is not None and len(queries) > budget:
+                            problem = f'{len(queries)} queries exceed the budget of {budget}'
+                        elif key in counts and len(queries) > counts[key]:
+                            problem = f'{len(queries)} queries at size {size}, {counts[key]} at size {SMALL}'
+                        counts[key] = len(queries)
+                        if problem:
+                            sql = '\n'.join(f'  {query["sql"]}' for query in queries)
+                            failures.append(f'{key} ({views[name].__name__}): {problem}\n{sql}')
+
+        if failures:
+            self.fail('\n\n'.join(failures))
+
+
+class RequestMetricsTests(APITestCase):
+    """
+    Per-request instrumentation: Server-Timing headers and the /metrics endpoint.
+    """
+    def setUp(self):
+        cache.clear()
+        metrics.reset()
+        self.user = CustomUser.objects.create_user(email='user@example.com', password='password123')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {tokens_for_user(self.user).access_token}')
+
+    def test_responses_carry_server_timing(self):
+        """
+        Ensure a response reports its database time, query count and total time.
+        """
+        response = self.client.get(reverse('food_list'))
+        self.assertEqual(response.status_code, 200)
+        timing = response['Server-Timing']
+        self.assertRegex(timing, r'^db;dur=[0-9.]+;desc="[1-9][0-9]* queries"')
+        self.assertRegex(timing, r'total;dur=[0-9.]+$')
+
+    def test_geocoder_time_is_reported(self):
+        """
+        Ensure geocoder calls made by a request are timed and show up in its header.
+        """
+        with mock.patch('utils.coordinates.OpenCageGeocode', StubGeocoder), \
+                mock.patch.object(engage_restaurant_and_courier, 'delay'):
+            food = Food.objects.create(name='Pljeskavica', price=10)
+            restaurant = Restaurant.objects.create(
+                name='Kafana', address='Skadarska 29, Belgrade', latitude=44.8184, longitude=20.4660
+            )
+            RestaurantMenuItem.objects.create(restaurant=restaurant, food=food)
+            metrics.reset()
+            response = self.client.post(
+                reverse('create_order'), {'food_item_ids': [food.pk], 'address': 'Skadarska 29, Belgrade'}, format='json'
+            )
+        self.assertEqual(response.status_code, 201)
+        self.assertIn('geocoder;dur=', response['Server-Timing'])
+        self.assertIn('fooddelivery_geocoder_seconds_count 1', self.client.get(reverse('metrics')).content.decode())
+
+    def test_metrics_are_exported_in_prometheus_format(self):
+        """
+        Ensure /metrics lists the per-endpoint histograms and the cache counters.
+        """
+        self.client.get(reverse('food_list'))
+        self.client.get(reverse('food_list'))
+
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        self.assertIn('# TYPE fooddelivery_http_request_seconds histogram', body)
+        self.assertIn('fooddelivery_http_request_seconds_count{endpoint="food_list",method="GET"} 2', body)
+        self.assertIn('fooddelivery_http_request_queries_bucket{endpoint="food_list",method="GET",le="+Inf"} 2', body)
+        self.assertIn('fooddelivery_http_request_db_seconds_sum{endpoint="food_list",method="GET"}', body)
+        self.assertIn('fooddelivery_menu_cache_hits_total 1', body)
+        self.assertIn('fooddelivery_menu_cache_misses_total 1', body)
+
+    def test_metrics_are_only_served_to_allowed_addresses(self):
+        """
+        Ensure /metrics refuses clients outside METRICS_ALLOWED_IPS.
+        """
+        self.assertEqual(self.client.get(reverse('metrics'), REMOTE_ADDR='203.0.113.7').status_code, 403)
+        with override_settings(METRICS_ALLOWED_IPS=['203.0.113.7']):
+            self.assertEqual(self.client.get(reverse('metrics'), REMOTE_ADDR='203.0.113.7').status_code, 200)
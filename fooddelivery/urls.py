@@ -1,9 +1,11 @@
 from django.contrib import admin
 from django.urls import path, include
+from utils.instrumentation import metrics_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api-auth/', include('rest_framework.urls')),
+    path('metrics', metrics_view, name='metrics'),
 
     path('api/v1/account/', include('users.urls')),
     path('api/v1/restaurants/', include('restaurants.urls')),
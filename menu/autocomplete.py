@@ -0,0 +1,182 @@
+"""
+In-memory prefix index for food name autocompletion.
+
+Each process keeps a sorted array of ``(search_name word suffix, food id)`` keys,
+so every word of a name can be completed with a binary search instead of an
+``ILIKE`` scan. The index is kept current by the save/delete signals of Food
+(see menu/signals.py) and rebuilt in the background once it is older than
+``MAX_AGE`` seconds, which also picks up changes made by other processes and by
+F() updates of rating aggregates. Until the first build has finished, lookups
+fall back to a prefix query on the ``text_pattern_ops`` index of search_name.
+"""
+import heapq
+import logging
+import threading
+import time
+from bisect import bisect_left, insort
+from django.db import connection
+from django.db.models import F
+from utils.text import normalize_search_text
+from .models import Food
+
+logger = logging.getLogger(__name__)
+
+MAX_AGE = 300
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 20
+
+_FIELDS = ('id', 'name', 'search_name', 'rating_count', 'avg_rating')
+
+
+def _word_suffixes(search_name):
+    """
+    Yield the name itself and every suffix of it that starts at a word boundary,
+    e.g. "sopska salata" -> "sopska salata", "salata".
+    """
+    yield search_name
+    for index, char in enumerate(search_name):
+        if char == ' ' and index + 1 < len(search_name) and search_name[index + 1] != ' ':
+            yield search_name[index + 1:]
+
+
+class FoodNameIndex:
+    def __init__(self, max_age=MAX_AGE):
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._keys = []
+        self._entries = {}
+        self._built_at = None
+        self._building = False
+
+    @property
+    def is_ready(self):
+        return self._built_at is not None
+
+    @property
+    def is_stale(self):
+        return self._built_at is None or time.monotonic() - self._built_at > self.max_age
+
+    def clear(self):
+        with self._lock:
+            self._keys = []
+            self._entries = {}
+            self._built_at = None
+
+    def rebuild(self):
+        """
+        Load every available food and swap the new arrays in at once.
+        """
+        entries = {}
+        keys = []
+        for food_id, name, search_name, rating_count, avg_rating in (
+            Food.objects.filter(is_available=True).values_list(*_FIELDS).iterator()
+        ):
+            entries[food_id] = self._make_entry(name, search_name, rating_count, avg_rating)
+            keys.extend((suffix, food_id) for suffix in _word_suffixes(search_name))
+        keys.sort()
+        with self._lock:
+            self._keys = keys
+            self._entries = entries
+            self._built_at = time.monotonic()
+
+    def build_async(self):
+        """
+        Rebuild the index on a background thread unless a build is already running.
+        """
+        with self._lock:
+            if self._building:
+                return
+            self._building = True
+        threading.Thread(target=self._build_in_background, daemon=True).start()
+
+    def _build_in_background(self):
+        try:
+            self.rebuild()
+        except Exception:
+            logger.exception('Failed to build the food autocomplete index')
+        finally:
+            self._building = False
+            connection.close()
+
+    def update(self, food):
+        """
+        Add, replace or (for unavailable food) drop a single food.
+        """
+        with self._lock:
+            if not self.is_ready:
+                return
+            self._discard(food.pk)
+            if food.is_available:
+                self._entries[food.pk] = self._make_entry(
+                    food.name, food.search_name, food.rating_count, food.avg_rating
+                )
+                for suffix in _word_suffixes(food.search_name):
+                    insort(self._keys, (suffix, food.pk))
+
+    def remove(self, food_id):
+        with self._lock:
+            if self.is_ready:
+                self._discard(food_id)
+
+    def _discard(self, food_id):
+        entry = self._entries.pop(food_id, None)
+        if entry is None:
+            return
+        for suffix in _word_suffixes(entry['search_name']):
+            position = bisect_left(self._keys, (suffix, food_id))
+            if position < len(self._keys) and self._keys[position] == (suffix, food_id):
+                del self._keys[position]
+
+    @staticmethod
+    def _make_entry(name, search_name, rating_count, avg_rating):
+        return {
+            'name': name,
+            'search_name': search_name,
+            'rank': (rating_count, avg_rating or 0.0),
+        }
+
+    def search(self, prefix, limit=DEFAULT_LIMIT):
+        """
+        Return up to ``limit`` ``{'id', 'name'}`` dicts whose name has a word starting
+        with the normalized ``prefix``, most rated first.
+        """
+        with self._lock:
+            matches = {}
+            position = bisect_left(self._keys, (prefix,))
+            while position < len(self._keys) and self._keys[position][0].startswith(prefix):
+                food_id = self._keys[position][1]
+                matches[food_id] = self._entries[food_id]
+                position += 1
+        best = heapq.nsmallest(
+            limit, matches.items(),
+            key=lambda item: (-item[1]['rank'][0], -item[1]['rank'][1], item[1]['search_name']),
+        )
+        return [{'id': food_id, 'name': entry['name']} for food_id, entry in best]
+
+
+food_name_index = FoodNameIndex()
+
+
+def search_database(prefix, limit=DEFAULT_LIMIT):
+    """
+    Cold-start fallback: match the start of the name only, through the
+    ``text_pattern_ops`` index on search_name.
+    """
+    queryset = Food.objects.filter(is_available=True, search_name__startswith=prefix).order_by(
+        '-rating_count', F('avg_rating').desc(nulls_last=True), 'search_name'
+    )
+    return [{'id': food_id, 'name': name} for food_id, name in queryset.values_list('id', 'name')[:limit]]
+
+
+def autocomplete(query, limit=DEFAULT_LIMIT):
+    """
+    Complete a (partial) food name typed by the user.
+    """
+    prefix = ' '.join(normalize_search_text(query).split())
+    if not prefix:
+        return []
+    if food_name_index.is_stale:
+        food_name_index.build_async()
+    if food_name_index.is_ready:
+        return food_name_index.search(prefix, limit)
+    return search_database(prefix, limit)
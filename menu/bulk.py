@@ -0,0 +1,105 @@
+"""
+Bulk menu import and export (CSV and JSONL), keyed by the food's SKU.
+
+Imports are parsed and validated row by row and upserted in chunks with a single
+INSERT ... ON CONFLICT (sku) DO UPDATE per chunk; exports stream the menu through
+a server-side cursor. Neither holds the whole menu in memory.
+"""
+import csv
+import json
+from django.core.serializers.json import DjangoJSONEncoder
+from .cache import invalidate_menu
+from .models import Food
+from .serializers import FoodImportRowSerializer
+
+MENU_FIELDS = ['sku', 'name', 'description', 'price', 'is_available']
+UPSERT_FIELDS = ['name', 'description', 'price', 'is_available', 'search_name', 'search_description', 'updated_at']
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def read_csv(lines):
+    for row in csv.DictReader(lines):
+        yield {field: value for field, value in row.items() if field in MENU_FIELDS and value != ''}
+
+
+def read_jsonl(lines):
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            yield line  # Rejected by validation like any other malformed row
+
+
+def iter_valid_rows(rows, errors):
+    """
+    Yield the validated data of each row, appending ``(row number, errors)`` to
+    ``errors`` for the rows that fail validation.
+    """
+    for number, row in enumerate(rows, start=1):
+        serializer = FoodImportRowSerializer(data=row)
+        if serializer.is_valid():
+            yield serializer.validated_data
+        else:
+            errors.append((number, serializer.errors))
+
+
+def _upsert_chunk(rows):
+    # ON CONFLICT cannot touch the same row twice in one statement; the last row for a SKU wins.
+    foods = {}
+    for row in rows:
+        food = Food(**row)
+        food.refresh_search_fields()  # bulk_create bypasses save()
+        foods[food.sku] = food
+    Food.objects.bulk_create(
+        foods.values(), update_conflicts=True, unique_fields=['sku'], update_fields=UPSERT_FIELDS
+    )
+    return len(foods)
+
+
+def import_menu(rows, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Validate and upsert the given row dicts. Returns ``(imported, errors)``.
+    """
+    errors = []
+    imported = 0
+    chunk = []
+    for row in iter_valid_rows(rows, errors):
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            imported += _upsert_chunk(chunk)
+            chunk = []
+    if chunk:
+        imported += _upsert_chunk(chunk)
+    if imported:
+        invalidate_menu()
+    return imported, errors
+
+
+def iter_menu_records(chunk_size=DEFAULT_CHUNK_SIZE):
+    for record in Food.objects.order_by('id').values(*MENU_FIELDS).iterator(chunk_size=chunk_size):
+        yield record
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def iter_csv(records):
+    writer = csv.DictWriter(_Echo(), fieldnames=MENU_FIELDS)
+    yield writer.writeheader()
+    for record in records:
+        yield writer.writerow(record)
+
+
+def iter_jsonl(records):
+    for record in records:
+        yield json.dumps(record, cls=DjangoJSONEncoder) + '\n'
+
+
+MENU_FORMATS = {
+    'csv': (read_csv, iter_csv),
+    'jsonl': (read_jsonl, iter_jsonl),
+}
@@ -0,0 +1,104 @@
+"""
+Versioned cache of rendered menu payloads.
+
+Every cache key embeds a global menu version, which is bumped whenever a food,
+rating or comment changes (see menu/signals.py). Invalidating the whole menu is
+therefore a single counter increment; entries of older versions are never read
+again and simply expire.
+
+Entries are refreshed shortly before they expire by a single request holding a
+short-lived lock, while the others keep serving the stored payload, and on a
+miss only the lock holder renders the payload, so a version bump does not make
+every concurrent request hit the database at once.
+"""
+import hashlib
+import time
+from django.core.cache import cache
+from utils import metrics
+from utils.versioning import bump_version, bump_version_on_change, get_version
+
+VERSION_KEY = 'menu:version'
+PAGE_TIMEOUT = 300
+EARLY_REFRESH = 30
+LOCK_TIMEOUT = 10
+LOCK_WAIT = 2.0
+LOCK_POLL_INTERVAL = 0.05
+
+
+def get_menu_version():
+    return get_version(VERSION_KEY)
+
+
+def bump_menu_version():
+    """
+    Invalidate every cached menu payload.
+    """
+    return bump_version(VERSION_KEY)
+
+
+def invalidate_menu():
+    """
+    Invalidate every cached menu payload, now and once the current transaction commits.
+    """
+    bump_version_on_change(VERSION_KEY)
+
+
+def page_key(namespace, request):
+    """
+    Build the cache key of a menu payload from the full request URI (pagination
+    links in the payload are absolute) and the current menu version.
+    """
+    digest = hashlib.md5(request.build_absolute_uri().encode(), usedforsecurity=False).hexdigest()
+    return f'menu:{namespace}:{get_menu_version()}:{digest}'
+
+
+def _store(key, payload, timeout):
+    cache.set(key, (payload, time.time() + timeout - EARLY_REFRESH), timeout)
+
+
+def get_or_render(key, render, timeout=PAGE_TIMEOUT):
+    """
+    Return the payload cached under ``key``, calling ``render()`` to build it
+    when it is missing or due for an early refresh.
+    """
+    lock_key = f'{key}:lock'
+    entry = cache.get(key)
+    if entry is not None:
+        payload, refresh_at = entry
+        if time.time() < refresh_at or not cache.add(lock_key, 1, LOCK_TIMEOUT):
+            metrics.increment('menu_cache.hits')
+            return payload
+        metrics.increment('menu_cache.refreshes')
+    else:
+        metrics.increment('menu_cache.misses')
+        if not cache.add(lock_key, 1, LOCK_TIMEOUT):
+            # Another request is rendering this payload; wait for it briefly.
+            deadline = time.monotonic() + LOCK_WAIT
+            while time.monotonic() < deadline:
+                time.sleep(LOCK_POLL_INTERVAL)
+                entry = cache.get(key)
+                if entry is not None:
+                    metrics.increment('menu_cache.lock_waits')
+                    return entry[0]
+            return render()
+
+    try:
+        payload = render()
+        _store(key, payload, timeout)
+        return payload
+    finally:
+        cache.delete(lock_key)
+
+
+def get_stats():
+    counters = metrics.get_counters('menu_cache.')
+    hits = counters.get('menu_cache.hits', 0) + counters.get('menu_cache.lock_waits', 0)
+    lookups = hits + counters.get('menu_cache.misses', 0) + counters.get('menu_cache.refreshes', 0)
+    return {
+        'version': get_menu_version(),
+        'hits': counters.get('menu_cache.hits', 0),
+        'misses': counters.get('menu_cache.misses', 0),
+        'refreshes': counters.get('menu_cache.refreshes', 0),
+        'lock_waits': counters.get('menu_cache.lock_waits', 0),
+        'hit_rate': round(hits / lookups, 4) if lookups else None,
+    }
@@ -0,0 +1,88 @@
+import re
+from decimal import Decimal, InvalidOperation
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F
+from rest_framework import filters
+from rest_framework.exceptions import ValidationError
+from utils.text import normalize_search_text
+
+
+class FoodAttributeFilter(filters.BaseFilterBackend):
+    """
+    Structured filters on indexed food columns, e.g.
+    ?is_available=true&min_price=5&max_price=12.50.
+    """
+    def parse_price(self, request, param):
+        value = request.query_params.get(param)
+        if value is None:
+            return None
+        try:
+            return Decimal(value)
+        except InvalidOperation:
+            raise ValidationError({param: 'A valid number is required.'})
+
+    def filter_queryset(self, request, queryset, view):
+        is_available = request.query_params.get('is_available')
+        if is_available is not None:
+            queryset = queryset.filter(is_available=is_available.lower() in ('1', 'true', 'yes'))
+
+        min_price = self.parse_price(request, 'min_price')
+        if min_price is not None:
+            queryset = queryset.filter(price__gte=min_price)
+        max_price = self.parse_price(request, 'max_price')
+        if max_price is not None:
+            queryset = queryset.filter(price__lte=max_price)
+        return queryset
+
+
+class FoodSearchFilter(filters.BaseFilterBackend):
+    """
+    Full-text search over food names and descriptions, e.g. ?search=cevap.
+
+    Matches the stored, accent-folded search vector (GIN indexed), so "cevapi"
+    finds "Ćevapi". Every term is matched as a prefix and results are ranked
+    with name matches above description matches.
+    """
+    search_param = 'search'
+
+    def get_search_query(self, request):
+        terms = re.findall(r'\w+', normalize_search_text(request.query_params.get(self.search_param, '')))
+        if not terms:
+            return None
+        return SearchQuery(' & '.join(f'{term}:*' for term in terms), config='simple', search_type='raw')
+
+    def filter_queryset(self, request, queryset, view):
+        query = self.get_search_query(request)
+        if query is None:
+            return queryset
+        return queryset.filter(search_vector=query).annotate(
+            search_rank=SearchRank(F('search_vector'), query)
+        ).order_by('-search_rank', 'id')
+
+
+class FoodOrderingFilter(filters.OrderingFilter):
+    """
+    Ordering filter for the menu, e.g. ?ordering=-average_rating or ?ordering=price.
+
+    Sorting by average rating uses the stored avg_rating column, with unrated food
+    treated as the lowest rated so that both directions can be read off the
+    (is_available, avg_rating DESC NULLS LAST) index. Ties are broken by id to keep
+    pagination stable.
+    """
+    def get_ordering_expression(self, term):
+        if term == 'average_rating':
+            return F('avg_rating').asc(nulls_first=True)
+        if term == '-average_rating':
+            return F('avg_rating').desc(nulls_last=True)
+        return term
+
+    def filter_queryset(self, request, queryset, view):
+        ordering = self.get_ordering(request, queryset, view)
+
+        if ordering:
+            expressions = [self.get_ordering_expression(term) for term in ordering]
+            if 'id' not in ordering and '-id' not in ordering:
+                expressions.append('id')
+            return queryset.order_by(*expressions)
+
+        return queryset
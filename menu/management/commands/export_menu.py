@@ -0,0 +1,27 @@
+import sys
+from django.core.management.base import BaseCommand
+from menu.bulk import DEFAULT_CHUNK_SIZE, MENU_FORMATS, iter_menu_records
+
+
+class Command(BaseCommand):
+    help = 'Streams the menu as CSV or JSONL to stdout or a file, in the import_menu format'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=sorted(MENU_FORMATS), default='csv', dest='export_format')
+        parser.add_argument('--output', help='File to write to (default: stdout).')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        _, encode = MENU_FORMATS[options['export_format']]
+        records = iter_menu_records(chunk_size=options['chunk_size'])
+
+        target = open(options['output'], 'w', newline='', encoding='utf-8') if options['output'] else sys.stdout
+        try:
+            for line in encode(records):
+                target.write(line)
+        finally:
+            if options['output']:
+                target.close()
+
+        if options['output']:
+            self.stdout.write(self.style.SUCCESS(f'Exported the menu to {options["output"]}.'))
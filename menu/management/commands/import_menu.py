@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+from menu.bulk import DEFAULT_CHUNK_SIZE, MENU_FORMATS, import_menu
+
+
+class Command(BaseCommand):
+    help = 'Upserts food items by SKU from a CSV or JSONL file, validating every row'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV (with a header row) or JSONL file to import.')
+        parser.add_argument('--format', choices=sorted(MENU_FORMATS), dest='import_format',
+                            help='File format (default: from the file extension).')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        import_format = options['import_format'] or options['path'].rsplit('.', 1)[-1].lower()
+        if import_format not in MENU_FORMATS:
+            raise CommandError(f'Unknown format "{import_format}", use --format {"/".join(sorted(MENU_FORMATS))}.')
+
+        read, _ = MENU_FORMATS[import_format]
+        with open(options['path'], newline='', encoding='utf-8') as source:
+            imported, errors = import_menu(read(source), chunk_size=options['chunk_size'])
+
+        for number, row_errors in errors:
+            self.stderr.write(f'Row {number}: {row_errors}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {imported} food items ({len(errors)} invalid rows skipped).'
+        ))
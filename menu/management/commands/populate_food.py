@@ -1,9 +1,11 @@
 import random
 from django.core.management.base import BaseCommand
 from menu.models import Food
+from restaurants.menus import invalidate_restaurant_menus
+from restaurants.models import Restaurant, RestaurantMenuItem
 
 class Command(BaseCommand):
-    help = 'Generates 25 random Serbian dishes and populates the Food model'
+    help = 'Generates 25 random Serbian dishes, populates the Food model and adds them to restaurant menus'
 
     def handle(self, *args, **kwargs):
         # List of random Serbian dishes and descriptions
@@ -35,12 +37,22 @@ class Command(BaseCommand):
             {"name": "Vanilice", "description": "Serbian sandwich cookies filled with jam and rolled in powdered sugar."}
         ]
 
+        foods = []
         for dish in dishes:
-            Food.objects.create(
+            foods.append(Food.objects.create(
                 name=dish["name"],
                 description=dish["description"],
                 price=round(random.uniform(5.0, 20.0), 2),  
                 is_available=random.choice([True, False])  
-            )
+            ))
+
+        # Each restaurant serves a random selection of the dishes
+        menu_items = [
+            RestaurantMenuItem(restaurant=restaurant, food=food)
+            for restaurant in Restaurant.objects.all()
+            for food in random.sample(foods, k=random.randint(len(foods) // 2, len(foods)))
+        ]
+        RestaurantMenuItem.objects.bulk_create(menu_items, ignore_conflicts=True)
+        invalidate_restaurant_menus()
 
         self.stdout.write(self.style.SUCCESS('Successfully populated the database with 25 Serbian dishes!'))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from menu.cache import bump_menu_version
+from menu.models import Food
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the comment count stored on each food from its comments'
+
+    def handle(self, *args, **options):
+        corrected = Food.recount_comments()
+        if corrected:
+            bump_menu_version()  # update() sends no signals
+        self.stdout.write(self.style.SUCCESS(f'Reconciled comment counts ({corrected} foods corrected).'))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from menu.ratings import reconcile_rating_aggregates
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the rating count, sum and histogram stored on each food from its ratings'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        corrected = reconcile_rating_aggregates(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Reconciled rating aggregates ({corrected} foods corrected).'))
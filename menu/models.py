@@ -1,9 +1,37 @@
-from django.db import models
+from collections import Counter
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.db import models, transaction
+from django.db.models.functions import Cast, Coalesce, Greatest, NullIf
+from django.utils import timezone
 from users.models import CustomUser
+from utils.text import normalize_search_text
+
+
+LATEST_COMMENTS = 3
+
+
+class FoodQuerySet(models.QuerySet):
+    def with_details(self):
+        """
+        Prefetch the latest comments of each food (into ``latest_comments``) together
+        with their authors, so serializing a page of foods costs a constant number
+        of queries and a bounded payload.
+        """
+        return self.prefetch_related(
+            models.Prefetch(
+                'comments',
+                queryset=FoodComment.objects.select_related('user').order_by('-created_at', '-id')[:LATEST_COMMENTS],
+                to_attr='latest_comments',
+            )
+        )
+
+
 class Food(models.Model):
     """
     Model representing a food item on the menu.
     """
+    sku = models.CharField(max_length=64, unique=True, blank=True, null=True)  # Key for bulk menu imports
     name = models.CharField(max_length=255)
     description = models.TextField(blank=True, null=True)
     price = models.DecimalField(max_digits=10, decimal_places=2)
@@ -11,16 +39,151 @@ class Food(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Rating aggregates, maintained by FoodRating.save()/delete() (see record_rating_change)
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_1_count = models.PositiveIntegerField(default=0)
+    rating_2_count = models.PositiveIntegerField(default=0)
+    rating_3_count = models.PositiveIntegerField(default=0)
+    rating_4_count = models.PositiveIntegerField(default=0)
+    rating_5_count = models.PositiveIntegerField(default=0)
+    avg_rating = models.FloatField(null=True, blank=True)
+
+    # Maintained by FoodComment.save()/delete() (see record_comment_change)
+    comment_count = models.PositiveIntegerField(default=0)
+
+    # Accent-folded copies of name and description (see refresh_search_fields)
+    # and the full-text search document built from them.
+    search_name = models.CharField(max_length=255, default='', editable=False)
+    search_description = models.TextField(default='', editable=False)
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector('search_name', weight='A', config='simple')
+            + SearchVector('search_description', weight='B', config='simple')
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    objects = FoodQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['is_available', 'price'], name='food_available_price_idx'),
+            models.Index(
+                models.F('is_available'), models.F('avg_rating').desc(nulls_last=True),
+                name='food_available_rating_idx',
+            ),
+            GinIndex(fields=['search_vector'], name='food_search_vector_idx'),
+            # LIKE 'prefix%' lookups for autocompletion, independent of the collation
+            models.Index(fields=['search_name'], name='food_search_name_prefix_idx', opclasses=['text_pattern_ops']),
+        ]
+
     def __str__(self):
         return self.name
 
+    def refresh_search_fields(self):
+        """
+        Recompute the accent-folded search columns from name and description.
+        Code that bypasses save() (e.g. bulk_create) must call this itself.
+        """
+        self.search_name = normalize_search_text(self.name)
+        self.search_description = normalize_search_text(self.description)
+
+    def save(self, *args, **kwargs):
+        self.refresh_search_fields()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'name', 'description'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'search_name', 'search_description'}
+        super().save(*args, **kwargs)
+
     def get_average_rating(self):
         """Return the average rating of the food item."""
-        ratings = self.ratings.all() 
-        if ratings.exists():
-            return round(ratings.aggregate(models.Avg('rating'))['rating__avg'], 1)
+        if self.rating_count:
+            return round(self.rating_sum / self.rating_count, 1)
         return None 
 
+    def get_rating_histogram(self):
+        """Return the number of ratings per star, from 1 to 5."""
+        return {stars: getattr(self, f'rating_{stars}_count') for stars in range(1, 6)}
+
+    @classmethod
+    def record_rating_change(cls, food_id, previous=None, current=None):
+        """
+        Apply a rating insert (previous=None), update or delete (current=None) to the
+        food's aggregates in a single UPDATE with F() expressions, recomputing the
+        stored avg_rating from the new sum and count. Also touches updated_at.
+        """
+        cls.record_rating_changes([food_id], previous, current)
+
+    @classmethod
+    def record_rating_changes(cls, food_ids, previous=None, current=None):
+        """
+        Like record_rating_change, for several foods whose rating changed the same way.
+        """
+        deltas = Counter()
+        if previous is not None:
+            deltas.subtract({'rating_count': 1, 'rating_sum': previous, f'rating_{previous}_count': 1})
+        if current is not None:
+            deltas.update({'rating_count': 1, 'rating_sum': current, f'rating_{current}_count': 1})
+        # Decrements stop at zero, so aggregates that were never backfilled (see
+        # reconcile_food_ratings) cannot break the positive-integer constraints.
+        updates = {
+            field: models.F(field) + delta if delta > 0 else Greatest(models.F(field) + delta, 0)
+            for field, delta in deltas.items() if delta
+        }
+        if 'rating_sum' in updates or 'rating_count' in updates:
+            updates['avg_rating'] = Cast(updates.get('rating_sum', models.F('rating_sum')), models.FloatField()) / NullIf(
+                updates.get('rating_count', models.F('rating_count')), 0
+            )
+        updates['updated_at'] = timezone.now()
+        cls.objects.filter(pk__in=food_ids).update(**updates)
+
+    @classmethod
+    def bulk_update_listing(cls, items):
+        """
+        Apply ``{'id', 'price'?, 'is_available'?}`` changes to many foods in a single
+        UPDATE, using CASE expressions for the per-row values. Returns the number of
+        foods updated.
+        """
+        updates = {}
+        for field, output_field in (('price', models.DecimalField()), ('is_available', models.BooleanField())):
+            whens = [models.When(pk=item['id'], then=models.Value(item[field])) for item in items if field in item]
+            if whens:
+                updates[field] = models.Case(*whens, default=models.F(field), output_field=output_field)
+        return cls.objects.filter(pk__in=[item['id'] for item in items]).update(**updates, updated_at=timezone.now())
+
+    @classmethod
+    def record_comment_change(cls, food_id, delta):
+        """
+        Adjust the food's comment count by ``delta`` and touch updated_at.
+        """
+        count = models.F('comment_count') + delta
+        cls.objects.filter(pk=food_id).update(
+            comment_count=count if delta > 0 else Greatest(count, 0), updated_at=timezone.now()
+        )
+
+    @classmethod
+    def recount_comments(cls):
+        """
+        Recompute every food's comment count from its FoodComment rows in a single
+        UPDATE. Returns the number of foods whose count changed.
+        """
+        actual = Coalesce(models.Subquery(
+            FoodComment.objects.filter(food=models.OuterRef('pk')).order_by().values('food')
+            .annotate(count=models.Count('id')).values('count')
+        ), 0)
+        return cls.objects.annotate(actual_count=actual).exclude(comment_count=models.F('actual_count')).update(
+            comment_count=actual
+        )
+
+    @classmethod
+    def touch(cls, food_id):
+        """
+        Bump updated_at so cached validators (ETag/Last-Modified) of the food change.
+        """
+        cls.objects.filter(pk=food_id).update(updated_at=timezone.now())
+
 
 class FoodRating(models.Model):
     """
@@ -37,6 +200,30 @@ class FoodRating(models.Model):
     def __str__(self):
         return f'{self.food.name} - {self.rating} stars'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored value so that saving can apply the delta to the food.
+        instance._stored_rating = instance.__dict__.get('rating')
+        return instance
+
+    def save(self, *args, **kwargs):
+        """
+        Save the rating and apply the change to the food's rating aggregates atomically.
+        """
+        previous = None if self._state.adding else getattr(self, '_stored_rating', None)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            Food.record_rating_change(self.food_id, previous, self.rating)
+        self._stored_rating = self.rating
+
+    def delete(self, *args, **kwargs):
+        food_id, previous = self.food_id, getattr(self, '_stored_rating', self.rating)
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            Food.record_rating_change(food_id, previous, None)
+        return result
+
 
 class FoodComment(models.Model):
     """
@@ -47,7 +234,33 @@ class FoodComment(models.Model):
     comment = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Keyset pagination of a food's comments, newest first
+            models.Index(fields=['food', '-created_at', '-id'], name='foodcomment_feed_idx'),
+        ]
+
     def __str__(self):
         return f'Comment by {self.user.email} on {self.food.name}'
+
+    def save(self, *args, **kwargs):
+        """
+        Comments are part of the food payload, so saving one counts it on the food
+        (or, for an edit, touches the food).
+        """
+        adding = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if adding:
+                Food.record_comment_change(self.food_id, 1)
+            else:
+                Food.touch(self.food_id)
+
+    def delete(self, *args, **kwargs):
+        food_id = self.food_id
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            Food.record_comment_change(food_id, -1)
+        return result
     
     
\ No newline at end of file
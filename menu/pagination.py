@@ -0,0 +1,13 @@
+from rest_framework.pagination import CursorPagination
+
+
+class FoodCommentPagination(CursorPagination):
+    """
+    Keyset pagination of a food's comments, newest first, along the
+    (food, created_at DESC, id DESC) index. Cursors stay stable while new
+    comments arrive, and deep pages cost as much as the first one.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = 'page_size'
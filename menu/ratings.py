@@ -0,0 +1,90 @@
+"""
+Rating writes and reconciliation of the denormalized rating aggregates stored on Food.
+"""
+from collections import defaultdict
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from .cache import bump_menu_version, invalidate_menu
+from .models import Food, FoodRating
+
+AGGREGATE_FIELDS = ['rating_count', 'rating_sum'] + [f'rating_{stars}_count' for stars in range(1, 6)] + ['avg_rating']
+
+
+def upsert_ratings(user, ratings):
+    """
+    Save ``user``'s ratings, given as ``{food_id: stars}``, with a single
+    INSERT ... ON CONFLICT (food, user) DO UPDATE and apply the changes to the
+    foods' aggregates. Returns the FoodRating instances, in the given order.
+    """
+    with transaction.atomic():
+        # Serialize the user's rating writes, so the previous values read below are
+        # the ones the upsert replaces even when the same rating is submitted twice.
+        list(get_user_model().objects.select_for_update().filter(pk=user.pk).values_list('pk'))
+        previous = dict(
+            FoodRating.objects.filter(user=user, food_id__in=list(ratings)).values_list('food_id', 'rating')
+        )
+        instances = [FoodRating(user=user, food_id=food_id, rating=stars) for food_id, stars in ratings.items()]
+        FoodRating.objects.bulk_create(
+            instances, update_conflicts=True, unique_fields=['food', 'user'], update_fields=['rating']
+        )
+        # One UPDATE per distinct (previous, new) pair rather than per food
+        changes = defaultdict(list)
+        for food_id, stars in ratings.items():
+            if previous.get(food_id) != stars:
+                changes[previous.get(food_id), stars].append(food_id)
+        for (before, stars), food_ids in changes.items():
+            Food.record_rating_changes(food_ids, before, stars)
+        invalidate_menu()  # bulk_create sends no signals
+    return instances
+
+
+def compute_rating_aggregates(food_ids):
+    """
+    Recompute the aggregates of the given foods from their FoodRating rows.
+    """
+    rows = (
+        FoodRating.objects.filter(food_id__in=food_ids)
+        .values('food_id')
+        .annotate(
+            rating_count=Count('id'),
+            rating_sum=Sum('rating'),
+            **{f'rating_{stars}_count': Count('id', filter=Q(rating=stars)) for stars in range(1, 6)},
+        )
+        .order_by()
+    )
+    empty = dict.fromkeys(AGGREGATE_FIELDS, 0)
+    empty['avg_rating'] = None
+    aggregates = {food_id: dict(empty) for food_id in food_ids}
+    for row in rows:
+        row['avg_rating'] = row['rating_sum'] / row['rating_count']
+        aggregates[row.pop('food_id')] = row
+    return aggregates
+
+
+def reconcile_rating_aggregates(batch_size=1000):
+    """
+    Compare every food's stored aggregates with its ratings, chunk by chunk, and
+    fix the ones that drifted. Returns the number of foods corrected.
+    """
+    corrected = 0
+    foods = Food.objects.only('id', *AGGREGATE_FIELDS).order_by('id')
+    last_id = 0
+    while True:
+        chunk = list(foods.filter(id__gt=last_id)[:batch_size])
+        if not chunk:
+            if corrected:
+                bump_menu_version()  # bulk_update sends no signals
+            return corrected
+        last_id = chunk[-1].id
+
+        aggregates = compute_rating_aggregates([food.id for food in chunk])
+        drifted = []
+        for food in chunk:
+            expected = aggregates[food.id]
+            if any(getattr(food, field) != expected[field] for field in AGGREGATE_FIELDS):
+                for field in AGGREGATE_FIELDS:
+                    setattr(food, field, expected[field])
+                drifted.append(food)
+        Food.objects.bulk_update(drifted, AGGREGATE_FIELDS)
+        corrected += len(drifted)
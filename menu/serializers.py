@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from .models import Food, FoodRating, FoodComment
+from .models import LATEST_COMMENTS, Food, FoodRating, FoodComment
+from .ratings import upsert_ratings
 from django.contrib.auth import get_user_model
 CustomUser = get_user_model()
 
@@ -9,26 +10,68 @@ class FoodSerializer(serializers.ModelSerializer):
     """
     class Meta:
         model = Food
-        fields = ['name', 'description', 'price', 'is_available', 'created_at', 'updated_at']
+        fields = ['sku', 'name', 'description', 'price', 'is_available', 'created_at', 'updated_at']
         read_only_fields = ['created_at', 'updated_at']
 
 
+class FoodImportRowSerializer(serializers.Serializer):
+    """
+    Validates one row of a menu import. A plain serializer, so that validating
+    thousands of rows does not run a uniqueness query per row.
+    """
+    sku = serializers.CharField(max_length=64)
+    name = serializers.CharField(max_length=255)
+    description = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0)
+    is_available = serializers.BooleanField(default=True)
+
+
+class FoodBulkUpdateItemSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0, required=False)
+    is_available = serializers.BooleanField(required=False)
+
+    def validate(self, attrs):
+        if 'price' not in attrs and 'is_available' not in attrs:
+            raise serializers.ValidationError('Provide a price and/or is_available.')
+        return attrs
+
+
+class FoodBulkUpdateSerializer(serializers.Serializer):
+    """
+    Serializer for updating the price and/or availability of many food items at once.
+    """
+    items = FoodBulkUpdateItemSerializer(many=True, allow_empty=False, max_length=5000)
+
+    def validate_items(self, items):
+        ids = [item['id'] for item in items]
+        if len(set(ids)) != len(ids):
+            raise serializers.ValidationError('Each food item can only be listed once.')
+        return items
+
+
 class FoodDetailSerializer(serializers.ModelSerializer):
     """
     Serializer for displaying detailed information about a specific food item.
     """
     average_rating = serializers.SerializerMethodField()
-    comments = serializers.SerializerMethodField()
+    latest_comments = serializers.SerializerMethodField()
 
     class Meta:
         model = Food
-        fields = ['id', 'name', 'description', 'price', 'is_available', 'average_rating', 'comments']
+        fields = [
+            'id', 'name', 'description', 'price', 'is_available', 'average_rating',
+            'comment_count', 'latest_comments',
+        ]
 
     def get_average_rating(self, obj):
         return obj.get_average_rating()
 
-    def get_comments(self, obj):
-        comments = obj.comments.all()
+    def get_latest_comments(self, obj):
+        # Prefetched with users by Food.objects.with_details(); the full feed is paginated separately.
+        comments = getattr(obj, 'latest_comments', None)
+        if comments is None:
+            comments = obj.comments.select_related('user').order_by('-created_at', '-id')[:LATEST_COMMENTS]
         return [{'user': comment.user.first_name, 'comment': comment.comment} for comment in comments]
     
 
@@ -47,18 +90,49 @@ class FoodRatingSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         user = self.context['request'].user
         food = validated_data['food']
-        rating_value = validated_data['rating']
 
-        # Check if the user has already rated this food
-        existing_rating = FoodRating.objects.filter(user=user, food=food).first()
+        # Insert or replace the user's rating in one statement
+        rating = upsert_ratings(user, {food.pk: validated_data['rating']})[0]
+        rating.food = food
+        return rating
+
 
-        if existing_rating:
-            # Update the existing rating
-            existing_rating.rating = rating_value
-            existing_rating.save()
-            return existing_rating
-        else:
-            return FoodRating.objects.create(user=user, food=food, rating=rating_value)
+class FoodRatingItemSerializer(serializers.Serializer):
+    food = serializers.IntegerField()
+    rating = serializers.IntegerField(min_value=1, max_value=5)
+
+
+class FoodRatingBatchSerializer(serializers.Serializer):
+    """
+    Serializer for rating several food items at once, e.g. every item of a
+    delivered order. When ``order`` is given, it must be the user's and contain
+    every rated food.
+    """
+    order = serializers.IntegerField(required=False)
+    ratings = FoodRatingItemSerializer(many=True, allow_empty=False, max_length=50)
+
+    def validate(self, attrs):
+        from order.models import Order, OrderItem
+
+        food_ids = [item['food'] for item in attrs['ratings']]
+        if len(set(food_ids)) != len(food_ids):
+            raise serializers.ValidationError({'ratings': 'Each food item can only be rated once.'})
+        missing = set(food_ids) - set(Food.objects.filter(pk__in=food_ids).values_list('pk', flat=True))
+        if missing:
+            raise serializers.ValidationError({'ratings': f'Unknown food items: {sorted(missing)}.'})
+
+        order_id = attrs.get('order')
+        if order_id is not None:
+            if not Order.objects.filter(pk=order_id, user=self.context['request'].user).exists():
+                raise serializers.ValidationError({'order': 'Order not found.'})
+            ordered = set(OrderItem.objects.filter(order_id=order_id).values_list('food_id', flat=True))
+            if not set(food_ids) <= ordered:
+                raise serializers.ValidationError({'ratings': 'Only items of the order can be rated.'})
+        return attrs
+
+    def create(self, validated_data):
+        ratings = {item['food']: item['rating'] for item in validated_data['ratings']}
+        return upsert_ratings(self.context['request'].user, ratings)
 
 
 class FoodCommentSerializer(serializers.ModelSerializer):
@@ -68,3 +142,14 @@ class FoodCommentSerializer(serializers.ModelSerializer):
         model = FoodComment
         fields = ['food', 'comment']
 
+
+class FoodCommentFeedSerializer(serializers.ModelSerializer):
+    """
+    Serializer for a food's paginated comment feed.
+    """
+    user = serializers.CharField(source='user.first_name')
+
+    class Meta:
+        model = FoodComment
+        fields = ['id', 'user', 'comment', 'created_at']
+
@@ -0,0 +1,24 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .autocomplete import food_name_index
+from .cache import invalidate_menu
+from .models import Food, FoodComment, FoodRating
+
+
+@receiver(post_save, sender=Food)
+def index_saved_food(sender, instance, **kwargs):
+    transaction.on_commit(lambda: food_name_index.update(instance))
+
+
+@receiver(post_delete, sender=Food)
+def unindex_deleted_food(sender, instance, **kwargs):
+    food_id = instance.pk  # Cleared on the instance once the delete completes
+    transaction.on_commit(lambda: food_name_index.remove(food_id))
+
+
+@receiver([post_save, post_delete], sender=Food)
+@receiver([post_save, post_delete], sender=FoodRating)
+@receiver([post_save, post_delete], sender=FoodComment)
+def invalidate_menu_cache(sender, **kwargs):
+    invalidate_menu()
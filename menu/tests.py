@@ -1,8 +1,20 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
 from rest_framework.test import APITestCase
+from django.core.management import call_command
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
 from django.contrib.auth import get_user_model
-from menu.models import Food
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from menu import cache as menu_cache
+from menu.autocomplete import FoodNameIndex, food_name_index
+from menu.models import Food, FoodComment, FoodRating
 
 CustomUser = get_user_model()
 
@@ -11,6 +23,7 @@ class MenuTestSetUp(APITestCase):
         """
         Set up admin and non-admin users, as well as food items for testing.
         """
+        cache.clear()
         # Create an admin user
         self.admin_user = CustomUser.objects.create_user(
             email='admin@example.com', password='adminpass', is_admin=True)
@@ -78,6 +91,497 @@ class UnauthenticatedUserTests(MenuTestSetUp):
         response = self.client.get(self.food_list_url)
 
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
-     
 
 
+class FoodConditionalGetTests(MenuTestSetUp):
+    def setUp(self):
+        super().setUp()
+        normal_login = self.client.post(reverse('login'), self.normal_login_data)
+        normal_token = normal_login.data['data']['access']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {normal_token}')
+
+    def test_food_detail_returns_304_when_unchanged(self):
+        """
+        Ensure a food detail request with a matching ETag is answered with 304.
+        """
+        response = self.client.get(self.food_detail_user_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+
+        response = self.client.get(self.food_detail_user_url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_food_detail_etag_changes_when_commented(self):
+        """
+        Ensure a new comment invalidates the food's ETag.
+        """
+        etag = self.client.get(self.food_detail_user_url)['ETag']
+        FoodComment.objects.create(food=self.food_item, user=self.normal_user, comment='Great!')
+
+        response = self.client.get(self.food_detail_user_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_food_list_returns_304_until_menu_changes(self):
+        """
+        Ensure the food list is revalidated with 304 and refreshed once a food is added.
+        """
+        etag = self.client.get(self.food_list_url)['ETag']
+
+        response = self.client.get(self.food_list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        Food.objects.create(**self.food_data)
+        response = self.client.get(self.food_list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class FoodListQueryCountTests(MenuTestSetUp):
+    def add_foods_with_feedback(self, count):
+        for i in range(count):
+            food = Food.objects.create(name=f"Sarma {i}", price=9.00)
+            for user in (self.admin_user, self.normal_user):
+                FoodRating.objects.create(food=food, user=user, rating=4)
+                FoodComment.objects.create(food=food, user=user, comment='Tasty.')
+
+    def count_list_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.food_list_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(context.captured_queries), response
+
+    def test_food_list_query_count_does_not_grow_with_page_size(self):
+        """
+        Ensure ratings and comments are loaded in bulk rather than per food item.
+        """
+        self.client.force_authenticate(self.normal_user)
+        self.add_foods_with_feedback(1)
+        small_page_queries, _ = self.count_list_queries()
+
+        self.add_foods_with_feedback(7)
+        large_page_queries, response = self.count_list_queries()
+
+        self.assertEqual(small_page_queries, large_page_queries)
+        food = response.data['results']['data'][-1]
+        self.assertEqual(food['average_rating'], 4.0)
+        self.assertEqual(food['comment_count'], 2)
+        self.assertEqual(len(food['latest_comments']), 2)
+
+
+class FoodRatingAggregateTests(MenuTestSetUp):
+    def rate(self, user, rating):
+        self.client.force_authenticate(user)
+        response = self.client.post(reverse('food_rate'), {'food': self.food_item.pk, 'rating': rating})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_rating_updates_aggregates_with_delta(self):
+        """
+        Ensure inserting and changing ratings keeps count, sum and histogram in step.
+        """
+        self.rate(self.normal_user, 5)
+        self.rate(self.admin_user, 2)
+        self.rate(self.normal_user, 3)
+
+        self.food_item.refresh_from_db()
+        self.assertEqual((self.food_item.rating_count, self.food_item.rating_sum), (2, 5))
+        self.assertEqual(self.food_item.get_rating_histogram(), {1: 0, 2: 1, 3: 1, 4: 0, 5: 0})
+        self.assertEqual(self.food_item.get_average_rating(), 2.5)
+
+    def test_rating_is_written_with_a_single_upsert(self):
+        """
+        Ensure re-rating replaces the stored rating through one INSERT ... ON CONFLICT statement.
+        """
+        self.rate(self.normal_user, 5)
+        with CaptureQueriesContext(connection) as context:
+            self.rate(self.normal_user, 1)
+
+        writes = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('INSERT INTO "menu_foodrating"')
+        ]
+        self.assertEqual(len(writes), 1)
+        self.assertIn('ON CONFLICT', writes[0])
+        self.assertEqual(FoodRating.objects.get(food=self.food_item, user=self.normal_user).rating, 1)
+        self.food_item.refresh_from_db()
+        self.assertEqual(self.food_item.get_rating_histogram(), {1: 1, 2: 0, 3: 0, 4: 0, 5: 0})
+
+    def test_batch_rating_of_order_items(self):
+        """
+        Ensure the items of the user's order can be rated in one request, and other food cannot.
+        """
+        from order.models import Order
+        from restaurants.models import Restaurant
+
+        sarma = Food.objects.create(name="Sarma", price=9.00)
+        other = Food.objects.create(name="Proja", price=4.00)
+        restaurant = Restaurant.objects.create(
+            name="Znak Pitanja", address="Kralja Petra 6, Belgrade", latitude=44.8188, longitude=20.4529
+        )
+        order = Order.objects.create(
+            user=self.normal_user, restaurant=restaurant, total_price=19.00, distance=1.0,
+            estimated_delivery_time=timezone.now(),
+        )
+        order.food_items.set([self.food_item, sarma], through_defaults={'created_at': order.created_at})
+        self.client.force_authenticate(self.normal_user)
+        url = reverse('food_rate_batch')
+
+        response = self.client.post(url, {'order': order.pk, 'ratings': [
+            {'food': self.food_item.pk, 'rating': 4}, {'food': sarma.pk, 'rating': 5},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Food.objects.get(pk=sarma.pk).get_average_rating(), 5.0)
+        self.assertEqual(Food.objects.get(pk=self.food_item.pk).rating_4_count, 1)
+
+        response = self.client.post(
+            url, {'order': order.pk, 'ratings': [{'food': other.pk, 'rating': 3}]}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(FoodRating.objects.filter(food=other).exists())
+
+    def test_changing_a_rating_missing_from_the_aggregates_does_not_fail(self):
+        """
+        Ensure updating or deleting a rating that predates the aggregates never drives them below zero.
+        """
+        self.rate(self.normal_user, 4)
+        Food.objects.filter(pk=self.food_item.pk).update(rating_count=0, rating_sum=0, rating_4_count=0)
+
+        self.rate(self.normal_user, 2)
+        FoodRating.objects.get(food=self.food_item, user=self.normal_user).delete()
+
+        self.food_item.refresh_from_db()
+        self.assertEqual((self.food_item.rating_count, self.food_item.rating_sum, self.food_item.rating_4_count), (0, 0, 0))
+
+    def test_reconcile_fixes_drifted_aggregates(self):
+        """
+        Ensure the reconciliation command recomputes aggregates from the ratings.
+        """
+        self.rate(self.normal_user, 4)
+        Food.objects.filter(pk=self.food_item.pk).update(rating_count=7, rating_sum=1)
+
+        call_command('reconcile_food_ratings', stdout=StringIO())
+
+        self.food_item.refresh_from_db()
+        self.assertEqual((self.food_item.rating_count, self.food_item.rating_sum), (1, 4))
+        self.assertEqual(self.food_item.rating_4_count, 1)
+
+
+class FoodOrderingTests(MenuTestSetUp):
+    def test_food_list_orders_by_average_rating(self):
+        """
+        Ensure the list sorts by stored average rating, best first, with unrated food last.
+        """
+        best = Food.objects.create(name="Sarma", price=9.00)
+        worst = Food.objects.create(name="Proja", price=4.00)
+        FoodRating.objects.create(food=best, user=self.normal_user, rating=5)
+        FoodRating.objects.create(food=best, user=self.admin_user, rating=4)
+        FoodRating.objects.create(food=worst, user=self.normal_user, rating=2)
+        self.client.force_authenticate(self.normal_user)
+
+        response = self.client.get(self.food_list_url, {'ordering': '-average_rating'})
+
+        names = [food['name'] for food in response.data['results']['data']]
+        self.assertEqual(names, ["Sarma", "Proja", "Pljeskavica"])
+        self.assertEqual(Food.objects.get(pk=best.pk).avg_rating, 4.5)
+
+    def test_food_list_filters_availability_and_orders_by_price(self):
+        """
+        Ensure ?is_available filters the menu and ?ordering=price sorts it.
+        """
+        Food.objects.create(name="Burek", price=3.00)
+        Food.objects.create(name="Baklava", price=2.00, is_available=False)
+        self.client.force_authenticate(self.normal_user)
+
+        response = self.client.get(self.food_list_url, {'is_available': 'true', 'ordering': 'price'})
+
+        names = [food['name'] for food in response.data['results']['data']]
+        self.assertEqual(names, ["Burek", "Pljeskavica"])
+
+
+class FoodSearchTests(MenuTestSetUp):
+    def setUp(self):
+        super().setUp()
+        Food.objects.create(name="Ćevapi", description="Grilled minced meat with onions", price=8.00)
+        Food.objects.create(name="Karađorđeva šnicla", description="Rolled veal with kajmak", price=14.00)
+        Food.objects.create(name="Šopska salata", description="Salad with grated cheese", price=5.00)
+        self.client.force_authenticate(self.normal_user)
+
+    def search(self, **params):
+        response = self.client.get(self.food_list_url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [food['name'] for food in response.data['results']['data']]
+
+    def test_search_ignores_accents_and_matches_prefixes(self):
+        """
+        Ensure unaccented and partial queries find accented dish names.
+        """
+        self.assertEqual(self.search(search='cevap'), ["Ćevapi"])
+        self.assertEqual(self.search(search='karadjordjeva'), ["Karađorđeva šnicla"])
+        self.assertEqual(self.search(search='SOPSKA sal'), ["Šopska salata"])
+
+    def test_search_ranks_name_matches_above_description_matches(self):
+        """
+        Ensure descriptions are searched too, with name matches ranked first.
+        """
+        Food.objects.create(name="Grilled halloumi", description="Cheese with mint", price=7.00)
+
+        names = self.search(search='grill')
+        self.assertEqual(names[0], "Grilled halloumi")
+        self.assertCountEqual(names[1:], ["Ćevapi", "Pljeskavica"])
+
+    def test_price_range_filter(self):
+        """
+        Ensure ?min_price and ?max_price bound the menu and reject invalid numbers.
+        """
+        self.assertEqual(
+            self.search(min_price='5', max_price='10', ordering='price'), ["Šopska salata", "Ćevapi", "Pljeskavica"]
+        )
+
+        response = self.client.get(self.food_list_url, {'min_price': 'cheap'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class FoodAutocompleteTests(MenuTestSetUp):
+    def setUp(self):
+        super().setUp()
+        self.autocomplete_url = reverse('food_autocomplete')
+        popular = Food.objects.create(name="Šopska salata", price=5.00)
+        Food.objects.create(name="Srpska salata", price=4.00)
+        Food.objects.create(name="Sarma", price=9.00, is_available=False)
+        FoodRating.objects.create(food=popular, user=self.normal_user, rating=5)
+        self.client.force_authenticate(self.normal_user)
+        food_name_index.rebuild()
+        self.addCleanup(food_name_index.clear)
+
+    def suggest(self, query):
+        response = self.client.get(self.autocomplete_url, {'q': query})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [food['name'] for food in response.data['data']]
+
+    def test_suggestions_match_word_prefixes_ranked_by_popularity(self):
+        """
+        Ensure any word of an available name can be completed, accents ignored, most rated first.
+        """
+        self.assertEqual(self.suggest('sal'), ["Šopska salata", "Srpska salata"])
+        self.assertEqual(self.suggest('SOPSKA S'), ["Šopska salata"])
+        self.assertEqual(self.suggest('sar'), [])
+
+    def test_index_follows_food_saves_and_deletes(self):
+        """
+        Ensure the index is updated incrementally once changes are committed.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            Food.objects.create(name="Salep", price=3.00)
+            Food.objects.filter(name="Srpska salata").delete()
+
+        self.assertEqual(self.suggest('sal'), ["Šopska salata", "Salep"])
+
+    def test_cold_start_falls_back_to_database(self):
+        """
+        Ensure a process without a built index still answers, from the search_name index.
+        """
+        food_name_index.clear()
+        with mock.patch.object(FoodNameIndex, 'build_async') as build_async:
+            self.assertEqual(self.suggest('srp'), ["Srpska salata"])
+        build_async.assert_called_once()
+
+
+class FoodMenuCacheTests(MenuTestSetUp):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.normal_user)
+
+    def test_cached_food_list_is_served_without_queries(self):
+        """
+        Ensure a repeated list request is served from the cache without touching the database.
+        """
+        first = self.client.get(self.food_list_url)
+
+        with CaptureQueriesContext(connection) as context:
+            second = self.client.get(self.food_list_url)
+
+        self.assertEqual(len(context.captured_queries), 0)
+        self.assertEqual(second.data, first.data)
+
+    def test_rating_and_comment_invalidate_cached_detail(self):
+        """
+        Ensure saving a rating or a comment bumps the menu version and refreshes cached payloads.
+        """
+        self.client.get(self.food_detail_user_url)
+        version = menu_cache.get_menu_version()
+
+        FoodRating.objects.create(food=self.food_item, user=self.normal_user, rating=3)
+        FoodComment.objects.create(food=self.food_item, user=self.normal_user, comment='Juicy.')
+
+        data = self.client.get(self.food_detail_user_url).data['data']
+        self.assertGreater(menu_cache.get_menu_version(), version)
+        self.assertEqual(data['average_rating'], 3.0)
+        self.assertEqual(data['latest_comments'], [{'user': self.normal_user.first_name, 'comment': 'Juicy.'}])
+
+    def test_entry_due_for_refresh_is_served_while_another_request_renders(self):
+        """
+        Ensure only the lock holder re-renders an entry close to expiry; others get the stored payload.
+        """
+        key = 'menu:test:entry'
+        menu_cache.get_or_render(key, lambda: 'old', timeout=menu_cache.EARLY_REFRESH)
+        cache.add(f'{key}:lock', 1)
+
+        self.assertEqual(menu_cache.get_or_render(key, lambda: 'new'), 'old')
+        cache.delete(f'{key}:lock')
+        self.assertEqual(menu_cache.get_or_render(key, lambda: 'new'), 'new')
+
+    def test_admin_can_view_cache_stats(self):
+        """
+        Ensure admins can read the menu cache hit rate and regular users cannot.
+        """
+        url = reverse('food_cache_stats')
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(self.admin_user)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('hit_rate', response.data['data'])
+
+
+class FoodCommentFeedTests(MenuTestSetUp):
+    def setUp(self):
+        super().setUp()
+        for i in range(5):
+            FoodComment.objects.create(food=self.food_item, user=self.normal_user, comment=f'Comment {i}')
+        self.comments_url = reverse('food_comments', kwargs={'pk': self.food_item.pk})
+        self.client.force_authenticate(self.normal_user)
+
+    def test_food_payload_carries_count_and_latest_comments_only(self):
+        """
+        Ensure food payloads embed the comment count and the three newest comments.
+        """
+        data = self.client.get(self.food_detail_user_url).data['data']
+
+        self.assertEqual(data['comment_count'], 5)
+        self.assertEqual(
+            [comment['comment'] for comment in data['latest_comments']], ['Comment 4', 'Comment 3', 'Comment 2']
+        )
+
+    def test_comment_feed_is_cursor_paginated_newest_first(self):
+        """
+        Ensure the comment feed walks every comment once, newest first, following the next cursors.
+        """
+        comments, url = [], self.comments_url + '?page_size=2'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            comments += [comment['comment'] for comment in response.data['results']['data']]
+            url = response.data['next']
+
+        self.assertEqual(comments, [f'Comment {i}' for i in range(4, -1, -1)])
+
+    def test_deleting_comment_updates_count(self):
+        """
+        Ensure deleting a comment decrements the stored comment count.
+        """
+        FoodComment.objects.filter(food=self.food_item).first().delete()
+
+        self.food_item.refresh_from_db()
+        self.assertEqual(self.food_item.comment_count, 4)
+
+    def test_deleting_comment_missing_from_the_count_does_not_fail(self):
+        """
+        Ensure deleting a comment that predates the stored count leaves it at zero.
+        """
+        Food.objects.filter(pk=self.food_item.pk).update(comment_count=0)
+        FoodComment.objects.filter(food=self.food_item).first().delete()
+
+        self.food_item.refresh_from_db()
+        self.assertEqual(self.food_item.comment_count, 0)
+
+    def test_reconcile_comment_counts(self):
+        """
+        Ensure the reconciliation command recounts the comments of every food.
+        """
+        Food.objects.filter(pk=self.food_item.pk).update(comment_count=0)
+
+        out = StringIO()
+        call_command('reconcile_comment_counts', stdout=out)
+
+        self.food_item.refresh_from_db()
+        self.assertEqual(self.food_item.comment_count, 5)
+        self.assertIn('1 foods corrected', out.getvalue())
+
+    def test_comment_feed_of_unknown_food_returns_404(self):
+        """
+        Ensure the feed of a non-existent food item returns 404.
+        """
+        response = self.client.get(reverse('food_comments', kwargs={'pk': 999999}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class FoodBulkMenuTests(MenuTestSetUp):
+    def write_file(self, name, content):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, name)
+        with open(path, 'w', encoding='utf-8') as target:
+            target.write(content)
+        return path
+
+    def test_import_upserts_by_sku_and_skips_invalid_rows(self):
+        """
+        Ensure a CSV import creates new items, updates existing SKUs in place and reports invalid rows.
+        """
+        Food.objects.create(sku='SR-001', name="Sarma", price=9.00)
+        path = self.write_file('menu.csv', (
+            'sku,name,description,price,is_available\n'
+            'SR-001,Sarma,Cabbage rolls,10.50,false\n'
+            'SR-002,Gibanica,,6.00,true\n'
+            'SR-003,Proja,,not-a-price,true\n'
+        ))
+        stderr = StringIO()
+
+        call_command('import_menu', path, stdout=StringIO(), stderr=stderr)
+
+        sarma = Food.objects.get(sku='SR-001')
+        self.assertEqual((sarma.price, sarma.is_available, sarma.search_description), (10.5, False, 'cabbage rolls'))
+        self.assertTrue(Food.objects.filter(sku='SR-002', name="Gibanica").exists())
+        self.assertFalse(Food.objects.filter(sku='SR-003').exists())
+        self.assertIn('Row 3', stderr.getvalue())
+
+    def test_export_output_can_be_imported(self):
+        """
+        Ensure the JSONL export round-trips through the import.
+        """
+        Food.objects.create(sku='SR-010', name="Ćevapi", price=12.50)
+        path = self.write_file('menu.jsonl', '')
+
+        call_command('export_menu', '--format', 'jsonl', '--output', path, stdout=StringIO())
+        with open(path, encoding='utf-8') as source:
+            records = [json.loads(line) for line in source]
+        self.assertIn(
+            {'sku': 'SR-010', 'name': "Ćevapi", 'description': None, 'price': '12.50', 'is_available': True}, records
+        )
+
+        Food.objects.filter(sku='SR-010').update(price=1)
+        call_command('import_menu', path, stdout=StringIO())
+        self.assertEqual(Food.objects.get(sku='SR-010').price, 12.5)
+
+    def test_bulk_update_changes_prices_and_availability_in_one_query(self):
+        """
+        Ensure admins can reprice and toggle many food items with a single UPDATE.
+        """
+        burek = Food.objects.create(name="Burek", price=3.00)
+        self.client.force_authenticate(self.admin_user)
+        items = [{'id': self.food_item.pk, 'price': '11.00'}, {'id': burek.pk, 'is_available': False}]
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.patch(reverse('food_bulk_update'), {'items': items}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data']['updated'], 2)
+        self.assertEqual(len([q for q in context.captured_queries if q['sql'].startswith('UPDATE')]), 1)
+        self.food_item.refresh_from_db()
+        burek.refresh_from_db()
+        self.assertEqual((self.food_item.price, self.food_item.is_available), (11, True))
+        self.assertEqual((burek.price, burek.is_available), (3, False))
+
+        self.client.force_authenticate(self.normal_user)
+        response = self.client.patch(reverse('food_bulk_update'), {'items': items}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -1,19 +1,29 @@
 from django.urls import path
 from .views import (
     FoodListView,
+    FoodAutocompleteView,
     FoodDetailView,
     FoodCreateView,
     FoodDetailAdminView,
+    FoodCacheStatsView,
+    FoodBulkUpdateView,
     FoodRatingCreateView,
+    FoodRatingBatchCreateView,
     FoodCommentCreateView,
+    FoodCommentListView,
 )
 
 urlpatterns = [
     path('food/', FoodListView.as_view(), name='food_list'),
+    path('food/autocomplete/', FoodAutocompleteView.as_view(), name='food_autocomplete'),
     path('food/<int:pk>/', FoodDetailView.as_view(), name='food_detail_for_users'),
+    path('food/<int:pk>/comments/', FoodCommentListView.as_view(), name='food_comments'),
     path('food/rate/', FoodRatingCreateView.as_view(), name='food_rate'), 
+    path('food/rate/batch/', FoodRatingBatchCreateView.as_view(), name='food_rate_batch'),
     path('food/comment/', FoodCommentCreateView.as_view(), name='food_comment'),
     # Admin-specific views
     path('admin/food/', FoodCreateView.as_view(), name='food_create'),  
+    path('admin/food/bulk/', FoodBulkUpdateView.as_view(), name='food_bulk_update'),
+    path('admin/food/cache/', FoodCacheStatsView.as_view(), name='food_cache_stats'),
     path('admin/food/<int:pk>/', FoodDetailAdminView.as_view(), name='food_detail_admin'),
 ]
@@ -1,25 +1,51 @@
-from rest_framework import generics, filters, status
+from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from . import cache as menu_cache
+from .autocomplete import DEFAULT_LIMIT, MAX_LIMIT, autocomplete
 from .models import Food, FoodRating, FoodComment
-from .serializers import FoodRatingSerializer, FoodCommentSerializer, FoodDetailSerializer, FoodSerializer
+from .filters import FoodAttributeFilter, FoodOrderingFilter, FoodSearchFilter
+from .pagination import FoodCommentPagination
+from .serializers import (
+    FoodBulkUpdateSerializer, FoodRatingSerializer, FoodRatingBatchSerializer, FoodCommentSerializer, FoodCommentFeedSerializer, FoodDetailSerializer, FoodSerializer,
+)
 from users.permissions import IsAdmin 
+from utils.conditional import ConditionalGetMixin, make_etag
 
-class FoodListView(generics.ListAPIView):
+class FoodListView(ConditionalGetMixin, generics.ListAPIView):
     """
     API view for listing and filtering food items.
-    Users and admins can filter based on availability, price, and name.
+    Users and admins can filter based on availability and price range,
+    and search names and descriptions.
     """
     queryset = Food.objects.all().order_by('id')
     serializer_class = FoodDetailSerializer 
     permission_classes = [IsAuthenticated]
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['name', 'price', 'is_available']
+    filter_backends = [FoodAttributeFilter, FoodSearchFilter, FoodOrderingFilter]
     ordering_fields = ['price', 'average_rating'] # Allow sorting by price and average rating
+    query_budget = 4
+
+    def get_queryset(self):
+        return super().get_queryset().with_details()
+
+    def get_validators(self, request, *args, **kwargs):
+        """
+        Derive the ETag from the menu version, which changes with every food,
+        rating and comment, so revalidation needs no query.
+        """
+        return make_etag('food-list', request.get_full_path(), menu_cache.get_menu_version()), None
 
     def list(self, request, *args, **kwargs):
         """
-        Override the list method to paginate and filter the food items.
+        Serve the page from the versioned menu cache, rendering it on a miss.
+        """
+        return Response(menu_cache.get_or_render(
+            menu_cache.page_key('food-list', request), lambda: self.render_list(request).data
+        ))
+
+    def render_list(self, request):
+        """
+        Paginate, filter and serialize the food items.
         """
         queryset = self.filter_queryset(self.get_queryset())
         page = self.paginate_queryset(queryset)
@@ -43,6 +69,45 @@ class FoodListView(generics.ListAPIView):
         })
 
 
+class FoodAutocompleteView(generics.GenericAPIView):
+    """
+    API view suggesting food names for a partially typed query, e.g. ?q=cev&limit=5.
+    Served from the in-memory prefix index, so it is cheap enough to call per keystroke.
+    """
+    permission_classes = [IsAuthenticated]
+    query_budget = 2
+
+    def get(self, request, *args, **kwargs):
+        try:
+            limit = min(int(request.query_params.get('limit', DEFAULT_LIMIT)), MAX_LIMIT)
+        except ValueError:
+            limit = DEFAULT_LIMIT
+        return Response({
+            'success': True,
+            'status': status.HTTP_200_OK,
+            'error': None,
+            'message': 'Suggestions fetched successfully.',
+            'data': autocomplete(request.query_params.get('q', ''), max(limit, 1)),
+        })
+
+
+class FoodCacheStatsView(generics.GenericAPIView):
+    """
+    API view exposing the menu cache version and hit rate of this process. Admins only.
+    """
+    permission_classes = [IsAuthenticated, IsAdmin]
+    query_budget = 1
+
+    def get(self, request, *args, **kwargs):
+        return Response({
+            'success': True,
+            'status': status.HTTP_200_OK,
+            'error': None,
+            'message': 'Menu cache statistics fetched successfully.',
+            'data': menu_cache.get_stats(),
+        })
+
+
 class FoodDetailAdminView(generics.RetrieveUpdateDestroyAPIView):
     """
     API view to retrieve, update, or delete a specific food item.
@@ -51,6 +116,7 @@ class FoodDetailAdminView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Food.objects.all()
     serializer_class = FoodSerializer
     permission_classes = [IsAuthenticated, IsAdmin]
+    query_budget = {'GET': 2, 'PATCH': 3, 'DELETE': 7}
 
     def update(self, request, *args, **kwargs):
         """
@@ -91,6 +157,37 @@ class FoodDetailAdminView(generics.RetrieveUpdateDestroyAPIView):
         }, status=status.HTTP_204_NO_CONTENT)
 
 
+class FoodBulkUpdateView(generics.GenericAPIView):
+    """
+    API view to change the price and/or availability of many food items in a
+    single UPDATE. Only admins can bulk update food items.
+    """
+    serializer_class = FoodBulkUpdateSerializer
+    permission_classes = [IsAuthenticated, IsAdmin]
+    query_budget = 2
+
+    def patch(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({
+                'success': False,
+                'status': status.HTTP_400_BAD_REQUEST,
+                'error': serializer.errors,
+                'message': 'Failed to update food items.',
+                'data': None
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        updated = Food.bulk_update_listing(serializer.validated_data['items'])
+        menu_cache.invalidate_menu()  # Queryset updates send no signals
+        return Response({
+            'success': True,
+            'status': status.HTTP_200_OK,
+            'error': None,
+            'message': 'Food items updated successfully.',
+            'data': {'updated': updated}
+        })
+
+
 class FoodCreateView(generics.CreateAPIView):
     """
     API view to create food items. Only admins can create food items.
@@ -98,6 +195,7 @@ class FoodCreateView(generics.CreateAPIView):
     queryset = Food.objects.all()
     serializer_class = FoodSerializer
     permission_classes = [IsAuthenticated, IsAdmin]
+    query_budget = 2
 
     def create(self, request, *args, **kwargs):
         """
@@ -122,34 +220,40 @@ class FoodCreateView(generics.CreateAPIView):
         }, status=status.HTTP_400_BAD_REQUEST)
 
 
-class FoodDetailView(generics.RetrieveAPIView):
+class FoodDetailView(ConditionalGetMixin, generics.RetrieveAPIView):
     """
     API view for users to view the details of a specific food item.
     Users can only view available food items.
     """
     serializer_class = FoodDetailSerializer
     permission_classes = [IsAuthenticated]
+    query_budget = 4
+
+    def get_validators(self, request, *args, **kwargs):
+        """
+        Derive the validators from the food's updated_at without serializing it.
+        """
+        updated_at = Food.objects.filter(
+            pk=kwargs.get('pk')
+        ).values_list('updated_at', flat=True).first()
+        if updated_at is None:
+            return None, None
+        return make_etag('food', kwargs.get('pk'), updated_at.isoformat()), updated_at
 
     def get_queryset(self):
         """
         Override the default queryset to ensure only available food items are retrieved.
         """
-        return Food.objects.all()
+        return Food.objects.with_details()
 
     def retrieve(self, request, *args, **kwargs):
         """
-        Retrieve the details of an available food item.
+        Retrieve the details of an available food item, through the versioned menu cache.
         """
         try:
-            instance = self.get_object()
-            serializer = self.get_serializer(instance)
-            return Response({
-                'success': True,
-                'status': status.HTTP_200_OK,
-                'error': None,
-                'message': 'Food details fetched successfully.',
-                'data': serializer.data
-            })
+            return Response(menu_cache.get_or_render(
+                menu_cache.page_key('food-detail', request), self.render_detail
+            ))
         except Food.DoesNotExist:
             return Response({
                 'success': False,
@@ -159,6 +263,15 @@ class FoodDetailView(generics.RetrieveAPIView):
                 'data': None
             })
 
+    def render_detail(self):
+        serializer = self.get_serializer(self.get_object())
+        return {
+            'success': True,
+            'status': status.HTTP_200_OK,
+            'error': None,
+            'message': 'Food details fetched successfully.',
+            'data': serializer.data
+        }
 
 
 class FoodRatingCreateView(generics.CreateAPIView):
@@ -168,6 +281,7 @@ class FoodRatingCreateView(generics.CreateAPIView):
     queryset = FoodRating.objects.all()
     serializer_class = FoodRatingSerializer
     permission_classes = [IsAuthenticated]
+    query_budget = 8
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -190,6 +304,35 @@ class FoodRatingCreateView(generics.CreateAPIView):
         }, status=status.HTTP_400_BAD_REQUEST)
 
 
+class FoodRatingBatchCreateView(generics.CreateAPIView):
+    """
+    API view for users to rate several food items (e.g. a delivered order) in one request.
+    """
+    serializer_class = FoodRatingBatchSerializer
+    permission_classes = [IsAuthenticated]
+    query_budget = 9
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+
+        if serializer.is_valid():
+            ratings = serializer.save()
+            return Response({
+                'success': True,
+                'status': status.HTTP_201_CREATED,
+                'error': None,
+                'message': 'Ratings submitted successfully.',
+                'data': [{'food': rating.food_id, 'rating': rating.rating} for rating in ratings]
+            }, status=status.HTTP_201_CREATED)
+        return Response({
+            'success': False,
+            'status': status.HTTP_400_BAD_REQUEST,
+            'message': 'Failed to rate food.',
+            'error': serializer.errors,
+            'data': None
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+
 class FoodCommentCreateView(generics.CreateAPIView):
     """
     API view for users to comment on a food item.
@@ -197,6 +340,7 @@ class FoodCommentCreateView(generics.CreateAPIView):
     queryset = FoodComment.objects.all()
     serializer_class = FoodCommentSerializer
     permission_classes = [IsAuthenticated]
+    query_budget = 6
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -217,4 +361,40 @@ class FoodCommentCreateView(generics.CreateAPIView):
             'message': 'Failed to comment on food.',
             'data': None
         }, status=status.HTTP_400_BAD_REQUEST)
-    
\ No newline at end of file
+    
+
+class FoodCommentListView(generics.ListAPIView):
+    """
+    API view for the comment feed of a food item, newest first and cursor-paginated.
+    """
+    serializer_class = FoodCommentFeedSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = FoodCommentPagination
+    query_budget = 3
+
+    def get_queryset(self):
+        return FoodComment.objects.filter(food_id=self.kwargs['pk']).select_related('user')
+
+    def list(self, request, *args, **kwargs):
+        if not Food.objects.filter(pk=kwargs['pk']).exists():
+            return Response({
+                'success': False,
+                'status': status.HTTP_404_NOT_FOUND,
+                'error': 'Food item not found.',
+                'message': 'The requested food item does not exist.',
+                'data': None
+            }, status=status.HTTP_404_NOT_FOUND)
+        return Response(menu_cache.get_or_render(
+            menu_cache.page_key('food-comments', request), lambda: self.render_list(request).data
+        ))
+
+    def render_list(self, request):
+        page = self.paginate_queryset(self.get_queryset())
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response({
+            'success': True,
+            'status': status.HTTP_200_OK,
+            'error': None,
+            'message': 'Comments fetched successfully.',
+            'data': serializer.data
+        })
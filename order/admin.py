@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import Order
+from .models import DemandCell, Order, OrderStats
 
 # Register your models here.
-admin.site.register(Order)
\ No newline at end of file
+admin.site.register(Order)
+admin.site.register(OrderStats)
+admin.site.register(DemandCell)
\ No newline at end of file
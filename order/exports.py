@@ -0,0 +1,84 @@
+"""
+Streaming order exports (CSV and NDJSON).
+
+Orders are read through a server-side cursor in fixed-size chunks and encoded
+row by row, so memory use stays flat no matter how many orders are exported.
+"""
+import csv
+import json
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch
+from menu.models import Food
+from .models import Order
+
+EXPORT_FIELDS = [
+    'id', 'user', 'restaurant', 'food_items', 'total_price', 'distance',
+    'status', 'created_at', 'estimated_delivery_time',
+]
+DEFAULT_CHUNK_SIZE = 2000
+
+
+def filter_orders(status=None, created_after=None, created_before=None):
+    """
+    Return the orders to export, ordered along the (status, created_at) and
+    created_at indexes.
+    """
+    queryset = Order.objects.all()
+    if status:
+        queryset = queryset.filter(status=status)
+    if created_after:
+        queryset = queryset.filter(created_at__gte=created_after)
+    if created_before:
+        queryset = queryset.filter(created_at__lt=created_before)
+    return queryset.order_by('created_at', 'id')
+
+
+def iter_order_records(queryset, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yield one flat dict per order, fetching ``chunk_size`` orders (and their
+    food items) per round trip.
+    """
+    queryset = queryset.select_related('user', 'restaurant').prefetch_related(
+        Prefetch('food_items', queryset=Food.objects.only('id', 'name'))
+    )
+    for order in queryset.iterator(chunk_size=chunk_size):
+        yield {
+            'id': order.id,
+            'user': order.user.email,
+            'restaurant': order.restaurant.name,
+            'food_items': [food.name for food in order.food_items.all()],
+            'total_price': order.total_price,
+            'distance': order.distance,
+            'status': order.status,
+            'created_at': order.created_at,
+            'estimated_delivery_time': order.estimated_delivery_time,
+        }
+
+
+class _Echo:
+    """
+    File-like object whose write() hands the encoded line straight back.
+    """
+    def write(self, value):
+        return value
+
+
+def iter_csv(records):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for record in records:
+        record['food_items'] = ';'.join(record['food_items'])
+        record['created_at'] = record['created_at'].isoformat()
+        record['estimated_delivery_time'] = record['estimated_delivery_time'].isoformat()
+        yield writer.writerow([record[field] for field in EXPORT_FIELDS])
+
+
+def iter_ndjson(records):
+    for record in records:
+        yield json.dumps(record, cls=DjangoJSONEncoder) + '\n'
+
+
+EXPORT_FORMATS = {
+    'csv': (iter_csv, 'text/csv'),
+    'ndjson': (iter_ndjson, 'application/x-ndjson'),
+}
@@ -0,0 +1,84 @@
+"""
+Demand heatmap: order counts per geohash cell and hour (see DemandCell).
+"""
+from django.db import transaction
+from django.db.models import F, Sum, Count
+from django.db.models.functions import Left, TruncHour
+from datetime import timezone as dt_timezone
+from utils import geohash as geohash_utils
+from .models import DemandCell, Order
+
+CELL_PRECISION = 6  # roughly 1.2 km x 0.6 km cells
+
+
+def _hour_start(timestamp):
+    return timestamp.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def _cell(cell_hash, hour, order_count=0):
+    latitude, longitude = geohash_utils.decode(cell_hash)
+    return DemandCell(
+        geohash=cell_hash, hour=hour, latitude=latitude, longitude=longitude, order_count=order_count
+    )
+
+
+def record_order_demand(order):
+    """
+    Count the order in the cell and hour it was placed from.
+    Orders without a resolved delivery location are ignored.
+    """
+    if not order.geohash:
+        return
+    cell_hash = order.geohash[:CELL_PRECISION]
+    hour = _hour_start(order.created_at)
+    with transaction.atomic():
+        DemandCell.objects.bulk_create([_cell(cell_hash, hour)], ignore_conflicts=True)
+        DemandCell.objects.filter(geohash=cell_hash, hour=hour).update(order_count=F('order_count') + 1)
+
+
+def rebuild_demand_cells(since=None, batch_size=1000):
+    """
+    Recompute the demand cells from the order table, for every hour starting at
+    or after ``since`` (all history when omitted). Returns the number of rows written.
+    """
+    orders = Order.objects.exclude(geohash='')
+    cells = DemandCell.objects.all()
+    if since is not None:
+        since = _hour_start(since)
+        orders = orders.filter(created_at__gte=since)
+        cells = cells.filter(hour__gte=since)
+
+    rows = (
+        orders.annotate(cell=Left('geohash', CELL_PRECISION), bucket=TruncHour('created_at', tzinfo=dt_timezone.utc))
+        .values('cell', 'bucket')
+        .annotate(order_count=Count('id'))
+        .order_by()
+    )
+    written = 0
+    with transaction.atomic():
+        cells.delete()
+        batch = []
+        for row in rows.iterator(chunk_size=batch_size):
+            batch.append(_cell(row['cell'], row['bucket'], row['order_count']))
+            if len(batch) >= batch_size:
+                written += len(DemandCell.objects.bulk_create(batch))
+                batch = []
+        written += len(DemandCell.objects.bulk_create(batch))
+    return written
+
+
+def demand_heatmap(min_lat, min_lng, max_lat, max_lng, start, end):
+    """
+    Return ``{geohash, latitude, longitude, orders}`` dicts for every cell whose
+    center lies in the bounding box, summed over the hours in ``[start, end)``.
+    """
+    return list(
+        DemandCell.objects.filter(
+            hour__gte=start, hour__lt=end,
+            latitude__gte=min_lat, latitude__lte=max_lat,
+            longitude__gte=min_lng, longitude__lte=max_lng,
+        )
+        .values('geohash', 'latitude', 'longitude')
+        .annotate(orders=Sum('order_count'))
+        .order_by('-orders', 'geohash')
+    )
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from order.partitions import add_months, archive_partitions, month_start
+
+
+class Command(BaseCommand):
+    help = 'Detaches monthly order partitions older than the retention window and archives them'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than-months', type=int, default=12,
+            help='Archive partitions that ended more than this many months ago (default: 12).',
+        )
+        parser.add_argument(
+            '--dump-dir',
+            help='Write archived partitions as compressed pg_dump files to this directory and drop them, '
+                 'instead of keeping them in the order_archive schema.',
+        )
+
+    def handle(self, *args, **options):
+        before = add_months(month_start(timezone.now()), -options['older_than_months'])
+        try:
+            archived = archive_partitions(before, dump_dir=options['dump_dir'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        for name in archived:
+            self.stdout.write(f'Archived partition {name}.')
+        self.stdout.write(self.style.SUCCESS(f'Archived {len(archived)} order partitions.'))
@@ -0,0 +1,38 @@
+import sys
+from django.core.management.base import BaseCommand, CommandError
+from order.exports import DEFAULT_CHUNK_SIZE, EXPORT_FORMATS, filter_orders, iter_order_records
+from order.serializers import OrderExportFilterSerializer
+
+
+class Command(BaseCommand):
+    help = 'Streams orders as CSV or NDJSON to stdout or a file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=sorted(EXPORT_FORMATS), default='csv', dest='export_format')
+        parser.add_argument('--status', help='Only export orders with this status.')
+        parser.add_argument('--created-after', help='Only export orders created at or after this ISO date/time.')
+        parser.add_argument('--created-before', help='Only export orders created before this ISO date/time.')
+        parser.add_argument('--output', help='File to write to (default: stdout).')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        filters = {
+            key: options[key] for key in ('status', 'created_after', 'created_before') if options[key]
+        }
+        serializer = OrderExportFilterSerializer(data=filters)
+        if not serializer.is_valid():
+            raise CommandError(serializer.errors)
+
+        encode, _ = EXPORT_FORMATS[options['export_format']]
+        records = iter_order_records(filter_orders(**serializer.validated_data), chunk_size=options['chunk_size'])
+
+        target = open(options['output'], 'w', newline='', encoding='utf-8') if options['output'] else sys.stdout
+        try:
+            for line in encode(records):
+                target.write(line)
+        finally:
+            if options['output']:
+                target.close()
+
+        if options['output']:
+            self.stdout.write(self.style.SUCCESS(f'Exported orders to {options["output"]}.'))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+from order.partitions import convert_to_partitioned, create_partitions
+
+
+class Command(BaseCommand):
+    help = 'Creates upcoming monthly partitions for orders and line items (optionally converting the tables first)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--convert', action='store_true',
+            help='Convert the existing order tables into partitioned tables before creating partitions.',
+        )
+        parser.add_argument(
+            '--months-ahead', type=int, default=3,
+            help='Number of future months to create partitions for (default: 3).',
+        )
+
+    def handle(self, *args, **options):
+        months_ahead = options['months_ahead']
+        try:
+            if options['convert']:
+                for table in convert_to_partitioned(months_ahead=months_ahead):
+                    self.stdout.write(f'Converted {table} to a partitioned table.')
+            created = create_partitions(months_ahead=months_ahead)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        for name in created:
+            self.stdout.write(f'Created partition {name}.')
+        self.stdout.write(self.style.SUCCESS(f'Order partitions are in place ({len(created)} created).'))
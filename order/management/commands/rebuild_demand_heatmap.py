@@ -0,0 +1,19 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from order.heatmap import rebuild_demand_cells
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the per-geohash-cell hourly demand counts from the order table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int,
+            help='Only rebuild the last N days (default: all history).',
+        )
+
+    def handle(self, *args, **options):
+        since = timezone.now() - timedelta(days=options['days']) if options['days'] else None
+        written = rebuild_demand_cells(since=since)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {written} demand cells.'))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_datetime, parse_date
+from django.utils import timezone
+from datetime import datetime
+from order.stats import rebuild_order_stats
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the per-restaurant hourly and daily order statistics from the order table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since',
+            help='Only rebuild buckets from this ISO date/time onwards (default: all history).',
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            since = parse_datetime(options['since'])
+            if since is None:
+                day = parse_date(options['since'])
+                if day is None:
+                    raise CommandError(f"Invalid --since value: {options['since']}")
+                since = datetime(day.year, day.month, day.day)
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+
+        written = rebuild_order_stats(since=since)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {written} order statistics rows.'))
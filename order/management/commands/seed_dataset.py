@@ -0,0 +1,52 @@
+from datetime import datetime, timezone as dt_timezone
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from order.seeding import DEFAULT_CHUNK_SIZE, SEED_EMAIL_DOMAIN, SEED_PASSWORD, DatasetSeeder
+
+
+class Command(BaseCommand):
+    help = 'Generates a large, reproducible dataset of users, restaurants, menus, ratings, comments and orders'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0, help='Random seed; the same seed gives the same data.')
+        parser.add_argument('--users', type=int, default=1_000_000)
+        parser.add_argument('--restaurants', type=int, default=20_000)
+        parser.add_argument('--foods', type=int, default=10_000)
+        parser.add_argument('--menu-size', type=int, default=40, help='Dishes on each restaurant menu.')
+        parser.add_argument('--ratings', type=int, default=2_000_000)
+        parser.add_argument('--comments', type=int, default=500_000)
+        parser.add_argument('--orders', type=int, default=2_000_000)
+        parser.add_argument('--months', type=int, default=12, help='Months of history, ending today (UTC).')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Seeding uses COPY and needs PostgreSQL.')
+        if get_user_model().objects.filter(email__endswith=f'@{SEED_EMAIL_DOMAIN}').exists():
+            raise CommandError('The database already contains a seeded dataset.')
+        if options['users'] < 1:
+            raise CommandError('At least one user is needed.')
+        if options['orders'] and not (options['restaurants'] and options['foods'] and options['menu_size']):
+            raise CommandError('Orders need restaurants with non-empty menus.')
+
+        now = datetime.now(dt_timezone.utc)
+        seeder = DatasetSeeder(
+            end=datetime(now.year, now.month, now.day, tzinfo=dt_timezone.utc),
+            seed=options['seed'],
+            months=options['months'],
+            chunk_size=options['chunk_size'],
+            log=self.stdout.write,
+        )
+        seeder.run(
+            users=options['users'],
+            restaurants=options['restaurants'],
+            foods=options['foods'],
+            menu_size=options['menu_size'],
+            ratings=options['ratings'],
+            comments=options['comments'],
+            orders=options['orders'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded the dataset (seed {options["seed"]}); every user logs in with "{SEED_PASSWORD}".'
+        ))
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.6 on 2025-02-14 10:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('menu', '__first__'),
+        ('restaurants', '__first__'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Order',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('courier_engaged', models.BooleanField(default=False)),
+                ('restaurant_engaged', models.BooleanField(default=False)),
+                ('distance', models.FloatField(blank=True, null=True)),
+                ('status', models.CharField(default='Pending', max_length=50)),
+                ('estimated_delivery_time', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('food_items', models.ManyToManyField(to='menu.food')),
+                ('restaurant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='orders', to='restaurants.restaurant')),
+            ],
+        ),
+    ]
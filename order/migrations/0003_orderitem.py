@@ -0,0 +1,72 @@
+"""
+Turn the auto-created Order.food_items table into the explicit OrderItem model.
+
+Django cannot add ``through=`` to an existing many-to-many field, so the model
+takes over order_order_food_items in the migration state only. The table then
+gains created_at, filled in from each line item's order before it becomes
+NOT NULL, joins it to the unique constraint and drops the database-level
+foreign key to the order (see OrderItem).
+"""
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copy_order_created_at(apps, schema_editor):
+    Order = apps.get_model('order', 'Order')
+    OrderItem = apps.get_model('order', 'OrderItem')
+    OrderItem.objects.filter(created_at__isnull=True).update(
+        created_at=Subquery(Order.objects.filter(pk=OuterRef('order_id')).values('created_at')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '__first__'),
+        ('order', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='OrderItem',
+                    fields=[
+                        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='order.order')),
+                        ('food', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='menu.food')),
+                    ],
+                    options={
+                        'db_table': 'order_order_food_items',
+                        'unique_together': {('order', 'food')},
+                    },
+                ),
+                migrations.AlterField(
+                    model_name='order',
+                    name='food_items',
+                    field=models.ManyToManyField(through='order.OrderItem', to='menu.food'),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='created_at',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.RunPython(copy_order_created_at, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='orderitem',
+            name='created_at',
+            field=models.DateTimeField(),
+        ),
+        migrations.AlterUniqueTogether(
+            name='orderitem',
+            unique_together={('order', 'food', 'created_at')},
+        ),
+        migrations.AlterField(
+            model_name='orderitem',
+            name='order',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, to='order.order'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0004_order_created_at_indexes'),
+        ('restaurants', '__first__'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('hour', 'Hour'), ('day', 'Day')], max_length=4)),
+                ('bucket', models.DateTimeField()),
+                ('orders_created', models.PositiveIntegerField(default=0)),
+                ('orders_delivered', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('distance_total', models.FloatField(default=0)),
+                ('distance_count', models.PositiveIntegerField(default=0)),
+                ('restaurant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='order_stats', to='restaurants.restaurant')),
+            ],
+            options={
+                'unique_together': {('restaurant', 'period', 'bucket')},
+                'indexes': [models.Index(fields=['period', 'bucket'], name='order_order_period_7ca6fb_idx')],
+            },
+        ),
+    ]
@@ -11,16 +11,102 @@ class Order(models.Model):
     """
     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='orders')
     restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE, related_name='orders')
-    food_items = models.ManyToManyField(Food)  
+    food_items = models.ManyToManyField(Food, through='OrderItem')  
     total_price = models.DecimalField(max_digits=10, decimal_places=2)
     courier_engaged = models.BooleanField(default=False)
     restaurant_engaged = models.BooleanField(default=False)
     distance = models.FloatField(null=True, blank=True)
+    delivery_latitude = models.FloatField(null=True, blank=True)
+    delivery_longitude = models.FloatField(null=True, blank=True)
+    geohash = models.CharField(max_length=12, blank=True)
     status = models.CharField(max_length=50, default='Pending')
     estimated_delivery_time = models.DateTimeField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at']),
+            models.Index(fields=['status', 'created_at']),
+        ]
+
     def __str__(self):
         return f"Order #{self.id} by {self.user.email}"
-    
+
+
+class OrderItem(models.Model):
+    """
+    Line item linking an order to a food item.
+
+    Carries the order's created_at so that line items can be range-partitioned
+    by month alongside their orders (see order.partitions). Partitioned orders are
+    keyed by (id, created_at), so the database-level foreign key to the order is
+    not enforced; Django still cascades deletes.
+    """
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, db_constraint=False)
+    food = models.ForeignKey(Food, on_delete=models.CASCADE)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'order_order_food_items'
+        unique_together = ('order', 'food', 'created_at')
+
+    def __str__(self):
+        return f"{self.food} in order #{self.order_id}"
+
+
+class OrderStats(models.Model):
+    """
+    Pre-aggregated order counters per restaurant and hour or day.
+
+    Rows are keyed by the bucket the order was created in and are maintained
+    incrementally by the order tasks (see order.stats), so admin statistics
+    never have to scan the order table.
+    """
+    HOUR = 'hour'
+    DAY = 'day'
+    PERIOD_CHOICES = [(HOUR, 'Hour'), (DAY, 'Day')]
+
+    restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE, related_name='order_stats')
+    period = models.CharField(max_length=4, choices=PERIOD_CHOICES)
+    bucket = models.DateTimeField()
+    orders_created = models.PositiveIntegerField(default=0)
+    orders_delivered = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    distance_total = models.FloatField(default=0)
+    distance_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('restaurant', 'period', 'bucket')
+        indexes = [models.Index(fields=['period', 'bucket'])]
+
+    def __str__(self):
+        return f"{self.restaurant} - {self.period} of {self.bucket:%Y-%m-%d %H:%M}"
+
+    @property
+    def average_distance(self):
+        if not self.distance_count:
+            return None
+        return round(self.distance_total / self.distance_count, 2)
+
+
+class DemandCell(models.Model):
+    """
+    Number of orders placed from one geohash cell during one hour.
+
+    Maintained incrementally as orders come in (see order.heatmap), so demand
+    heatmaps are read from this compact table rather than from raw orders.
+    The cell center is stored to allow bounding box filtering on plain columns.
+    """
+    geohash = models.CharField(max_length=12)
+    hour = models.DateTimeField()
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+    order_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('geohash', 'hour')
+        indexes = [models.Index(fields=['hour', 'latitude', 'longitude'])]
+
+    def __str__(self):
+        return f"{self.geohash} @ {self.hour:%Y-%m-%d %H:00}: {self.order_count} orders"
@@ -0,0 +1,292 @@
+"""
+Monthly range partitioning of orders and their line items by created_at (PostgreSQL).
+
+``convert_to_partitioned`` turns the plain tables created by migrations into
+partitioned ones once; ``create_partitions`` keeps partitions for the coming
+months in place, and ``archive_partitions`` detaches old months so that the
+hot-path indexes only span recent history.
+"""
+import logging
+import os
+import re
+import subprocess
+from datetime import datetime, timezone as dt_timezone
+from django.db import connection, transaction
+from django.utils import timezone
+from .models import Order, OrderItem
+
+logger = logging.getLogger(__name__)
+
+PARTITIONED_MODELS = [Order, OrderItem]
+PARTITION_KEY = 'created_at'
+ARCHIVE_SCHEMA = 'order_archive'
+
+_PARTITION_SUFFIX = re.compile(r'_p(\d{4})_(\d{2})$')
+
+
+def month_start(value):
+    """
+    Return the first instant (UTC) of the month containing ``value``.
+    """
+    value = value.astimezone(dt_timezone.utc)
+    return datetime(value.year, value.month, 1, tzinfo=dt_timezone.utc)
+
+
+def add_months(month, count):
+    """
+    Shift a month start by ``count`` months.
+    """
+    index = month.year * 12 + month.month - 1 + count
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(table, month):
+    return f'{table}_p{month.year:04d}_{month.month:02d}'
+
+
+def _qn(name):
+    return connection.ops.quote_name(name)
+
+
+def _ensure_postgresql():
+    if connection.vendor != 'postgresql':
+        raise ValueError('Order partitioning requires PostgreSQL.')
+
+
+def is_partitioned(table):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)', [table]
+        )
+        return cursor.fetchone() is not None
+
+
+def list_partitions(table):
+    """
+    Return ``(month, partition_name)`` pairs for the monthly partitions of ``table``,
+    oldest first. The default partition is not included.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname FROM pg_inherits
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE pg_inherits.inhparent = to_regclass(%s)
+            """,
+            [table],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    partitions = []
+    for name in names:
+        match = _PARTITION_SUFFIX.search(name)
+        if match:
+            month = datetime(int(match.group(1)), int(match.group(2)), 1, tzinfo=dt_timezone.utc)
+            partitions.append((month, name))
+    return sorted(partitions)
+
+
+def create_partition(table, month):
+    """
+    Create the partition of ``table`` for ``month`` unless it already exists.
+
+    The partition is built as a standalone table, any rows that landed in the
+    default partition for that month are moved into it, and it is then attached.
+    Returns True when a partition was created.
+    """
+    name = partition_name(table, month)
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT to_regclass(%s)', [name])
+        if cursor.fetchone()[0] is not None:
+            return False
+
+        lower, upper = month, add_months(month, 1)
+        default = f'{table}_default'
+        with transaction.atomic():
+            cursor.execute(
+                f'CREATE TABLE {_qn(name)} (LIKE {_qn(table)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+            )
+            cursor.execute('SELECT to_regclass(%s)', [default])
+            if cursor.fetchone()[0] is not None:
+                cursor.execute(
+                    f'WITH moved AS (DELETE FROM {_qn(default)} '
+                    f'WHERE {_qn(PARTITION_KEY)} >= %s AND {_qn(PARTITION_KEY)} < %s RETURNING *) '
+                    f'INSERT INTO {_qn(name)} SELECT * FROM moved',
+                    [lower, upper],
+                )
+            cursor.execute(
+                f'ALTER TABLE {_qn(table)} ATTACH PARTITION {_qn(name)} FOR VALUES FROM (%s) TO (%s)',
+                [lower, upper],
+            )
+    logger.info('Created partition %s', name)
+    return True
+
+
+def create_partitions(months_ahead=3, now=None):
+    """
+    Make sure every partitioned table has partitions from the current month up to
+    ``months_ahead`` months in the future. Returns the names of created partitions.
+    """
+    _ensure_postgresql()
+    current = month_start(now or timezone.now())
+    created = []
+    for model in PARTITIONED_MODELS:
+        table = model._meta.db_table
+        if not is_partitioned(table):
+            continue
+        for offset in range(months_ahead + 1):
+            month = add_months(current, offset)
+            if create_partition(table, month):
+                created.append(partition_name(table, month))
+    return created
+
+
+def _convert_table(cursor, table, months):
+    legacy = f'{table}_unpartitioned'
+    sequence = f'{table}_id_seq'
+
+    cursor.execute(
+        "SELECT conrelid::regclass::text FROM pg_constraint WHERE confrelid = to_regclass(%s) AND contype = 'f'",
+        [table],
+    )
+    referencing = [row[0] for row in cursor.fetchall()]
+    if referencing:
+        raise ValueError(
+            f'Cannot partition {table}: referenced by foreign keys from {", ".join(referencing)}.'
+        )
+
+    # Capture secondary indexes and outgoing foreign keys before the table is dropped.
+    cursor.execute(
+        """
+        SELECT pg_get_indexdef(i.indexrelid), i.indisunique
+        FROM pg_index i WHERE i.indrelid = to_regclass(%s) AND NOT i.indisprimary
+        """,
+        [table],
+    )
+    indexes = cursor.fetchall()
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint WHERE conrelid = to_regclass(%s) AND contype = 'f'",
+        [table],
+    )
+    foreign_keys = cursor.fetchall()
+
+    cursor.execute(f'LOCK TABLE {_qn(table)} IN ACCESS EXCLUSIVE MODE')
+    cursor.execute(f'ALTER TABLE {_qn(table)} RENAME TO {_qn(legacy)}')
+    cursor.execute(f'ALTER TABLE {_qn(legacy)} ALTER COLUMN id DROP IDENTITY IF EXISTS')
+    cursor.execute(
+        f'CREATE TABLE {_qn(table)} (LIKE {_qn(legacy)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+        f'PARTITION BY RANGE ({_qn(PARTITION_KEY)})'
+    )
+    cursor.execute(f'ALTER TABLE {_qn(table)} ADD PRIMARY KEY (id, {_qn(PARTITION_KEY)})')
+    cursor.execute(f'CREATE SEQUENCE IF NOT EXISTS {_qn(sequence)} OWNED BY {_qn(table)}.id')
+    cursor.execute(f"ALTER TABLE {_qn(table)} ALTER COLUMN id SET DEFAULT nextval('{sequence}')")
+    cursor.execute(f'CREATE TABLE {_qn(table + "_default")} PARTITION OF {_qn(table)} DEFAULT')
+    for month in months:
+        cursor.execute(
+            f'CREATE TABLE {_qn(partition_name(table, month))} PARTITION OF {_qn(table)} '
+            f'FOR VALUES FROM (%s) TO (%s)',
+            [month, add_months(month, 1)],
+        )
+
+    cursor.execute(f'INSERT INTO {_qn(table)} SELECT * FROM {_qn(legacy)}')
+    cursor.execute(
+        f"SELECT setval('{sequence}', COALESCE((SELECT MAX(id) FROM {_qn(table)}), 0) + 1, false)"
+    )
+    cursor.execute(f'DROP TABLE {_qn(legacy)}')
+
+    for definition, is_unique in indexes:
+        if is_unique and PARTITION_KEY not in definition:
+            logger.warning('Skipping unique index without the partition key: %s', definition)
+            continue
+        cursor.execute(re.sub(rf'ON (ONLY )?(\S+\.)?{legacy} ', rf'ON \g<2>{table} ', definition))
+    for name, definition in foreign_keys:
+        cursor.execute(f'ALTER TABLE {_qn(table)} ADD CONSTRAINT {_qn(name)} {definition}')
+
+
+def convert_to_partitioned(months_ahead=3):
+    """
+    Convert the order and line item tables into monthly range-partitioned tables.
+
+    Existing rows are copied into monthly partitions covering their history, up to
+    ``months_ahead`` months in the future. Runs in a single transaction and holds
+    an exclusive lock on each table while it is rebuilt. Returns the converted tables.
+    """
+    _ensure_postgresql()
+    converted = []
+    with transaction.atomic(), connection.cursor() as cursor:
+        # Deferred foreign key checks would block ALTER TABLE on the rebuilt tables.
+        cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+        for model in PARTITIONED_MODELS:
+            table = model._meta.db_table
+            if is_partitioned(table):
+                continue
+
+            cursor.execute(f'SELECT MIN({_qn(PARTITION_KEY)}) FROM {_qn(table)}')
+            oldest = cursor.fetchone()[0]
+            first = month_start(oldest or timezone.now())
+            last = add_months(month_start(timezone.now()), months_ahead)
+            months = []
+            while first <= last:
+                months.append(first)
+                first = add_months(first, 1)
+
+            _convert_table(cursor, table, months)
+            converted.append(table)
+    return converted
+
+
+def archive_partitions(before, dump_dir=None):
+    """
+    Detach every monthly partition that ends on or before ``before``.
+
+    Detached partitions are moved into the ``order_archive`` schema. When
+    ``dump_dir`` is given they are also written there as compressed ``pg_dump``
+    archives and dropped. Returns the archived partition names.
+    """
+    _ensure_postgresql()
+    cutoff = month_start(before)
+    archived = []
+    for model in PARTITIONED_MODELS:
+        table = model._meta.db_table
+        if not is_partitioned(table):
+            continue
+        for month, name in list_partitions(table):
+            if add_months(month, 1) > cutoff:
+                break
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(f'ALTER TABLE {_qn(table)} DETACH PARTITION {_qn(name)}')
+                cursor.execute(f'CREATE SCHEMA IF NOT EXISTS {_qn(ARCHIVE_SCHEMA)}')
+                cursor.execute(f'ALTER TABLE {_qn(name)} SET SCHEMA {_qn(ARCHIVE_SCHEMA)}')
+            if dump_dir:
+                # pg_dump runs on its own connection, so the detach must be committed first.
+                _dump_table(f'{ARCHIVE_SCHEMA}.{name}', os.path.join(dump_dir, f'{name}.dump'))
+                with connection.cursor() as cursor:
+                    cursor.execute(f'DROP TABLE {_qn(ARCHIVE_SCHEMA)}.{_qn(name)}')
+            logger.info('Archived partition %s', name)
+            archived.append(name)
+    return archived
+
+
+def _dump_table(table, path):
+    """
+    Write ``table`` to ``path`` as a compressed custom-format ``pg_dump`` archive.
+    """
+    settings_dict = connection.settings_dict
+    command = [
+        'pg_dump',
+        '--format=custom',
+        '--no-owner',
+        '--table', table,
+        '--file', path,
+        '--dbname', settings_dict['NAME'],
+        '--username', settings_dict['USER'],
+    ]
+    if settings_dict.get('HOST'):
+        command += ['--host', settings_dict['HOST']]
+    if settings_dict.get('PORT'):
+        command += ['--port', str(settings_dict['PORT'])]
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    env = dict(os.environ, PGPASSWORD=settings_dict.get('PASSWORD') or '')
+    subprocess.run(command, env=env, check=True, capture_output=True)
+    return path
@@ -0,0 +1,300 @@
+"""
+Deterministic generation of a production-sized dataset across all apps (PostgreSQL).
+
+Every table is generated from a fixed seed, so two runs with the same options
+produce the same rows (timestamps are relative to ``end``). Restaurants, foods
+and menus are small enough for ``bulk_create``; users, ratings, comments and
+orders are streamed into their tables with ``COPY`` in chunks, which also lets
+them carry historical ``created_at`` values. Every user shares one precomputed
+password hash. Denormalized counters and derived tables (rating aggregates,
+comment counts, order statistics, demand cells) are rebuilt at the end.
+"""
+import hashlib
+import io
+import math
+import random
+from datetime import timedelta
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from menu.cache import invalidate_menu
+from menu.models import Food, FoodComment, FoodRating
+from menu.ratings import reconcile_rating_aggregates
+from restaurants.menus import invalidate_restaurant_menus
+from restaurants.models import Restaurant, RestaurantMenuItem
+from utils import geohash
+from utils.uuid7 import uuid7_at
+from .heatmap import rebuild_demand_cells
+from .models import Order, OrderItem
+from .stats import rebuild_order_stats
+
+CustomUser = get_user_model()
+
+SEED_EMAIL_DOMAIN = 'seed.example.com'
+SEED_PASSWORD = 'password123'
+DEFAULT_CHUNK_SIZE = 10000
+
+# City centers with their share of restaurants and customers.
+CITIES = [
+    ('Belgrade', 44.8125, 20.4612, 0.55),
+    ('Novi Sad', 45.2671, 19.8335, 0.2),
+    ('Niš', 43.3209, 21.8958, 0.15),
+    ('Kragujevac', 44.0128, 20.9114, 0.1),
+]
+STREETS = ['Knez Mihailova', 'Skadarska', 'Bulevar Oslobođenja', 'Cara Dušana', 'Njegoševa', 'Vojvode Stepe']
+DISHES = [
+    'Ćevapi', 'Pljeskavica', 'Sarma', 'Karadjordjeva šnicla', 'Gibanica', 'Proja', 'Prebranac', 'Pasulj',
+    'Burek', 'Musaka', 'Čorba', 'Podvarak', 'Roštilj', 'Šopska salata', 'Baklava', 'Tulumbe', 'Krofne',
+]
+VARIANTS = ['Classic', 'Spicy', 'Family size', 'Homemade', 'Grilled', 'Vegetarian', 'Double', 'Mini']
+FIRST_NAMES = ['John', 'Jane', 'Alex', 'Mike', 'Linda', 'Chris', 'Sara', 'Tom', 'Kate', 'Nick']
+LAST_NAMES = ['Smith', 'Doe', 'Brown', 'Johnson', 'Davis', 'Garcia', 'Martinez', 'Clark', 'Lewis', 'Young']
+COMMENTS = ['Delicious!', 'Arrived warm and on time.', 'A bit too salty.', 'Generous portion.', 'Would order again.']
+
+
+def _copy_value(value):
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+
+def copy_rows(model, fields, rows):
+    """
+    Load ``rows`` (tuples in the order of ``fields``) into the model's table with COPY.
+    """
+    columns = ', '.join(connection.ops.quote_name(model._meta.get_field(field).column) for field in fields)
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write('\t'.join(_copy_value(value) for value in row))
+        buffer.write('\n')
+    buffer.seek(0)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f'COPY {connection.ops.quote_name(model._meta.db_table)} ({columns}) FROM STDIN', buffer
+        )
+
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _distance_km(lat1, lng1, lat2, lng2):
+    # Equirectangular approximation; plenty for the few kilometers of a delivery.
+    x = math.radians(lng2 - lng1) * math.cos(math.radians((lat1 + lat2) / 2))
+    y = math.radians(lat2 - lat1)
+    return 6371 * math.hypot(x, y)
+
+
+class DatasetSeeder:
+    def __init__(self, end, seed=0, months=12, chunk_size=DEFAULT_CHUNK_SIZE, log=None):
+        self.seed = seed
+        self.end = end
+        self.start = end - timedelta(days=30 * months)
+        self.chunk_size = chunk_size
+        self.log = log or (lambda message: None)
+        self.restaurants = []
+        self.menus = {}
+
+    def rng(self, stage):
+        # One generator per stage, so changing one table's size leaves the others unchanged.
+        return random.Random(f'{self.seed}:{stage}')
+
+    def at(self, fraction):
+        return self.start + (self.end - self.start) * fraction
+
+    def _located(self, rng, spread):
+        city, lat, lng, _ = rng.choices(CITIES, weights=[weight for *_, weight in CITIES])[0]
+        return city, lat + rng.gauss(0, spread), lng + rng.gauss(0, spread)
+
+    # Users
+
+    def user_joined(self, index):
+        return self.at(index / self.users)
+
+    def user_id(self, index):
+        digest = hashlib.blake2b(f'{self.seed}:user:{index}'.encode(), digest_size=10).digest()
+        return uuid7_at(int(self.user_joined(index).timestamp() * 1000), int.from_bytes(digest, 'big'))
+
+    def seed_users(self, count, admin_every=1000):
+        self.users = count
+        rng = self.rng('users')
+        password = make_password(SEED_PASSWORD)
+        fields = [
+            'id', 'password', 'is_superuser', 'is_staff', 'is_active', 'date_joined',
+            'email', 'first_name', 'last_name', 'address', 'is_admin',
+        ]
+
+        def rows():
+            for index in range(count):
+                city, _, _ = self._located(rng, 0)
+                yield (
+                    self.user_id(index), password, False, False, True, self.user_joined(index),
+                    f'user{index}@{SEED_EMAIL_DOMAIN}', rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES),
+                    f'{rng.choice(STREETS)} {rng.randint(1, 200)}, {city}, Serbia', index % admin_every == 0,
+                )
+
+        for chunk in _chunks(rows(), self.chunk_size):
+            copy_rows(CustomUser, fields, chunk)
+        self.log(f'Seeded {count} users.')
+
+    # Restaurants and menus
+
+    def seed_restaurants(self, count):
+        """
+        Add ``count`` restaurants; repeated calls grow the set reproducibly.
+        """
+        first = len(self.restaurants)
+        rng = self.rng(f'restaurants:{first}')
+        restaurants = []
+        for index in range(first, first + count):
+            city, lat, lng = self._located(rng, 0.04)
+            restaurants.append(Restaurant(
+                name=f'{rng.choice(DISHES)} House {index}',
+                address=f'{rng.choice(STREETS)} {rng.randint(1, 200)}, {city}, Serbia',
+                latitude=lat, longitude=lng,
+            ))
+        # bulk_create bypasses Restaurant.save(), so nothing is geocoded.
+        restaurants = Restaurant.objects.bulk_create(restaurants, batch_size=self.chunk_size)
+        self.restaurants += [(restaurant.id, restaurant.latitude, restaurant.longitude) for restaurant in restaurants]
+        self.log(f'Seeded {count} restaurants.')
+
+    def seed_foods(self, count):
+        rng = self.rng('foods')
+        foods = []
+        for index in range(count):
+            food = Food(
+                sku=f'SEED-{index:07d}',
+                name=f'{rng.choice(VARIANTS)} {rng.choice(DISHES)} {index}',
+                description=f'{rng.choice(COMMENTS)} Made fresh every day.',
+                price=Decimal(rng.randint(300, 2500)) / 100,
+                is_available=rng.random() < 0.9,
+            )
+            food.refresh_search_fields()  # bulk_create bypasses save()
+            foods.append(food)
+        foods = Food.objects.bulk_create(foods, batch_size=self.chunk_size)
+        self.foods = {food.id: food.price for food in foods}
+        self.log(f'Seeded {count} foods.')
+
+    def seed_menus(self, menu_size):
+        """
+        Give every restaurant that has no menu yet ``menu_size`` random dishes.
+        """
+        rng = self.rng(f'menus:{len(self.menus)}')
+        food_ids = list(self.foods)
+        now = self.end
+
+        def rows():
+            for restaurant_id, _, _ in self.restaurants[len(self.menus):]:
+                menu = rng.sample(food_ids, k=min(menu_size, len(food_ids)))
+                self.menus[restaurant_id] = menu
+                for food_id in menu:
+                    yield restaurant_id, food_id, True, now
+
+        for chunk in _chunks(rows(), self.chunk_size):
+            copy_rows(RestaurantMenuItem, ['restaurant', 'food', 'is_available', 'updated_at'], chunk)
+        self.log(f'Seeded menus of {menu_size} dishes.')
+
+    # Engagement
+
+    def seed_ratings(self, count):
+        rng = self.rng('ratings')
+        food_ids = list(self.foods)
+
+        count = min(count, self.users * len(food_ids))
+
+        def rows():
+            for number in range(count):
+                # A user's n-th rating goes to the n-th food after a per-user offset, so no food is rated twice.
+                index, nth = number % self.users, number // self.users
+                offset = index * 7919
+                food_id = food_ids[(offset + nth) % len(food_ids)]
+                rated_at = self.at(rng.uniform(index / self.users, 1))
+                yield food_id, self.user_id(index), min(5, max(1, round(rng.gauss(3.8, 1.1)))), rated_at
+
+        for chunk in _chunks(rows(), self.chunk_size):
+            copy_rows(FoodRating, ['food', 'user', 'rating', 'created_at'], chunk)
+        reconcile_rating_aggregates(batch_size=self.chunk_size)
+        self.log(f'Seeded {count} ratings.')
+
+    def seed_comments(self, count):
+        rng = self.rng('comments')
+        food_ids = list(self.foods)
+
+        def rows():
+            for _ in range(count):
+                index = rng.randrange(self.users)
+                commented_at = self.at(rng.uniform(index / self.users, 1))
+                yield rng.choice(food_ids), self.user_id(index), rng.choice(COMMENTS), commented_at
+
+        for chunk in _chunks(rows(), self.chunk_size):
+            copy_rows(FoodComment, ['food', 'user', 'comment', 'created_at'], chunk)
+        Food.recount_comments()
+        self.log(f'Seeded {count} comments.')
+
+    # Orders
+
+    def _order_ids(self, count):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT nextval(pg_get_serial_sequence(%s, %s)) FROM generate_series(1, %s)',
+                [connection.ops.quote_name(Order._meta.db_table), 'id', count],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def seed_orders(self, count, max_items=3):
+        rng = self.rng('orders')
+        order_fields = [
+            'id', 'user', 'restaurant', 'total_price', 'courier_engaged', 'restaurant_engaged', 'distance',
+            'delivery_latitude', 'delivery_longitude', 'geohash', 'status', 'estimated_delivery_time',
+            'created_at', 'updated_at',
+        ]
+        delivered_before = self.end - timedelta(hours=1)
+
+        for first in range(0, count, self.chunk_size):
+            ids = self._order_ids(min(self.chunk_size, count - first))
+            orders, items = [], []
+            for number, order_id in enumerate(ids, start=first):
+                # Orders arrive in time order, each from a user who had already joined.
+                fraction = number / count
+                created_at = self.at(fraction)
+                user_id = self.user_id(rng.randrange(max(1, int(self.users * fraction))))
+                restaurant_id, lat, lng = rng.choice(self.restaurants)
+                delivery_lat, delivery_lng = lat + rng.gauss(0, 0.02), lng + rng.gauss(0, 0.02)
+                food_ids = rng.sample(self.menus[restaurant_id], k=rng.randint(1, max_items))
+                delivered = created_at < delivered_before
+                orders.append((
+                    order_id, user_id, restaurant_id, sum(self.foods[food_id] for food_id in food_ids), False, False,
+                    round(_distance_km(lat, lng, delivery_lat, delivery_lng), 3), delivery_lat, delivery_lng,
+                    geohash.encode(delivery_lat, delivery_lng), 'Delivered' if delivered else 'Pending',
+                    created_at + timedelta(minutes=15), created_at, created_at + timedelta(minutes=15 if delivered else 0),
+                ))
+                items.extend((order_id, food_id, created_at) for food_id in food_ids)
+            copy_rows(Order, order_fields, orders)
+            copy_rows(OrderItem, ['order', 'food', 'created_at'], items)
+            self.log(f'Seeded {first + len(ids)} of {count} orders.')
+
+        rebuild_order_stats(batch_size=self.chunk_size)
+        rebuild_demand_cells(batch_size=self.chunk_size)
+
+    def run(self, users, restaurants, foods, menu_size, ratings, comments, orders):
+        self.seed_users(users)
+        self.seed_restaurants(restaurants)
+        self.seed_foods(foods)
+        self.seed_menus(menu_size)
+        self.seed_ratings(ratings)
+        self.seed_comments(comments)
+        self.seed_orders(orders)
+        invalidate_menu()
+        invalidate_restaurant_menus()
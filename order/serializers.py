@@ -1,10 +1,11 @@
 from rest_framework import serializers
-from .models import Order
+from .models import Order, OrderStats
 from menu.models import Food
-from .utils import find_nearest_restaurant
+from .utils import find_nearest_restaurant_to, geocode_user_address
 from .tasks import engage_restaurant_and_courier
 from django.utils import timezone
 from datetime import timedelta
+from utils import geohash
 
 class OrderCreateSerializer(serializers.ModelSerializer):
     food_item_ids = serializers.ListField(write_only=True)  
@@ -33,17 +34,22 @@ class OrderCreateSerializer(serializers.ModelSerializer):
         user = self.context['request'].user
         address = validated_data.pop('address')
 
-        nearest_restaurant, distance = find_nearest_restaurant(address)
-
-        if not nearest_restaurant:
-            raise serializers.ValidationError({"restaurant": "No restaurant available near the specified location."})
-
         food_item_ids = validated_data.pop('food_item_ids')
-        food_items = Food.objects.filter(id__in=food_item_ids)
+        food_items = list(Food.objects.filter(id__in=food_item_ids))
 
-        if not food_items.exists():
+        if not food_items:
             raise serializers.ValidationError({"food_items": "Invalid or empty food item list provided."})
 
+        user_lat, user_lng = geocode_user_address(address)
+        nearest_restaurant, distance = find_nearest_restaurant_to(
+            user_lat, user_lng, food_ids=[item.id for item in food_items]
+        )
+
+        if not nearest_restaurant:
+            raise serializers.ValidationError(
+                {"restaurant": "No restaurant near the specified location serves all of the requested items."}
+            )
+
         total_price = sum(item.price for item in food_items)
 
         # Create the order
@@ -53,9 +59,12 @@ class OrderCreateSerializer(serializers.ModelSerializer):
             total_price=total_price,
             status='Pending',
             distance=distance,
+            delivery_latitude=user_lat,
+            delivery_longitude=user_lng,
+            geohash=geohash.encode(user_lat, user_lng),
             estimated_delivery_time=timezone.now() + timedelta(minutes=15)
         )
-        order.food_items.set(food_items)
+        order.food_items.set(food_items, through_defaults={'created_at': order.created_at})
 
         # Engage restaurant and courier using Celery task
         engage_restaurant_and_courier.delay(order.id)
@@ -79,3 +88,58 @@ class OrderListSerializer(serializers.ModelSerializer):
     class Meta:
         model = Order
         fields = ['id', 'food_items','restaurant_name', 'distance', 'total_price', 'status', 'created_at', 'updated_at', 'estimated_delivery_time']
+
+
+class OrderExportFilterSerializer(serializers.Serializer):
+    """
+    Validates the filters of an order export.
+    """
+    status = serializers.CharField(required=False)
+    created_after = serializers.DateTimeField(required=False)
+    created_before = serializers.DateTimeField(required=False)
+
+
+class OrderStatsFilterSerializer(serializers.Serializer):
+    """
+    Validates the period and time range of an order statistics query.
+    """
+    period = serializers.ChoiceField(choices=OrderStats.PERIOD_CHOICES, default=OrderStats.DAY)
+    start = serializers.DateTimeField(required=False)
+    end = serializers.DateTimeField(required=False)
+
+    def validate(self, data):
+        if 'start' not in data:
+            data['start'] = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        if 'end' not in data:
+            data['end'] = data['start'] + timedelta(days=1)
+        if data['end'] <= data['start']:
+            raise serializers.ValidationError("end must be after start.")
+        return data
+
+
+class OrderStatsSerializer(serializers.ModelSerializer):
+    restaurant_name = serializers.CharField(source='restaurant.name', read_only=True)
+    average_distance = serializers.ReadOnlyField()
+
+    class Meta:
+        model = OrderStats
+        fields = ['restaurant', 'restaurant_name', 'period', 'bucket', 'orders_created', 'orders_delivered', 'revenue', 'average_distance']
+
+
+class DemandHeatmapFilterSerializer(serializers.Serializer):
+    """
+    Validates the bounding box and time range of a demand heatmap query.
+    """
+    min_lat = serializers.FloatField(min_value=-90, max_value=90)
+    min_lng = serializers.FloatField(min_value=-180, max_value=180)
+    max_lat = serializers.FloatField(min_value=-90, max_value=90)
+    max_lng = serializers.FloatField(min_value=-180, max_value=180)
+    start = serializers.DateTimeField()
+    end = serializers.DateTimeField()
+
+    def validate(self, data):
+        if data['min_lat'] > data['max_lat'] or data['min_lng'] > data['max_lng']:
+            raise serializers.ValidationError("The bounding box minimum must not exceed its maximum.")
+        if data['end'] <= data['start']:
+            raise serializers.ValidationError("end must be after start.")
+        return data
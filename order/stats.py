@@ -0,0 +1,95 @@
+"""
+Incrementally maintained per-restaurant order statistics (see OrderStats).
+"""
+from datetime import timezone as dt_timezone
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDay, TruncHour
+from .models import Order, OrderStats
+
+PERIOD_TRUNCATIONS = {
+    OrderStats.HOUR: TruncHour,
+    OrderStats.DAY: TruncDay,
+}
+STAT_FIELDS = ['orders_created', 'orders_delivered', 'revenue', 'distance_total', 'distance_count']
+
+
+def bucket_start(timestamp, period):
+    """
+    Return the start (UTC) of the hour or day containing ``timestamp``.
+    """
+    timestamp = timestamp.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+    if period == OrderStats.DAY:
+        timestamp = timestamp.replace(hour=0)
+    return timestamp
+
+
+def _increment(order, **deltas):
+    """
+    Add ``deltas`` to the hour and day rows of the order's restaurant, creating
+    the rows if needed. Two statements regardless of how many periods are kept.
+    """
+    buckets = {period: bucket_start(order.created_at, period) for period in PERIOD_TRUNCATIONS}
+    with transaction.atomic():
+        OrderStats.objects.bulk_create(
+            [
+                OrderStats(restaurant_id=order.restaurant_id, period=period, bucket=bucket)
+                for period, bucket in buckets.items()
+            ],
+            ignore_conflicts=True,
+        )
+        rows = Q()
+        for period, bucket in buckets.items():
+            rows |= Q(period=period, bucket=bucket)
+        OrderStats.objects.filter(rows, restaurant_id=order.restaurant_id).update(
+            **{field: F(field) + value for field, value in deltas.items()}
+        )
+
+
+def record_order_created(order):
+    deltas = {'orders_created': 1, 'revenue': order.total_price}
+    if order.distance is not None:
+        deltas.update(distance_total=order.distance, distance_count=1)
+    _increment(order, **deltas)
+
+
+def record_order_delivered(order):
+    _increment(order, orders_delivered=1)
+
+
+def rebuild_order_stats(since=None, batch_size=1000):
+    """
+    Recompute the statistics from the order table, for every bucket starting at
+    or after ``since`` (all history when omitted). Returns the number of rows written.
+    """
+    orders = Order.objects.all()
+    stats = OrderStats.objects.all()
+    if since is not None:
+        since = bucket_start(since, OrderStats.DAY)
+        orders = orders.filter(created_at__gte=since)
+        stats = stats.filter(bucket__gte=since)
+
+    written = 0
+    with transaction.atomic():
+        stats.delete()
+        for period, trunc in PERIOD_TRUNCATIONS.items():
+            rows = (
+                orders.annotate(bucket=trunc('created_at', tzinfo=dt_timezone.utc))
+                .values('restaurant_id', 'bucket')
+                .annotate(
+                    orders_created=Count('id'),
+                    orders_delivered=Count('id', filter=Q(status='Delivered')),
+                    revenue=Sum('total_price'),
+                    distance_total=Sum('distance', default=0),
+                    distance_count=Count('distance'),
+                )
+                .order_by()
+            )
+            batch = []
+            for row in rows.iterator(chunk_size=batch_size):
+                batch.append(OrderStats(period=period, **row))
+                if len(batch) >= batch_size:
+                    written += len(OrderStats.objects.bulk_create(batch))
+                    batch = []
+            written += len(OrderStats.objects.bulk_create(batch))
+    return written
@@ -1,6 +1,11 @@
 import logging
 from celery import shared_task
+from django.db.models import Q
+from utils import retention
 from .models import Order
+from .heatmap import record_order_demand
+from .partitions import create_partitions
+from .stats import record_order_created, record_order_delivered
 
 logger = logging.getLogger(__name__)
 
@@ -12,6 +17,7 @@ def engage_restaurant_and_courier(order_id):
     try:
         order = Order.objects.get(id=order_id)
         restaurant = order.restaurant
+        first_engagement = not order.restaurant_engaged
 
         order.restaurant_engaged = True
         order.courier_engaged = True
@@ -20,6 +26,10 @@ def engage_restaurant_and_courier(order_id):
         restaurant.is_available = False
         restaurant.save()
 
+        if first_engagement:
+            record_order_created(order)
+            record_order_demand(order)
+
         schedule_restaurant_availability.apply_async(args=[order_id], countdown=15 * 60)
         return f"Order {order_id} processed, restaurant and courier engaged"
     except Order.DoesNotExist:
@@ -38,11 +48,34 @@ def schedule_restaurant_availability(order_id):
         restaurant.is_available = True
         restaurant.save()
 
+        already_delivered = order.status == 'Delivered'
         order.restaurant_engaged = False
         order.courier_engaged = False
         order.status = 'Delivered'
         order.save()
 
+        if not already_delivered:
+            record_order_delivered(order)
+
         return f"{restaurant.name} and courier are now available for new order"
     except Order.DoesNotExist:
         logger.error(f"Order {order_id} not found")
+
+
+@shared_task
+def create_order_partitions(months_ahead=3):
+    """
+    Periodically make sure order partitions exist for the coming months.
+    """
+    created = create_partitions(months_ahead=months_ahead)
+    return f"Created {len(created)} order partitions"
+
+
+@shared_task
+def release_delivered_orders():
+    """
+    Periodically clear the engagement flags left set on delivered orders.
+    """
+    stale = Order.objects.filter(status='Delivered').filter(Q(restaurant_engaged=True) | Q(courier_engaged=True))
+    released = retention.update(stale, {'restaurant_engaged': False, 'courier_engaged': False})
+    return f"Released {released} delivered orders"
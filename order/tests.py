@@ -0,0 +1,332 @@
+import json
+from io import StringIO
+from datetime import timedelta
+from django.core.cache import cache
+from django.core.management import call_command
+from django.urls import reverse
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from menu.models import Food
+from restaurants.menus import restaurant_menu_index
+from restaurants.models import Restaurant, RestaurantMenuItem
+from utils import geohash
+from .heatmap import CELL_PRECISION, rebuild_demand_cells, record_order_demand
+from .models import DemandCell, Order, OrderStats
+from .partitions import add_months, archive_partitions, month_start
+from .tasks import release_delivered_orders
+from .stats import STAT_FIELDS, rebuild_order_stats, record_order_created, record_order_delivered
+from .utils import find_nearest_restaurant_to
+
+CustomUser = get_user_model()
+
+
+class OrderTestsSetUp(TestCase):
+    def setUp(self):
+        """
+        Create a user, a geocoded restaurant and a food item for placing orders.
+        """
+        self.user = CustomUser.objects.create_user(email='user@example.com', password='userpass')
+        self.restaurant = Restaurant.objects.create(
+            name="Tri Šešira", address="Skadarska 29, Belgrade, Serbia", latitude=44.8184, longitude=20.4660
+        )
+        self.food = Food.objects.create(name="Ćevapi", price=12.50)
+
+    def create_order(self, created_at=None, location=(44.8125, 20.4612)):
+        order = Order.objects.create(
+            user=self.user,
+            restaurant=self.restaurant,
+            total_price=self.food.price,
+            distance=1.5,
+            delivery_latitude=location[0],
+            delivery_longitude=location[1],
+            geohash=geohash.encode(*location),
+            estimated_delivery_time=timezone.now() + timedelta(minutes=15),
+        )
+        if created_at:
+            Order.objects.filter(pk=order.pk).update(created_at=created_at)
+            order.refresh_from_db()
+        order.food_items.set([self.food], through_defaults={'created_at': order.created_at})
+        return order
+
+
+class OrderRoutingTests(OrderTestsSetUp):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        restaurant_menu_index.clear()
+        self.sarma = Food.objects.create(name="Sarma", price=9.00)
+        self.farther = Restaurant.objects.create(
+            name="Zavičaj", address="Gavrila Principa 77, Belgrade, Serbia", latitude=44.8090, longitude=20.4500
+        )
+        self.restaurant.menu.add(self.food)
+        self.farther.menu.add(self.food, self.sarma)
+        self.location = (44.8180, 20.4650)
+
+    def test_routes_to_nearest_restaurant_serving_all_items(self):
+        """
+        Ensure a closer restaurant that lacks one of the items is skipped.
+        """
+        nearest, _ = find_nearest_restaurant_to(*self.location, food_ids=[self.food.id])
+        self.assertEqual(nearest, self.restaurant)
+
+        nearest, _ = find_nearest_restaurant_to(*self.location, food_ids=[self.food.id, self.sarma.id])
+        self.assertEqual(nearest, self.farther)
+
+    def test_menu_changes_are_picked_up_by_the_index(self):
+        """
+        Ensure marking a menu item unavailable or adding one reroutes subsequent orders.
+        """
+        find_nearest_restaurant_to(*self.location, food_ids=[self.sarma.id])
+        RestaurantMenuItem.objects.get(restaurant=self.farther, food=self.sarma).delete()
+
+        nearest, distance = find_nearest_restaurant_to(*self.location, food_ids=[self.sarma.id])
+        self.assertIsNone(nearest)
+        self.assertEqual(distance, float('inf'))
+
+        self.restaurant.menu.add(self.sarma)
+        nearest, _ = find_nearest_restaurant_to(*self.location, food_ids=[self.sarma.id])
+        self.assertEqual(nearest, self.restaurant)
+
+    def test_backfill_gives_restaurants_without_a_menu_every_available_food(self):
+        """
+        Ensure restaurants created before menus existed serve all available food after the backfill.
+        """
+        Food.objects.create(name="Proja", price=4.00, is_available=False)
+        unlisted = Restaurant.objects.create(
+            name="Kod Dve Bele Goluba", address="Skadarska 34, Belgrade, Serbia", latitude=44.8183, longitude=20.4651
+        )
+        nearest, _ = find_nearest_restaurant_to(*self.location, food_ids=[self.food.id, self.sarma.id])
+        self.assertEqual(nearest, self.farther)
+
+        out = StringIO()
+        call_command('backfill_restaurant_menus', stdout=out)
+
+        self.assertIn('menus of 1 restaurants', out.getvalue())
+        self.assertEqual(set(unlisted.menu.all()), {self.food, self.sarma})
+        self.assertEqual(set(self.restaurant.menu.all()), {self.food})
+        nearest, _ = find_nearest_restaurant_to(*self.location, food_ids=[self.food.id, self.sarma.id])
+        self.assertEqual(nearest, unlisted)
+
+
+class OrderPartitioningTests(OrderTestsSetUp):
+    def partition_of(self, order):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT tableoid::regclass::text FROM order_order WHERE id = %s', [order.pk])
+            return cursor.fetchone()[0]
+
+    def test_new_orders_land_in_monthly_partitions(self):
+        """
+        Ensure converted tables route new orders into the current month's partition.
+        """
+        call_command('partition_orders', '--convert', '--months-ahead', '2', stdout=StringIO())
+
+        order = self.create_order()
+        month = month_start(order.created_at)
+        self.assertEqual(self.partition_of(order), f'order_order_p{month.year:04d}_{month.month:02d}')
+        self.assertEqual(list(order.food_items.all()), [self.food])
+
+    def test_old_partitions_are_archived(self):
+        """
+        Ensure partitions past the retention window are detached from the hot table.
+        """
+        old_order = self.create_order(created_at=timezone.now() - timedelta(days=800))
+        recent_order = self.create_order()
+        call_command('partition_orders', '--convert', stdout=StringIO())
+
+        archived = archive_partitions(add_months(month_start(timezone.now()), -12))
+
+        self.assertIn('order_order_p%04d_%02d' % (old_order.created_at.year, old_order.created_at.month), archived)
+        self.assertEqual(list(Order.objects.values_list('id', flat=True)), [recent_order.id])
+
+
+class OrderExportTests(OrderTestsSetUp):
+    def setUp(self):
+        super().setUp()
+        self.admin_user = CustomUser.objects.create_user(
+            email='admin@example.com', password='adminpass', is_admin=True)
+        self.client.force_login(self.admin_user)
+
+    def test_admin_can_stream_csv_export(self):
+        """
+        Ensure the CSV export streams a header and one row per matching order.
+        """
+        self.create_order()
+        delivered = self.create_order()
+        Order.objects.filter(pk=delivered.pk).update(status='Delivered')
+
+        response = self.client.get(reverse('export_orders', kwargs={'export_format': 'csv'}), {'status': 'Delivered'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0].split(',')[0], 'id')
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[1].startswith(f'{delivered.id},user@example.com'))
+
+    def test_ndjson_export_filters_by_date(self):
+        """
+        Ensure the NDJSON export honours the created_at range.
+        """
+        self.create_order(created_at=timezone.now() - timedelta(days=30))
+        recent = self.create_order()
+
+        response = self.client.get(
+            reverse('export_orders', kwargs={'export_format': 'ndjson'}),
+            {'created_after': (timezone.now() - timedelta(days=1)).isoformat()},
+        )
+
+        records = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual([record['id'] for record in records], [recent.id])
+        self.assertEqual(records[0]['food_items'], ['Ćevapi'])
+
+    def test_non_admin_cannot_export(self):
+        """
+        Ensure regular users cannot export orders.
+        """
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('export_orders', kwargs={'export_format': 'csv'}))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class OrderStatsTests(OrderTestsSetUp):
+    def test_incremental_stats_match_rebuild(self):
+        """
+        Ensure incrementally maintained rows equal a full rebuild from the order table.
+        """
+        first, second = self.create_order(), self.create_order()
+        for order in (first, second):
+            record_order_created(order)
+        Order.objects.filter(pk=first.pk).update(status='Delivered')
+        record_order_delivered(first)
+
+        incremental = list(OrderStats.objects.order_by('period').values('period', *STAT_FIELDS))
+        rebuild_order_stats()
+        rebuilt = list(OrderStats.objects.order_by('period').values('period', *STAT_FIELDS))
+
+        self.assertEqual(incremental, rebuilt)
+        day = OrderStats.objects.get(period=OrderStats.DAY)
+        self.assertEqual((day.orders_created, day.orders_delivered), (2, 1))
+        self.assertEqual(day.revenue, 2 * self.food.price)
+        self.assertEqual(day.average_distance, 1.5)
+
+    def test_admin_reads_todays_stats(self):
+        """
+        Ensure the stats endpoint returns today's precomputed daily rows.
+        """
+        record_order_created(self.create_order())
+        admin = CustomUser.objects.create_user(email='admin@example.com', password='adminpass', is_admin=True)
+        self.client.force_login(admin)
+
+        response = self.client.get(reverse('order_stats'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = response.data['results']['data']
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['restaurant_name'], self.restaurant.name)
+        self.assertEqual(rows[0]['orders_created'], 1)
+
+
+class DemandHeatmapTests(OrderTestsSetUp):
+    def test_heatmap_counts_orders_per_cell_in_bounding_box(self):
+        """
+        Ensure orders are counted per cell and only cells inside the box are returned.
+        """
+        for location in [(44.8125, 20.4612), (44.8125, 20.4612), (45.2671, 19.8335)]:
+            record_order_demand(self.create_order(location=location))
+
+        admin = CustomUser.objects.create_user(email='admin@example.com', password='adminpass', is_admin=True)
+        self.client.force_login(admin)
+        now = timezone.now()
+        response = self.client.get(reverse('demand_heatmap'), {
+            'min_lat': 44.7, 'min_lng': 20.3, 'max_lat': 44.9, 'max_lng': 20.6,
+            'start': (now - timedelta(hours=2)).isoformat(), 'end': (now + timedelta(hours=1)).isoformat(),
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        cells = response.data['data']
+        self.assertEqual(len(cells), 1)
+        self.assertEqual(cells[0]['geohash'], geohash.encode(44.8125, 20.4612, CELL_PRECISION))
+        self.assertEqual(cells[0]['orders'], 2)
+
+    def test_rebuild_matches_incremental_cells(self):
+        """
+        Ensure rebuilding from orders reproduces the incrementally counted cells.
+        """
+        for location in [(44.8125, 20.4612), (45.2671, 19.8335)]:
+            record_order_demand(self.create_order(location=location))
+        incremental = list(DemandCell.objects.order_by('geohash').values('geohash', 'hour', 'order_count'))
+
+        rebuild_demand_cells()
+
+        self.assertEqual(list(DemandCell.objects.order_by('geohash').values('geohash', 'hour', 'order_count')), incremental)
+
+
+class OrderRetentionTests(OrderTestsSetUp):
+    def test_engagement_is_released_for_delivered_orders_only(self):
+        """
+        Ensure the retention job clears the engagement flags of delivered orders in batches.
+        """
+        delivered = [self.create_order() for _ in range(3)]
+        pending = self.create_order()
+        Order.objects.update(restaurant_engaged=True, courier_engaged=True)
+        Order.objects.filter(pk__in=[order.pk for order in delivered]).update(status='Delivered')
+
+        self.assertEqual(release_delivered_orders(), 'Released 3 delivered orders')
+
+        self.assertFalse(Order.objects.filter(status='Delivered', restaurant_engaged=True).exists())
+        pending.refresh_from_db()
+        self.assertTrue(pending.restaurant_engaged and pending.courier_engaged)
+
+
+class DatasetSeedingTests(TestCase):
+    def seed(self):
+        call_command(
+            'seed_dataset', users=50, restaurants=5, foods=20, menu_size=8, ratings=120, comments=30,
+            orders=200, months=2, chunk_size=64, stdout=StringIO(),
+        )
+
+    def test_seeded_dataset_is_consistent(self):
+        """
+        Ensure the seeded tables agree with each other and with the derived counters.
+        """
+        self.seed()
+
+        self.assertEqual(CustomUser.objects.count(), 50)
+        self.assertEqual(Restaurant.objects.count(), 5)
+        self.assertEqual(Order.objects.count(), 200)
+        for order in Order.objects.prefetch_related('food_items')[:20]:
+            menu = set(order.restaurant.menu.values_list('id', flat=True))
+            self.assertTrue({food.id for food in order.food_items.all()} <= menu)
+            self.assertGreaterEqual(order.created_at, order.user.date_joined)
+        food = Food.objects.filter(rating_count__gt=0).first()
+        self.assertEqual(food.rating_count, food.ratings.count())
+        self.assertEqual(sum(Food.objects.values_list('comment_count', flat=True)), 30)
+        day_stats = OrderStats.objects.filter(period=OrderStats.DAY)
+        self.assertEqual(sum(day_stats.values_list('orders_created', flat=True)), 200)
+        self.assertTrue(self.client.login(email='user1@seed.example.com', password='password123'))
+
+    def test_same_seed_gives_same_data(self):
+        """
+        Ensure a second run with the same seed reproduces the same rows.
+        """
+        self.seed()
+        first = list(Order.objects.order_by('id').values_list('user_id', 'total_price', 'geohash', 'created_at'))
+        for model in (Order, Restaurant, Food, CustomUser):
+            model.objects.all().delete()
+
+        self.seed()
+        second = list(Order.objects.order_by('id').values_list('user_id', 'total_price', 'geohash', 'created_at'))
+        self.assertEqual(first, second)
+
+
+class OrderMigrationTests(TestCase):
+    def test_models_match_committed_migrations(self):
+        """
+        Ensure every change to the order models ships with its committed migration.
+        """
+        try:
+            call_command('makemigrations', 'order', check=True, dry_run=True, stdout=StringIO())
+        except SystemExit:
+            self.fail('The order models have changes without a migration; run makemigrations order.')
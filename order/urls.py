@@ -1,8 +1,11 @@
 from django.urls import path
-from .views import OrderCreateView, OrderDetailView, OrderListView
+from .views import OrderCreateView, OrderDetailView, OrderListView, OrderExportView, OrderStatsView, DemandHeatmapView
 
 urlpatterns = [
     path('', OrderCreateView.as_view(), name='create_order'),  
     path('<int:pk>/', OrderDetailView.as_view(), name='order_detail'), 
     path('orders', OrderListView.as_view(), name='list_orders'), 
+    path('orders/export/<str:export_format>', OrderExportView.as_view(), name='export_orders'),
+    path('stats', OrderStatsView.as_view(), name='order_stats'),
+    path('heatmap', DemandHeatmapView.as_view(), name='demand_heatmap'),
 ]
@@ -1,20 +1,43 @@
 from geopy.distance import geodesic
 from .models import Restaurant
+from restaurants.menus import restaurant_menu_index
 from utils.coordinates import get_lat_lng_from_address
 
-def find_nearest_restaurant(user_address):
+def geocode_user_address(user_address):
     """
-    Find the nearest restaurant to the given user address.
+    Resolve the user's address to a (latitude, longitude) pair.
     """
     user_lat, user_lng = get_lat_lng_from_address(user_address)
     
     if user_lat is None or user_lng is None:
         raise ValueError("Could not determine the coordinates for the user's address.")
 
+    return user_lat, user_lng
+
+
+def find_nearest_restaurant(user_address, food_ids=None):
+    """
+    Find the nearest restaurant to the given user address.
+    """
+    return find_nearest_restaurant_to(*geocode_user_address(user_address), food_ids=food_ids)
+
+
+def find_nearest_restaurant_to(user_lat, user_lng, food_ids=None):
+    """
+    Find the nearest available restaurant to the given coordinates. When
+    ``food_ids`` are given, only restaurants serving all of them are considered.
+    """
     nearest_restaurant = None
     shortest_distance = float('inf')  
 
-    for restaurant in Restaurant.objects.filter(is_available=True):
+    restaurants = Restaurant.objects.filter(is_available=True)
+    if food_ids is not None:
+        serving = restaurant_menu_index.restaurants_serving(food_ids)
+        if not serving:
+            return nearest_restaurant, shortest_distance
+        restaurants = restaurants.filter(id__in=serving)
+
+    for restaurant in restaurants:
         restaurant_location = (restaurant.latitude, restaurant.longitude)
         user_location = (user_lat, user_lng)
 
@@ -1,8 +1,22 @@
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from rest_framework import generics, status, filters
 from rest_framework.response import Response
-from .models import Order
+from rest_framework.views import APIView
+from .models import Order, OrderStats
+from .exports import EXPORT_FORMATS, filter_orders, iter_order_records
+from .heatmap import demand_heatmap
 from users.permissions import IsAdmin
-from .serializers import OrderCreateSerializer, OrderDetailSerializer, OrderListSerializer
+from utils.conditional import ConditionalGetMixin, make_etag
+from .serializers import (
+    OrderCreateSerializer,
+    OrderDetailSerializer,
+    OrderListSerializer,
+    OrderExportFilterSerializer,
+    OrderStatsFilterSerializer,
+    OrderStatsSerializer,
+    DemandHeatmapFilterSerializer,
+)
 
 class OrderCreateView(generics.CreateAPIView):
     """
@@ -10,6 +24,7 @@ class OrderCreateView(generics.CreateAPIView):
     """
     queryset = Order.objects.all()
     serializer_class = OrderCreateSerializer
+    query_budget = 8
 
     def create(self, request, *args, **kwargs):
         """
@@ -34,12 +49,25 @@ class OrderCreateView(generics.CreateAPIView):
         }, status=status.HTTP_400_BAD_REQUEST)
 
 
-class OrderDetailView(generics.RetrieveAPIView):
+class OrderDetailView(ConditionalGetMixin, generics.RetrieveAPIView):
     """
     API view for users to check their order details and status.
+    Clients polling for status changes get a 304 while the order is unchanged.
     """
     queryset = Order.objects.all()
     serializer_class = OrderDetailSerializer
+    query_budget = 5
+
+    def get_validators(self, request, *args, **kwargs):
+        """
+        Derive the validators from the order's updated_at without loading the order.
+        """
+        updated_at = Order.objects.filter(
+            id=kwargs.get('pk'), user=request.user
+        ).values_list('updated_at', flat=True).first()
+        if updated_at is None:
+            return None, None
+        return make_etag('order', kwargs.get('pk'), updated_at.isoformat()), updated_at
 
     def retrieve(self, request, *args, **kwargs):
         user = request.user
@@ -75,13 +103,15 @@ class OrderListView(generics.ListAPIView):
     permission_classes = [IsAdmin]
     filter_backends = [filters.SearchFilter]
     search_fields = ['restaurant__name', 'status', 'total_price']  
+    query_budget = 4
 
     def get_queryset(self):
         user = self.request.user
+        queryset = Order.objects.select_related('restaurant').prefetch_related('food_items')
 
         if user.is_admin:
-            return Order.objects.all().order_by('id')
-        return Order.objects.filter(user=user) 
+            return queryset.order_by('id')
+        return queryset.filter(user=user)
 
     def list(self, request, *args, **kwargs):
         """
@@ -107,3 +137,114 @@ class OrderListView(generics.ListAPIView):
             'data': serializer.data
         })
 
+
+class OrderExportView(generics.GenericAPIView):
+    """
+    API view for admins to export orders as a CSV or NDJSON stream.
+    Orders can be filtered by status and a created_at range.
+    """
+    permission_classes = [IsAdmin]
+    serializer_class = OrderExportFilterSerializer
+    query_budget = 3
+
+    def get(self, request, export_format):
+        if export_format not in EXPORT_FORMATS:
+            return Response({
+                'success': False,
+                'status': status.HTTP_404_NOT_FOUND,
+                'error': f'Unsupported export format: {export_format}.',
+                'message': 'Orders can be exported as csv or ndjson.',
+                'data': None
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        serializer = self.get_serializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response({
+                'success': False,
+                'status': status.HTTP_400_BAD_REQUEST,
+                'error': serializer.errors,
+                'message': 'Invalid export filters.',
+                'data': None
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        encode, content_type = EXPORT_FORMATS[export_format]
+        records = iter_order_records(filter_orders(**serializer.validated_data))
+        response = StreamingHttpResponse(encode(records), content_type=content_type)
+        filename = f'orders-{timezone.now():%Y%m%d%H%M%S}.{export_format}'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+class OrderStatsView(generics.ListAPIView):
+    """
+    API view for admins to read pre-aggregated order statistics per restaurant.
+    Defaults to today's daily rows; use period, start and end to pick other buckets.
+    """
+    serializer_class = OrderStatsSerializer
+    permission_classes = [IsAdmin]
+    query_budget = 3
+
+    def get_queryset(self):
+        filters = self.filters
+        return OrderStats.objects.filter(
+            period=filters['period'], bucket__gte=filters['start'], bucket__lt=filters['end']
+        ).select_related('restaurant').order_by('bucket', 'restaurant_id')
+
+    def list(self, request, *args, **kwargs):
+        filter_serializer = OrderStatsFilterSerializer(data=request.query_params)
+        if not filter_serializer.is_valid():
+            return Response({
+                'success': False,
+                'status': status.HTTP_400_BAD_REQUEST,
+                'error': filter_serializer.errors,
+                'message': 'Invalid statistics filters.',
+                'data': None
+            }, status=status.HTTP_400_BAD_REQUEST)
+        self.filters = filter_serializer.validated_data
+
+        queryset = self.get_queryset()
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response({
+                'success': True,
+                'status': status.HTTP_200_OK,
+                'message': 'Order statistics retrieved successfully.',
+                'data': serializer.data
+            })
+
+        serializer = self.get_serializer(queryset, many=True)
+        return Response({
+            'success': True,
+            'status': status.HTTP_200_OK,
+            'message': 'Order statistics retrieved successfully.',
+            'data': serializer.data
+        })
+
+
+class DemandHeatmapView(APIView):
+    """
+    API view for admins to read order demand per geohash cell within a bounding box
+    and time range, served from the pre-aggregated demand cells.
+    """
+    permission_classes = [IsAdmin]
+    query_budget = 2
+
+    def get(self, request):
+        serializer = DemandHeatmapFilterSerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response({
+                'success': False,
+                'status': status.HTTP_400_BAD_REQUEST,
+                'error': serializer.errors,
+                'message': 'Invalid heatmap filters.',
+                'data': None
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'success': True,
+            'status': status.HTTP_200_OK,
+            'error': None,
+            'message': 'Demand heatmap retrieved successfully.',
+            'data': demand_heatmap(**serializer.validated_data)
+        }, status=status.HTTP_200_OK)
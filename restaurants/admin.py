@@ -1,5 +1,14 @@
 from django.contrib import admin
-from .models import Restaurant
+from .models import Restaurant, RestaurantMenuItem
 # Register your models here.
 
-admin.site.register(Restaurant)
\ No newline at end of file
+
+class RestaurantMenuItemInline(admin.TabularInline):
+    model = RestaurantMenuItem
+    extra = 0
+    raw_id_fields = ['food']
+
+
+@admin.register(Restaurant)
+class RestaurantAdmin(admin.ModelAdmin):
+    inlines = [RestaurantMenuItemInline]
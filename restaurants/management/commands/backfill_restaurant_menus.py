@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from restaurants.menus import backfill_menus
+
+
+class Command(BaseCommand):
+    help = 'Gives every restaurant without a menu all currently available foods'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='Restaurants per INSERT.')
+
+    def handle(self, *args, **options):
+        filled = backfill_menus(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Added the available foods to the menus of {filled} restaurants.'))
@@ -0,0 +1,101 @@
+"""
+Inverted index from food id to the restaurants that currently serve it.
+
+Routing an order intersects the restaurant sets of its items (smallest first)
+before the distance search, instead of checking every candidate's menu. Each
+process keeps the index in memory and reloads it when the menu version in the
+shared cache changes, which signals bump on every menu item change
+(see restaurants/signals.py).
+"""
+import threading
+from collections import defaultdict
+from utils import metrics
+from utils.versioning import bump_version_on_change, get_version
+from .models import Restaurant, RestaurantMenuItem
+
+VERSION_KEY = 'restaurants:menu-version'
+
+
+def invalidate_restaurant_menus():
+    bump_version_on_change(VERSION_KEY)
+
+
+def backfill_menus(batch_size=100):
+    """
+    Put every available food on the menu of each restaurant that has no menu yet,
+    which is how orders were routed before restaurants had menus. Restaurants are
+    handled ``batch_size`` at a time. Returns the number of restaurants given a menu.
+    """
+    from menu.models import Food
+
+    food_ids = list(Food.objects.filter(is_available=True).values_list('id', flat=True))
+    if not food_ids:
+        return 0
+    restaurant_ids = list(
+        Restaurant.objects.filter(menu_items__isnull=True).order_by('id').values_list('id', flat=True)
+    )
+    for start in range(0, len(restaurant_ids), batch_size):
+        RestaurantMenuItem.objects.bulk_create(
+            [
+                RestaurantMenuItem(restaurant_id=restaurant_id, food_id=food_id)
+                for restaurant_id in restaurant_ids[start:start + batch_size]
+                for food_id in food_ids
+            ],
+            ignore_conflicts=True,
+        )
+    if restaurant_ids:
+        invalidate_restaurant_menus()
+    return len(restaurant_ids)
+
+
+class RestaurantMenuIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._restaurants_by_food = {}
+        self._version = None
+
+    def clear(self):
+        with self._lock:
+            self._restaurants_by_food = {}
+            self._version = None
+
+    def _load(self):
+        restaurants_by_food = defaultdict(list)
+        items = RestaurantMenuItem.objects.filter(is_available=True).values_list('food_id', 'restaurant_id')
+        for food_id, restaurant_id in items.iterator(chunk_size=5000):
+            restaurants_by_food[food_id].append(restaurant_id)
+        return {food_id: frozenset(ids) for food_id, ids in restaurants_by_food.items()}
+
+    def get_mapping(self):
+        """
+        Return the current ``{food_id: frozenset(restaurant ids)}`` mapping,
+        reloading it if the menu version moved on.
+        """
+        version = get_version(VERSION_KEY)
+        with self._lock:
+            if self._version == version:
+                metrics.increment('restaurant_menu_index.hits')
+                return self._restaurants_by_food
+        metrics.increment('restaurant_menu_index.reloads')
+        restaurants_by_food = self._load()
+        with self._lock:
+            self._restaurants_by_food, self._version = restaurants_by_food, version
+        return restaurants_by_food
+
+    def restaurants_serving(self, food_ids):
+        """
+        Return the ids of the restaurants serving every one of ``food_ids``.
+        """
+        mapping = self.get_mapping()
+        candidates = sorted((mapping.get(food_id, frozenset()) for food_id in set(food_ids)), key=len)
+        if not candidates:
+            return frozenset()
+        restaurants = candidates[0]
+        for serving in candidates[1:]:
+            if not restaurants:
+                break
+            restaurants = restaurants & serving
+        return restaurants
+
+
+restaurant_menu_index = RestaurantMenuIndex()
@@ -11,6 +11,7 @@ class Restaurant(models.Model):
     is_available = models.BooleanField(default=True)
     latitude = models.FloatField(blank=True, null=True) 
     longitude = models.FloatField(blank=True, null=True) 
+    menu = models.ManyToManyField('menu.Food', through='RestaurantMenuItem', related_name='restaurants', blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -25,3 +26,19 @@ class Restaurant(models.Model):
         if not self.latitude or not self.longitude:
             self.latitude, self.longitude = get_lat_lng_from_address(self.address)
         super(Restaurant, self).save(*args, **kwargs)
+
+
+class RestaurantMenuItem(models.Model):
+    """
+    A food item on a restaurant's menu, and whether the restaurant can currently make it.
+    """
+    restaurant = models.ForeignKey(Restaurant, related_name='menu_items', on_delete=models.CASCADE)
+    food = models.ForeignKey('menu.Food', related_name='restaurant_menu_items', on_delete=models.CASCADE)
+    is_available = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('restaurant', 'food')
+
+    def __str__(self):
+        return f'{self.food} at {self.restaurant}'
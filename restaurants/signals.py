@@ -0,0 +1,15 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from .menus import invalidate_restaurant_menus
+from .models import RestaurantMenuItem
+
+
+@receiver([post_save, post_delete], sender=RestaurantMenuItem)
+def invalidate_menu_index(sender, **kwargs):
+    invalidate_restaurant_menus()
+
+
+@receiver(m2m_changed, sender=RestaurantMenuItem)
+def invalidate_menu_index_on_m2m_change(sender, action, **kwargs):
+    if action.startswith('post_'):
+        invalidate_restaurant_menus()
@@ -5,6 +5,7 @@ from rest_framework.pagination import PageNumberPagination
 from .models import Restaurant
 from .serializers import RestaurantSerializer
 from users.permissions import IsAdmin  
+from utils.conditional import ConditionalGetMixin, make_etag
 
 class RestaurantListCreateView(generics.ListCreateAPIView):
     """
@@ -14,6 +15,7 @@ class RestaurantListCreateView(generics.ListCreateAPIView):
     serializer_class = RestaurantSerializer
     permission_classes = [IsAuthenticated, IsAdmin]
     pagination_class = PageNumberPagination
+    query_budget = {'GET': 3, 'POST': 2}
 
     def list(self, request, *args, **kwargs):
         """
@@ -64,13 +66,25 @@ class RestaurantListCreateView(generics.ListCreateAPIView):
         }, status=status.HTTP_400_BAD_REQUEST)
 
 
-class RestaurantDetailView(generics.RetrieveUpdateDestroyAPIView):
+class RestaurantDetailView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     API view to retrieve, update, or delete a specific restaurant by ID. Only admins can perform updates or deletes.
     """
     queryset = Restaurant.objects.all()
     serializer_class = RestaurantSerializer
     permission_classes = [IsAuthenticated, IsAdmin]
+    query_budget = {'GET': 3, 'PATCH': 3, 'DELETE': 6}
+
+    def get_validators(self, request, *args, **kwargs):
+        """
+        Derive the validators from the restaurant's updated_at.
+        """
+        updated_at = Restaurant.objects.filter(
+            pk=kwargs.get('pk')
+        ).values_list('updated_at', flat=True).first()
+        if updated_at is None:
+            return None, None
+        return make_etag('restaurant', kwargs.get('pk'), updated_at.isoformat()), updated_at
 
     def retrieve(self, request, *args, **kwargs):
         """
@@ -1,6 +1,5 @@
 from django.contrib import admin
-from .models import CustomUser, PasswordReset
+from .models import CustomUser
 
 # Register your models here.
 admin.site.register(CustomUser)
-admin.site.register(PasswordReset)
\ No newline at end of file
@@ -0,0 +1,111 @@
+"""
+JWT authentication that resolves users through a two-level cache.
+
+Users are looked up in a short-lived in-process LRU first, then in the shared
+cache and only then in the database. Saving or deleting a user (which includes
+password resets) drops both entries for this process and the shared one (see
+users/signals.py); other processes may serve their local copy for up to
+``LOCAL_TTL`` seconds.
+
+With ``settings.JWT_TRUST_TOKEN_CLAIMS`` enabled, requests whose access token
+carries the user's ``is_admin`` and ``email`` claims are authenticated from the
+signed token alone, without any lookup. Such a user is a detached CustomUser
+instance that only has those fields set, and role changes only take effect on
+the next login, so the option is off by default.
+"""
+import copy
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import get_md5_hash_password
+from utils import metrics
+from utils.ttl_cache import TTLCache
+
+LOCAL_TTL = 10
+SHARED_TTL = 300
+TRUSTED_CLAIMS = ('is_admin', 'email')
+
+_local_users = TTLCache(maxsize=4096, ttl=LOCAL_TTL)
+
+
+def _shared_key(user_id):
+    return f'users:auth:{user_id}'
+
+
+def forget_user(user_id):
+    """
+    Drop the cached copies of a user, e.g. after it was saved or deleted.
+    """
+    _local_users.delete(str(user_id))
+    cache.delete(_shared_key(user_id))
+
+
+def tokens_for_user(user):
+    """
+    Issue a refresh token (and its access token) carrying the claims that
+    trusted-claims authentication reads.
+    """
+    refresh = RefreshToken.for_user(user)
+    refresh['is_admin'] = user.is_admin
+    refresh['email'] = user.email
+    return refresh
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        try:
+            user_id = str(validated_token[api_settings.USER_ID_CLAIM])
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        if getattr(settings, 'JWT_TRUST_TOKEN_CLAIMS', False) and all(
+            claim in validated_token for claim in TRUSTED_CLAIMS
+        ):
+            return self.get_token_user(user_id, validated_token)
+
+        user = self.get_cached_user(user_id)
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
+
+    def get_cached_user(self, user_id):
+        user = _local_users.get(user_id)
+        if user is None:
+            user = cache.get(_shared_key(user_id))
+            if user is None:
+                metrics.increment('auth_user_cache.misses')
+                try:
+                    # The password hash is left out of the caches; it is loaded on access.
+                    user = self.user_model.objects.defer('password').get(**{api_settings.USER_ID_FIELD: user_id})
+                except self.user_model.DoesNotExist:
+                    raise AuthenticationFailed(_("User not found"), code="user_not_found")
+                cache.set(_shared_key(user_id), user, SHARED_TTL)
+            else:
+                metrics.increment('auth_user_cache.shared_hits')
+            _local_users.set(user_id, user)
+        else:
+            metrics.increment('auth_user_cache.local_hits')
+        # Hand out a copy, so a request changing its user cannot affect the cached one.
+        return copy.copy(user)
+
+    def get_token_user(self, user_id, validated_token):
+        user = get_user_model()(
+            **{api_settings.USER_ID_FIELD: user_id},
+            email=validated_token['email'],
+            is_admin=validated_token['is_admin'],
+            is_active=True,
+        )
+        user._state.adding = False
+        user._state.db = 'default'
+        return user
@@ -1,5 +1,7 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.backends import ModelBackend
+from django.core.exceptions import PermissionDenied
+from .hashing import check_password, run_dummy_check
 
 CustomUser = get_user_model()
 
@@ -9,11 +11,18 @@ class EmailBackend(ModelBackend):
     """
 
     def authenticate(self, request, email=None, password=None, **kwargs):
+        if email is None:
+            return None  # e.g. the admin login form, handled by ModelBackend
+
+        # Passwords are hashed on the bounded pool, which raises HashingBusy when
+        # saturated. Failures raise PermissionDenied so that ModelBackend does not
+        # hash the same password again on the request thread.
         try:
             user = CustomUser.objects.get(email=email)
         except CustomUser.DoesNotExist:
-            return None
+            run_dummy_check(password)
+            raise PermissionDenied
 
-        if user.check_password(password):
+        if check_password(user, password) and self.user_can_authenticate(user):
             return user  
-        return None 
\ No newline at end of file
+        raise PermissionDenied 
\ No newline at end of file
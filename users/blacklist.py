@@ -0,0 +1,148 @@
+"""
+Bloom filter fast path for refresh token blacklist checks.
+
+Every process keeps a Bloom filter of the JTIs in simplejwt's blacklist. A JTI
+the filter does not contain is definitely not blacklisted, so the refresh skips
+the database; only possible hits (blacklisted tokens and rare false positives)
+are verified against the blacklist table.
+
+The filter is built from the table on first use. Afterwards, every blacklist
+insert, once committed, takes the next number of a counter in the shared cache
+and stores its JTI under that number (see users/signals.py), so other processes
+catch up by reading the new entries from the cache rather than the table. A
+missing entry (evicted, or a writer in between the two steps), a gap too large
+to replay, a purge of expired tokens or outgrowing the filter's capacity
+triggers a rebuild. Numbers are only taken after the commit, so the table a
+rebuild reads already holds every row numbered up to the counter it saw.
+"""
+import hashlib
+import math
+import threading
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+from utils import retention
+from utils.versioning import bump_version, get_version
+
+GENERATION_KEY = 'users:blacklist-generation'
+REBUILD_KEY = 'users:blacklist-rebuild'
+ENTRY_KEY = 'users:blacklisted:{}'
+ENTRY_TIMEOUT = 60 * 60
+MAX_REPLAY = 1000
+ERROR_RATE = 0.001
+MIN_CAPACITY = 10000
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate=ERROR_RATE):
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        # Double hashing: the i-th position is h1 + i * h2.
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class BlacklistFilter:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._bloom = None
+        self._generation = None
+        self._rebuild = None
+
+    def _replay(self, first, last):
+        """
+        Add the cached entries numbered ``first`` to ``last``; returns False if any is missing.
+        """
+        keys = [ENTRY_KEY.format(number) for number in range(first, last + 1)]
+        entries = cache.get_many(keys)
+        for jti in entries.values():
+            self._bloom.add(jti)
+        return len(entries) == len(keys)
+
+    def _build(self):
+        count = BlacklistedToken.objects.count()
+        self._bloom = BloomFilter(max(MIN_CAPACITY, count * 2))
+        for jti in BlacklistedToken.objects.values_list('token__jti', flat=True).iterator(chunk_size=5000):
+            self._bloom.add(jti)
+
+    def refresh(self):
+        """
+        Bring the filter up to date with the blacklist if it changed.
+        """
+        generation, rebuild = get_version(GENERATION_KEY), get_version(REBUILD_KEY)
+        with self._lock:
+            if generation == self._generation and rebuild == self._rebuild:
+                return
+            if (
+                self._bloom is None
+                or rebuild != self._rebuild
+                or not 0 < generation - self._generation <= MAX_REPLAY
+                or not self._replay(self._generation + 1, generation)
+                or self._bloom.count > self._bloom.capacity
+            ):
+                self._build()
+            self._generation, self._rebuild = generation, rebuild
+
+    def might_contain(self, jti):
+        self.refresh()
+        return jti in self._bloom
+
+    def add(self, jti):
+        with self._lock:
+            if self._bloom is not None:
+                self._bloom.add(jti)
+
+
+blacklist_filter = BlacklistFilter()
+
+
+def _publish(jti):
+    cache.set(ENTRY_KEY.format(bump_version(GENERATION_KEY)), jti, ENTRY_TIMEOUT)
+
+
+def record_blacklisted(jti):
+    """
+    Add a newly blacklisted JTI to this process's filter at once, and publish it
+    to the filters of the other processes once its row is committed.
+    """
+    # Adding a JTI whose row is then rolled back only costs a database check.
+    blacklist_filter.add(jti)
+    transaction.on_commit(lambda: _publish(jti))
+
+
+class FastBlacklistRefreshToken(RefreshToken):
+    """
+    Refresh token whose blacklist check consults the Bloom filter first.
+    """
+    def check_blacklist(self):
+        if blacklist_filter.might_contain(self.payload[api_settings.JTI_CLAIM]):
+            super().check_blacklist()
+
+
+def purge_expired_tokens(batch_size=retention.DEFAULT_BATCH_SIZE, pause=retention.DEFAULT_PAUSE):
+    """
+    Delete expired outstanding tokens (and, by cascade, their blacklist entries)
+    in batches. Returns the number of outstanding tokens deleted.
+    """
+    expired = OutstandingToken.objects.filter(expires_at__lt=timezone.now())
+    purged = retention.purge(expired, batch_size=batch_size, pause=pause)
+    if purged:
+        bump_version(REBUILD_KEY)
+    return purged
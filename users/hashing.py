@@ -0,0 +1,74 @@
+"""
+Password verification on a bounded thread pool.
+
+PBKDF2 is deliberately slow, and a burst of login attempts hashing on request
+threads would occupy every worker. Verification runs on at most ``MAX_WORKERS``
+threads (hashlib releases the GIL while hashing) with at most ``MAX_PENDING``
+further checks waiting; beyond that, ``HashingBusy`` is raised at once so the
+view can answer 429 instead of queueing, and other traffic keeps its threads.
+"""
+import functools
+import threading
+from concurrent import futures
+from django.contrib.auth import hashers
+
+MAX_WORKERS = 2
+MAX_PENDING = 8
+WAIT_TIMEOUT = 5
+
+_executor = futures.ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='password-hashing')
+_slots = threading.BoundedSemaphore(MAX_WORKERS + MAX_PENDING)
+
+
+class HashingBusy(Exception):
+    """
+    Raised when too many password checks are already running or queued.
+    """
+
+
+def _verify(raw_password, encoded):
+    needs_rehash = []
+    valid = hashers.check_password(raw_password, encoded, setter=lambda raw: needs_rehash.append(True))
+    return valid, bool(needs_rehash)
+
+
+def _run(raw_password, encoded):
+    if not _slots.acquire(blocking=False):
+        raise HashingBusy()
+    try:
+        future = _executor.submit(_verify, raw_password, encoded)
+    except BaseException:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+
+    try:
+        return future.result(timeout=WAIT_TIMEOUT)
+    except futures.TimeoutError:  # Not the builtin TimeoutError before Python 3.11
+        raise HashingBusy()
+
+
+def check_password(user, raw_password):
+    """
+    Verify ``raw_password`` against ``user``'s stored hash on the hashing pool,
+    upgrading the stored hash (on the calling thread) when the hasher settings
+    changed. Raises HashingBusy when the pool is saturated.
+    """
+    valid, needs_rehash = _run(raw_password, user.password)
+    if valid and needs_rehash:
+        user.set_password(raw_password)
+        user.save(update_fields=['password'])
+    return valid
+
+
+@functools.cache
+def _dummy_hash():
+    return hashers.make_password('not-a-real-password')
+
+
+def run_dummy_check(raw_password):
+    """
+    Spend the same hashing time as a real check, so that unknown accounts cannot
+    be told apart by response time.
+    """
+    _run(raw_password, _dummy_hash())
@@ -0,0 +1,49 @@
+import time
+import uuid
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from utils.uuid7 import uuid7
+
+KEY_GENERATORS = {
+    'uuid4': uuid.uuid4,
+    'uuid7': uuid7,
+}
+
+
+class Command(BaseCommand):
+    help = 'Compares insert throughput and primary key index size of uuid4 and uuid7 keys (PostgreSQL)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000)
+        parser.add_argument('--batch-size', type=int, default=10_000)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('The key benchmark needs PostgreSQL.')
+
+        for name, generate in KEY_GENERATORS.items():
+            elapsed, index_size = self.run(generate, options['rows'], options['batch_size'])
+            self.stdout.write(
+                f'{name}: {options["rows"] / elapsed:,.0f} rows/s, '
+                f'primary key index {index_size / 1024 / 1024:,.1f} MiB'
+            )
+        self.stdout.write(self.style.SUCCESS('Key benchmark finished.'))
+
+    def run(self, generate, rows, batch_size):
+        """
+        Insert ``rows`` keys into a scratch table shaped like the user table's key
+        and return the elapsed seconds and the size of its primary key index.
+        """
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                'CREATE TEMPORARY TABLE benchmark_user_keys ('
+                'id uuid PRIMARY KEY, joined_at timestamptz NOT NULL DEFAULT now()) ON COMMIT DROP'
+            )
+            elapsed = 0
+            for start in range(0, rows, batch_size):
+                keys = [generate() for _ in range(min(batch_size, rows - start))]
+                began = time.perf_counter()
+                cursor.execute('INSERT INTO benchmark_user_keys (id) SELECT unnest(%s::uuid[])', [keys])
+                elapsed += time.perf_counter() - began
+            cursor.execute("SELECT pg_relation_size('benchmark_user_keys_pkey')")
+            return elapsed, cursor.fetchone()[0]
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from users.blacklist import purge_expired_tokens
+from utils.retention import DEFAULT_BATCH_SIZE, DEFAULT_PAUSE
+
+
+class Command(BaseCommand):
+    help = 'Deletes expired outstanding refresh tokens and their blacklist entries in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--pause', type=float, default=DEFAULT_PAUSE, help='Seconds to sleep between batches.')
+
+    def handle(self, *args, **options):
+        purged = purge_expired_tokens(batch_size=options['batch_size'], pause=options['pause'])
+        self.stdout.write(self.style.SUCCESS(f'Purged {purged} expired tokens.'))
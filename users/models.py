@@ -1,7 +1,6 @@
-import uuid
-import random
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.db import models
+from utils.uuid7 import uuid7
 
 class CustomUserManager(BaseUserManager):
     def create_user(self, email, password=None, **extra_fields):
@@ -38,8 +37,9 @@ class CustomUser(AbstractUser):
     """
     Custom user model that overrides the default username field and uses email for authentication.
     Includes fields like first_name, last_name, email, and is_admin to distinguish admin users.
+    Primary keys are time-ordered UUIDs, so new users are appended to the key indexes.
     """
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     email = models.EmailField(unique=True)
     first_name = models.CharField(max_length=30, blank=True)
     last_name = models.CharField(max_length=30, blank=True)
@@ -73,23 +73,3 @@ class CustomUser(AbstractUser):
         help_text='Specific permissions for this user.',
         verbose_name='user permissions',
     )
-
-
-class PasswordReset(models.Model):
-    """
-    Model to store OTPs for password reset and track their expiration.
-    """
-    user = models.OneToOneField(CustomUser, on_delete=models.CASCADE)
-    otp = models.CharField(max_length=6)
-    timestamp = models.DateTimeField(auto_now=True)
-
-    def generate_otp(self):
-        """
-        Generate a random 6-digit OTP.
-        """
-        self.otp = random.randint(100000, 999999)
-        self.save()
-
-    def __str__(self):
-        return f"{self.user.email} - {self.otp}"
-    
@@ -0,0 +1,34 @@
+"""
+One-time passwords for password resets, kept in the cache with a TTL.
+
+Issuing an OTP is a single cache write that replaces any previous one, and
+verifying compares in constant time and consumes the OTP, so each can only be
+used once.
+"""
+import hmac
+import secrets
+from django.core.cache import cache
+
+OTP_TTL = 10 * 60
+OTP_DIGITS = 6
+
+
+def _key(user):
+    return f'users:password-reset-otp:{user.pk}'
+
+
+def issue_otp(user):
+    otp = f'{secrets.randbelow(10 ** OTP_DIGITS):0{OTP_DIGITS}d}'
+    cache.set(_key(user), otp, OTP_TTL)
+    return otp
+
+
+def verify_otp(user, otp):
+    """
+    Return True and consume the user's OTP if ``otp`` matches it.
+    """
+    stored = cache.get(_key(user))
+    if stored is None or not hmac.compare_digest(stored.encode(), str(otp).encode()):
+        return False
+    cache.delete(_key(user))
+    return True
@@ -1,13 +1,13 @@
 from rest_framework import serializers
 from .models import CustomUser
 from rest_framework.exceptions import ValidationError
-from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer as BaseTokenRefreshSerializer
 from rest_framework.validators import UniqueValidator
-from django.core.mail import send_mail
-from django.utils import timezone
-from datetime import timedelta
-from .models import PasswordReset
+from django.db import transaction
+from .blacklist import FastBlacklistRefreshToken
+from .otp import issue_otp, verify_otp
+from .tasks import send_password_reset_otp
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -82,39 +82,29 @@ class LogoutSerializer(serializers.Serializer):
         Blacklist the provided refresh token to invalidate it for future use.
         """
         try:
-            RefreshToken(self.token).blacklist()
+            FastBlacklistRefreshToken(self.token).blacklist()
         except TokenError:
             raise ValidationError('Token is invalid or expired!')
 
 
+class TokenRefreshSerializer(BaseTokenRefreshSerializer):
+    """
+    Serializer for exchanging a refresh token for a new access (and rotated refresh) token.
+    """
+    token_class = FastBlacklistRefreshToken
+
+
 class PasswordResetRequestSerializer(serializers.Serializer):
     """
     Serializer to handle password reset requests and OTP generation.
     """
     email = serializers.EmailField()
 
-    def create_otp(self, user):
-        """
-        Create or update an OTP for the user.
-        """
-        otp_entry, created = PasswordReset.objects.update_or_create(user=user)
-        if not created:
-            otp_entry.timestamp = timezone.now()
-            otp_entry.save() 
-        otp_entry.generate_otp()
-        return otp_entry
-
     def send_otp_email(self, otp, email):
         """
-        Send OTP to the user's email.
+        Send OTP to the user's email from a Celery worker, once the request commits.
         """
-        send_mail(
-            'Password Reset OTP',
-            f'Your OTP for resetting your password is: {otp}',
-            'no-reply@fooddelivery.com',
-            [email],
-            fail_silently=False,
-        )
+        transaction.on_commit(lambda: send_password_reset_otp.delay(email, otp))
 
     def save(self):
         """
@@ -127,11 +117,11 @@ class PasswordResetRequestSerializer(serializers.Serializer):
         except CustomUser.DoesNotExist:
             raise serializers.ValidationError("No user is associated with this email address.")
 
-        # Generate OTP and send email
-        otp_entry = self.create_otp(user)
-        self.send_otp_email(otp_entry.otp, user.email)
+        # Generate OTP (valid for 10 minutes) and send email
+        otp = issue_otp(user)
+        self.send_otp_email(otp, user.email)
 
-        return {'email': email, 'OTP': otp_entry.otp}
+        return {'email': email, 'OTP': otp}
 
 
 class PasswordResetSerializer(serializers.Serializer):
@@ -151,13 +141,9 @@ class PasswordResetSerializer(serializers.Serializer):
         except CustomUser.DoesNotExist:
             raise serializers.ValidationError("Invalid email address.")
         
-        try:
-            otp_entry = PasswordReset.objects.get(user=user, otp=data['otp'])
-        except PasswordReset.DoesNotExist:
-            raise serializers.ValidationError("Invalid OTP or token.")
-
-        if timezone.now() > otp_entry.timestamp + timedelta(minutes=10):
-            raise serializers.ValidationError("OTP has expired.")
+        # Expired OTPs are evicted from the cache, so they fail like wrong ones
+        if not verify_otp(user, data['otp']):
+            raise serializers.ValidationError("Invalid or expired OTP.")
 
         data['user'] = user
         
@@ -0,0 +1,58 @@
+import logging
+import threading
+from celery import shared_task
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from .blacklist import purge_expired_tokens as purge_tokens
+
+logger = logging.getLogger(__name__)
+
+_connection = None
+_connection_lock = threading.Lock()
+
+
+def send_messages(messages):
+    """
+    Send ``messages`` over the worker's long-lived mail connection, reopening it
+    once if the server dropped it while idle.
+    """
+    global _connection
+    with _connection_lock:
+        for attempt in range(2):
+            if _connection is None:
+                _connection = get_connection()
+                _connection.open()
+            try:
+                return _connection.send_messages(messages)
+            except OSError:  # Includes SMTPServerDisconnected
+                _connection.close()
+                _connection = None
+                if attempt:
+                    raise
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=30)
+def send_password_reset_otp(self, email, otp):
+    """
+    Email a password reset OTP to the user.
+    """
+    message = EmailMessage(
+        'Password Reset OTP',
+        f'Your OTP for resetting your password is: {otp}',
+        settings.DEFAULT_FROM_EMAIL,
+        [email],
+    )
+    try:
+        send_messages([message])
+    except Exception as exc:
+        logger.warning(f"Sending the password reset OTP to {email} failed: {exc}")
+        raise self.retry(exc=exc)
+
+
+@shared_task
+def purge_expired_tokens():
+    """
+    Periodically delete expired refresh tokens and their blacklist entries.
+    """
+    purged = purge_tokens()
+    return f"Purged {purged} expired tokens"
@@ -1,8 +1,27 @@
+import threading
+import time
+import uuid
+from concurrent import futures
+from unittest import mock
 from django.urls import reverse
 from rest_framework.test import APITestCase
 from rest_framework import status
 from django.contrib.auth import get_user_model
-from .models import PasswordReset
+from datetime import timedelta
+from django.core import mail
+from django.core.management import call_command
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from utils.ratelimit import TokenBucket
+from utils.uuid7 import uuid7, uuid7_time
+from .authentication import _local_users
+from utils.versioning import get_version
+from .blacklist import GENERATION_KEY, BlacklistFilter, BloomFilter, blacklist_filter
+from .tasks import send_password_reset_otp
 
 CustomUser = get_user_model()
 
@@ -11,6 +30,7 @@ class UserTestsSetUp(APITestCase):
         """
         Create test user data to use across all test cases.
         """
+        cache.clear()
         self.user_data = {
             "email": "testuser@example.com",
             "first_name": "Test",
@@ -35,6 +55,22 @@ class UserTestsSetUp(APITestCase):
         }
 
 
+class UserKeyTests(UserTestsSetUp):
+    def test_user_ids_are_time_ordered_uuids(self):
+        """
+        Ensure new users get version 7 UUIDs that sort in creation order.
+        """
+        keys = [uuid7() for _ in range(10000)]
+        self.assertEqual(keys, sorted(keys))
+        self.assertTrue(all(key.version == 7 and key.variant == uuid.RFC_4122 for key in keys))
+        self.assertAlmostEqual(uuid7_time(keys[-1]), time.time(), delta=5)
+
+        first = CustomUser.objects.create_user(email='first@example.com', password='password123')
+        second = CustomUser.objects.create_user(email='second@example.com', password='password123')
+        self.assertEqual(first.id.version, 7)
+        self.assertLess(first.id, second.id)
+
+
 class UserRegistrationViewTests(UserTestsSetUp):
     def test_user_registration(self):
         """
@@ -89,8 +125,7 @@ class PasswordResetViewTests(UserTestsSetUp):
         self.client.post(reverse('register'), self.user_data)
         response = self.client.post(reverse('password_reset_request'), {"email": self.user_data['email']})
 
-        otp_entry = PasswordReset.objects.get(user__email=self.user_data['email'])
-        otp = otp_entry.otp 
+        otp = response.data['data']['OTP']
 
         reset_data = {
             "email": self.user_data['email'],
@@ -102,5 +137,216 @@ class PasswordResetViewTests(UserTestsSetUp):
         self.assertTrue(reset_response.data['success'])
         self.assertEqual(reset_response.data['message'], "Password reset successful.")
 
+    def test_otp_is_single_use_and_compared_exactly(self):
+        """
+        Ensure a wrong OTP is rejected and a correct one cannot be used twice.
+        """
+        self.client.post(reverse('register'), self.user_data)
+        otp = self.client.post(reverse('password_reset_request'), {"email": self.user_data['email']}).data['data']['OTP']
+        reset_data = {"email": self.user_data['email'], "new_password": "newpassword123"}
+
+        wrong_otp = f'{(int(otp) + 1) % 1000000:06d}'
+        response = self.client.post(reverse('password_reset_verify'), {**reset_data, "otp": wrong_otp})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(reverse('password_reset_verify'), {**reset_data, "otp": otp})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.post(reverse('password_reset_verify'), {**reset_data, "otp": otp})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_otp_email_is_sent_by_celery_task_after_commit(self):
+        """
+        Ensure the request only enqueues the OTP email, which the task then sends.
+        """
+        self.client.post(reverse('register'), self.user_data)
+        with mock.patch.object(send_password_reset_otp, 'delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(reverse('password_reset_request'), {"email": self.user_data['email']})
+        otp = response.data['data']['OTP']
+        delay.assert_called_once_with(self.user_data['email'], otp)
+        self.assertEqual(mail.outbox, [])
+
+        send_password_reset_otp(self.user_data['email'], otp)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn(otp, mail.outbox[0].body)
+
+
+class CachedJWTAuthenticationTests(UserTestsSetUp):
+    def setUp(self):
+        super().setUp()
+        _local_users.clear()
+        self.client.post(reverse('register_admin'), self.admin_data)
+        login = self.client.post(reverse('login'), {"email": self.admin_data['email'], "password": "password123"})
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {login.data['data']['access']}")
+        self.admin_only_url = reverse('food_cache_stats')
+
+    def user_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.admin_only_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [query for query in context.captured_queries if 'users_customuser' in query['sql']]
+
+    def test_user_is_loaded_once_then_served_from_cache(self):
+        """
+        Ensure only the first authenticated request loads the user row.
+        """
+        self.assertEqual(len(self.user_queries()), 1)
+        self.assertEqual(self.user_queries(), [])
+
+        _local_users.clear()
+        self.assertEqual(self.user_queries(), [], 'shared cache should cover a cold process cache')
+
+    def test_saving_user_invalidates_cached_user(self):
+        """
+        Ensure revoking admin rights takes effect on the next request.
+        """
+        self.user_queries()
+        user = CustomUser.objects.get(email=self.admin_data['email'])
+        user.is_admin = False
+        user.save()
+
+        response = self.client.get(self.admin_only_url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(JWT_TRUST_TOKEN_CLAIMS=True)
+    def test_trusted_claims_skip_user_lookup(self):
+        """
+        Ensure that with trusted claims the admin check is answered from the token alone.
+        """
+        self.assertEqual(self.user_queries(), [])
+
+
+class LoginProtectionTests(UserTestsSetUp):
+    def setUp(self):
+        super().setUp()
+        self.client.post(reverse('register'), self.user_data)
+
+    def test_repeated_failed_logins_are_rate_limited_per_email(self):
+        """
+        Ensure login attempts for one email are rejected with 429 once its bucket is empty.
+        """
+        wrong = {"email": self.login_data['email'], "password": "wrong-password"}
+        for _ in range(10):
+            self.assertEqual(self.client.post(reverse('login'), wrong).status_code, status.HTTP_401_UNAUTHORIZED)
+
+        response = self.client.post(reverse('login'), self.login_data)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', response)
+
+    def test_saturated_hashing_pool_rejects_login_fast(self):
+        """
+        Ensure logins are answered with 429 instead of queueing when the hashing pool is full.
+        """
+        exhausted = threading.BoundedSemaphore(1)
+        exhausted.acquire()
+        with mock.patch('users.hashing._slots', exhausted):
+            response = self.client.post(reverse('login'), self.login_data)
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_slow_password_check_is_rejected_as_busy(self):
+        """
+        Ensure a login whose password check outlasts WAIT_TIMEOUT is answered with 429.
+        """
+        pending = futures.Future()
+        with mock.patch('users.hashing.WAIT_TIMEOUT', 0.01), \
+                mock.patch('users.hashing._executor.submit', return_value=pending):
+            response = self.client.post(reverse('login'), self.login_data)
+        pending.set_result((False, False))  # Frees the pool slot
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_token_bucket_falls_back_to_local_state_without_cache(self):
+        """
+        Ensure buckets keep limiting when the shared cache is unavailable.
+        """
+        bucket = TokenBucket('test', capacity=2, rate=1 / 60)
+        with mock.patch('utils.ratelimit.cache.get', side_effect=ConnectionError):
+            results = [bucket.consume('client') for _ in range(3)]
+
+        self.assertEqual(results[:2], [0, 0])
+        self.assertGreater(results[2], 0)
+
+
+class RefreshTokenBlacklistTests(UserTestsSetUp):
+    def setUp(self):
+        super().setUp()
+        self.client.post(reverse('register'), self.user_data)
+        login = self.client.post(reverse('login'), self.login_data)
+        self.refresh = login.data['data']['refresh']
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {login.data['data']['access']}")
+
+    def test_refresh_skips_blacklist_query_for_unknown_token(self):
+        """
+        Ensure refreshing a token that was never blacklisted does not look it up in the blacklist.
+        """
+        blacklist_filter.refresh()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(reverse('token_refresh'), {"refresh": self.refresh})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('access', response.data['data'])
+        # Rotation still blacklists the old token; only the lookup by JTI is skipped.
+        lookups = [query for query in context.captured_queries if query['sql'].startswith('SELECT 1 AS "a" FROM "token_blacklist_blacklistedtoken"')]
+        self.assertEqual(lookups, [])
+
+    def test_rotated_and_logged_out_tokens_are_rejected(self):
+        """
+        Ensure a refresh token cannot be reused after rotation or logout.
+        """
+        rotated = self.client.post(reverse('token_refresh'), {"refresh": self.refresh}).data['data']['refresh']
+        response = self.client.post(reverse('token_refresh'), {"refresh": self.refresh})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.assertEqual(self.client.post(reverse('logout'), {"refresh_token": rotated}).status_code, status.HTTP_205_RESET_CONTENT)
+        response = self.client.post(reverse('token_refresh'), {"refresh": rotated})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_blacklisted_token_reaches_filters_seen_mid_publish(self):
+        """
+        Ensure a JTI is only numbered once its row commits, and a process that sees
+        the number before the entry is written still ends up with the JTI.
+        """
+        other_process = BlacklistFilter()
+        other_process.refresh()
+        generation = get_version(GENERATION_KEY)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.client.post(reverse('logout'), {"refresh_token": self.refresh})
+        self.assertEqual(get_version(GENERATION_KEY), generation)
+
+        # The other process refreshes between the counter bump and the entry write.
+        set_entry = cache.set
+        def refresh_then_set(*args, **kwargs):
+            other_process.refresh()
+            set_entry(*args, **kwargs)
+        with mock.patch('users.blacklist.cache.set', side_effect=refresh_then_set):
+            for callback in callbacks:
+                callback()
+
+        self.assertEqual(get_version(GENERATION_KEY), generation + 1)
+        jti = BlacklistedToken.objects.get().token.jti
+        self.assertTrue(other_process.might_contain(jti))
+
+    def test_bloom_filter_has_no_false_negatives(self):
+        """
+        Ensure every added item is reported as present.
+        """
+        bloom = BloomFilter(1000)
+        items = [f'jti-{i}' for i in range(1000)]
+        for item in items:
+            bloom.add(item)
+        self.assertTrue(all(item in bloom for item in items))
+        self.assertLess(sum(f'other-{i}' in bloom for i in range(1000)), 20)
+
+    def test_purge_removes_expired_tokens_only(self):
+        """
+        Ensure the purge deletes expired tokens and their blacklist entries and keeps live ones.
+        """
+        self.client.post(reverse('logout'), {"refresh_token": self.refresh})
+        OutstandingToken.objects.update(expires_at=timezone.now() - timedelta(days=1))
+        self.client.post(reverse('login'), self.login_data)
 
+        call_command('purge_expired_tokens', batch_size=1, pause=0, stdout=mock.MagicMock())
 
+        self.assertEqual(OutstandingToken.objects.count(), 1)
+        self.assertFalse(BlacklistedToken.objects.exists())
@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import UserRegistrationView, UserLoginView, AdminRegistrationView, PasswordResetRequestView, PasswordResetView, LogoutView
+from .views import UserRegistrationView, UserLoginView, AdminRegistrationView, PasswordResetRequestView, PasswordResetView, LogoutView, TokenRefreshView
 
 urlpatterns = [
     path('register/', UserRegistrationView.as_view(), name='register'),
@@ -8,4 +8,5 @@ urlpatterns = [
     path('password-reset/request/', PasswordResetRequestView.as_view(), name='password_reset_request'),
     path('password-reset/verify/', PasswordResetView.as_view(), name='password_reset_verify'),
     path('logout/', LogoutView.as_view(), name='logout'),
+    path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
 ]
@@ -3,9 +3,35 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.contrib.auth import authenticate
 from rest_framework.permissions import AllowAny
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.exceptions import TokenError
+
+from utils.ratelimit import TokenBucket, check_limits
+from .authentication import tokens_for_user
+from .hashing import HashingBusy
+from .serializers import UserRegistrationSerializer, UserLoginSerializer, LogoutSerializer, AdminCreationSerializer, PasswordResetRequestSerializer, PasswordResetSerializer, TokenRefreshSerializer
+
+LOGIN_PER_IP = TokenBucket('login-ip', capacity=30, rate=30 / 60)
+LOGIN_PER_EMAIL = TokenBucket('login-email', capacity=10, rate=10 / 600)
+RESET_PER_IP = TokenBucket('password-reset-ip', capacity=10, rate=10 / 600)
+RESET_PER_EMAIL = TokenBucket('password-reset-email', capacity=3, rate=3 / 900)
+
+
+def too_many_requests(retry_after, message):
+    response = Response({
+        'success': False,
+        'status': status.HTTP_429_TOO_MANY_REQUESTS,
+        'error': 'Too many requests.',
+        'message': message,
+        'data': None
+    }, status=status.HTTP_429_TOO_MANY_REQUESTS)
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+def normalized_email(request):
+    email = request.data.get('email')
+    return email.strip().lower() if isinstance(email, str) and email.strip() else None
 
-from .serializers import UserRegistrationSerializer, UserLoginSerializer, LogoutSerializer, AdminCreationSerializer, PasswordResetRequestSerializer, PasswordResetSerializer
 
 class UserRegistrationView(APIView):
     """
@@ -13,6 +39,7 @@ class UserRegistrationView(APIView):
     Accepts user data (email, first_name, last_name, password) and creates a new user.
     """
     permission_classes = [AllowAny]
+    query_budget = 2
     def post(self, request):
         """
         Handle the POST request for user registration.
@@ -43,6 +70,7 @@ class AdminRegistrationView(APIView):
     Accepts admin data (email, first_name, last_name, password) and creates an admin user.
     """
     permission_classes = [AllowAny]
+    query_budget = 2
     def post(self, request):
         """
         Handle the POST request for admin registration.
@@ -74,16 +102,27 @@ class UserLoginView(APIView):
     Authenticates a user with their email and password and returns JWT tokens on success.
     """
     permission_classes = [AllowAny]
+    query_budget = 2
     def post(self, request):
         """
         Handle the POST request for user login.
         Authenticates the user, issues JWT tokens, and returns a success response.
+        Attempts are rate limited per client IP and per email address.
         """
+        retry_after = check_limits([
+            (LOGIN_PER_IP, request.META.get('REMOTE_ADDR')), (LOGIN_PER_EMAIL, normalized_email(request)),
+        ])
+        if retry_after:
+            return too_many_requests(retry_after, 'Too many login attempts, please try again later.')
+
         serializer = UserLoginSerializer(data=request.data)
         if serializer.is_valid():
-            user = authenticate(email=serializer.validated_data['email'], password=serializer.validated_data['password'])
+            try:
+                user = authenticate(email=serializer.validated_data['email'], password=serializer.validated_data['password'])
+            except HashingBusy:
+                return too_many_requests(1, 'The server is busy, please try again shortly.')
             if user is not None:
-                refresh = RefreshToken.for_user(user)
+                refresh = tokens_for_user(user)
                 return Response({
                     'success': True,
                     'status': status.HTTP_200_OK,
@@ -116,10 +155,18 @@ class PasswordResetRequestView(APIView):
     API view for requesting a password reset (sends OTP to the user's email).
     """
     permission_classes = [AllowAny]
+    query_budget = 1
     def post(self, request):
         """
         Handle POST request for password reset. Validate email, generate OTP, and send it via email.
+        Requests are rate limited per client IP and per email address.
         """
+        retry_after = check_limits([
+            (RESET_PER_IP, request.META.get('REMOTE_ADDR')), (RESET_PER_EMAIL, normalized_email(request)),
+        ])
+        if retry_after:
+            return too_many_requests(retry_after, 'Too many password reset requests, please try again later.')
+
         serializer = PasswordResetRequestSerializer(data=request.data)
         if serializer.is_valid():
             data = serializer.save()
@@ -144,6 +191,7 @@ class PasswordResetView(APIView):
     API view for verifying the OTP and resetting the password.
     """
     permission_classes = [AllowAny]
+    query_budget = 2
     def post(self, request):
         """
         Handle POST request to verify OTP and reset the user's password.
@@ -171,6 +219,7 @@ class LogoutView(APIView):
     """
     API view to handle user logout by blacklisting the refresh token.
     """
+    query_budget = 9
     def post(self, request):
         """
         Handle POST request to blacklist the user's refresh token.
@@ -191,4 +240,45 @@ class LogoutView(APIView):
             'error': serializer.errors,
             'message': 'Logout failed.',
             'data': None
-        }, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+
+class TokenRefreshView(APIView):
+    """
+    API view to exchange a refresh token for a new access token.
+    The refresh token is rotated and the old one blacklisted.
+    """
+    permission_classes = [AllowAny]
+    authentication_classes = []
+    query_budget = 14
+
+    def post(self, request):
+        """
+        Handle POST request with a refresh token and return the new tokens.
+        """
+        serializer = TokenRefreshSerializer(data=request.data)
+        try:
+            valid = serializer.is_valid()
+        except TokenError:
+            return Response({
+                'success': False,
+                'status': status.HTTP_401_UNAUTHORIZED,
+                'error': 'Token is invalid or expired!',
+                'message': 'Token refresh failed.',
+                'data': None
+            }, status=status.HTTP_401_UNAUTHORIZED)
+        if valid:
+            return Response({
+                'success': True,
+                'status': status.HTTP_200_OK,
+                'error': None,
+                'message': 'Token refreshed successfully.',
+                'data': serializer.validated_data
+            }, status=status.HTTP_200_OK)
+        return Response({
+            'success': False,
+            'status': status.HTTP_400_BAD_REQUEST,
+            'error': serializer.errors,
+            'message': 'Token refresh failed.',
+            'data': None
+        }, status=status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,53 @@
+import hashlib
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+
+def make_etag(*parts):
+    """
+    Build a quoted ETag from the given validator parts (ids, timestamps, counters).
+    """
+    digest = hashlib.md5(
+        '|'.join(str(part) for part in parts).encode(), usedforsecurity=False
+    ).hexdigest()
+    return quote_etag(digest)
+
+
+class ConditionalGetMixin:
+    """
+    Mixin for read views that answers GET requests with 304 Not Modified
+    when the client's ETag or Last-Modified validators still match.
+
+    Views override ``get_validators`` to return an ``(etag, last_modified)`` pair
+    computed from cheap columns such as ``updated_at``, so unchanged resources
+    are never serialized.
+    """
+
+    def get_validators(self, request, *args, **kwargs):
+        """
+        Return an ``(etag, last_modified)`` pair for the requested resource.
+        Either value may be None.
+        """
+        return None, None
+
+    def get(self, request, *args, **kwargs):
+        etag, last_modified = self.get_validators(request, *args, **kwargs)
+        last_modified_ts = int(last_modified.timestamp()) if last_modified else None
+
+        response = None
+        if etag or last_modified_ts:
+            response = get_conditional_response(
+                request, etag=etag, last_modified=last_modified_ts
+            )
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+
+        if etag:
+            response.headers.setdefault('ETag', etag)
+        if last_modified_ts:
+            response.headers.setdefault('Last-Modified', http_date(last_modified_ts))
+        # Validators depend on who is asking, so shared caches must not mix users.
+        patch_vary_headers(response, ['Authorization'])
+        return response
@@ -1,5 +1,6 @@
 from opencage.geocoder import OpenCageGeocode
 from django.conf import settings
+from . import metrics
 
 def get_lat_lng_from_address(address):
     """
@@ -8,7 +9,8 @@ def get_lat_lng_from_address(address):
     key = settings.OPENCAGE_API_KEY
     geocoder = OpenCageGeocode(key)
 
-    result = geocoder.geocode(address)
+    with metrics.timer('geocoder.seconds'):
+        result = geocoder.geocode(address)
     
     if result and len(result):
         return result[0]['geometry']['lat'], result[0]['geometry']['lng']
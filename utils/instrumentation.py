@@ -0,0 +1,75 @@
+"""
+Per-request performance instrumentation.
+
+RequestMetricsMiddleware times every request and counts its SQL queries and
+their time through a database execute wrapper. Per endpoint (the URL name, so
+the label values stay few) it records histograms of the latency, the query
+count and the database time, and it reports the request's breakdown in a
+Server-Timing header, e.g.::
+
+    Server-Timing: db;dur=3.1;desc="4 queries", geocoder;dur=120.4, total;dur=131.9
+
+Geocoding (utils/coordinates.py) and task publishing (fooddelivery/celery.py)
+record their own histograms, which show up in the header as well. Queries run
+while a streaming response is consumed fall outside the request's numbers.
+
+``metrics_view`` serves every metric in the Prometheus text format, to the
+addresses in ``settings.METRICS_ALLOWED_IPS`` only.
+"""
+import time
+from django.conf import settings
+from django.db import connection
+from django.http import HttpResponse, HttpResponseForbidden
+from . import metrics
+
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+
+class QueryTimer:
+    """
+    Database execute wrapper counting the queries it sees and their time.
+    """
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - started
+
+
+def _server_timing(timings, queries, total):
+    entries = [f'db;dur={queries.seconds * 1000:.1f};desc="{queries.count} queries"']
+    entries += [f'{name.split(".")[0]};dur={seconds * 1000:.1f}' for name, seconds in sorted(timings.items())]
+    entries.append(f'total;dur={total * 1000:.1f}')
+    return ', '.join(entries)
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = QueryTimer()
+        started = time.perf_counter()
+        with metrics.collect_timings() as timings, connection.execute_wrapper(queries):
+            response = self.get_response(request)
+        total = time.perf_counter() - started
+
+        match = request.resolver_match
+        labels = {'endpoint': match.view_name if match else 'unmatched', 'method': request.method}
+        metrics.observe('http.request_seconds', total, **labels)
+        metrics.observe('http.request_queries', queries.count, buckets=QUERY_BUCKETS, **labels)
+        metrics.observe('http.request_db_seconds', queries.seconds, **labels)
+        response['Server-Timing'] = _server_timing(timings, queries, total)
+        return response
+
+
+def metrics_view(request):
+    if request.META.get('REMOTE_ADDR') not in settings.METRICS_ALLOWED_IPS:
+        return HttpResponseForbidden()
+    return HttpResponse(metrics.render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,131 @@
+"""
+Process-local metrics: counters for cheap operational events (cache hits,
+misses, ...) and histograms of latencies and sizes, exported in the Prometheus
+text format (see utils/instrumentation.py).
+
+Every process keeps its own metrics, so with several workers each one is
+scraped (or aggregated) separately. Values observed while a request collects
+timings (see ``collect_timings``) are also summed per request, for its
+Server-Timing header.
+"""
+import bisect
+import contextvars
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+PREFIX = 'fooddelivery_'
+# Upper bounds of the histogram buckets; seconds unless a histogram is given its own.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+_counters = Counter()
+_histograms = {}
+_lock = threading.Lock()
+_timings = contextvars.ContextVar('metrics_timings', default=None)
+
+
+def increment(name, amount=1):
+    with _lock:
+        _counters[name] += amount
+
+
+def get_counters(prefix=''):
+    """
+    Return a snapshot of the counters whose name starts with ``prefix``.
+    """
+    with _lock:
+        return {name: value for name, value in _counters.items() if name.startswith(prefix)}
+
+
+def observe(name, value, buckets=LATENCY_BUCKETS, **labels):
+    """
+    Record ``value`` in the histogram ``name`` for the given labels.
+    """
+    key = (name, tuple(sorted(labels.items())))
+    index = bisect.bisect_left(buckets, value)
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = {'buckets': buckets, 'counts': [0] * (len(buckets) + 1), 'sum': 0}
+        histogram['counts'][index] += 1
+        histogram['sum'] += value
+    timings = _timings.get()
+    if timings is not None:
+        timings[name] += value
+
+
+@contextmanager
+def timer(name, **labels):
+    """
+    Observe the seconds spent in the block in the histogram ``name``.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - started, **labels)
+
+
+@contextmanager
+def collect_timings():
+    """
+    Sum the values observed in the block (in this thread or task) per histogram
+    name, into the Counter it yields.
+    """
+    timings = Counter()
+    token = _timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _timings.reset(token)
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+def _metric_name(name):
+    return PREFIX + name.replace('.', '_')
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _labels(pairs):
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{label}="{_escape(value)}"' for label, value in pairs) + '}'
+
+
+def render_prometheus():
+    """
+    Return every counter and histogram in the Prometheus text exposition format.
+    """
+    with _lock:
+        counters = sorted(_counters.items())
+        histograms = sorted(
+            (key, {**histogram, 'counts': list(histogram['counts'])}) for key, histogram in _histograms.items()
+        )
+
+    lines = []
+    for name, value in counters:
+        metric = _metric_name(name) + '_total'
+        lines += [f'# TYPE {metric} counter', f'{metric} {value}']
+
+    declared = set()
+    for (name, labels), histogram in histograms:
+        metric = _metric_name(name)
+        if metric not in declared:
+            declared.add(metric)
+            lines.append(f'# TYPE {metric} histogram')
+        cumulative = 0
+        for bound, count in zip(list(histogram['buckets']) + ['+Inf'], histogram['counts']):
+            cumulative += count
+            lines.append(f'{metric}_bucket{_labels(labels + (("le", bound),))} {cumulative}')
+        lines.append(f'{metric}_sum{_labels(labels)} {histogram["sum"]}')
+        lines.append(f'{metric}_count{_labels(labels)} {cumulative}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,19 @@
+"""
+Per-view SQL query budgets.
+
+Views declare ``query_budget`` next to their permissions and serializers: the
+most queries one request may run with cold caches, either as an int or as a
+dict keyed by HTTP method. fooddelivery/tests.py calls every API endpoint at two
+dataset sizes and fails when a request exceeds its view's budget or when its
+query count grows with the size of the result.
+"""
+
+
+def get_query_budget(view_class, method):
+    """
+    Return the budget ``view_class`` declares for ``method``, or None.
+    """
+    budget = getattr(view_class, 'query_budget', None)
+    if isinstance(budget, dict):
+        return budget.get(method.upper())
+    return budget
@@ -0,0 +1,76 @@
+"""
+Token-bucket rate limiting kept in the shared cache.
+
+Each bucket holds up to ``capacity`` tokens and regains ``rate`` tokens per
+second; a request spends one token or is rejected with the time until the next
+token is available. State lives in the shared cache so that all processes count
+together. The read-modify-write is not atomic, so concurrent requests may now and
+then slip through one extra token. When the cache is unreachable, every process
+falls back to its own in-memory buckets rather than failing open.
+"""
+import logging
+import math
+import threading
+import time
+from django.core.cache import cache
+from .ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    def __init__(self, name, capacity, rate):
+        self.name = name
+        self.capacity = capacity
+        self.rate = rate
+        # Time for an empty bucket to refill; idle buckets can be forgotten after it.
+        self.ttl = math.ceil(capacity / rate)
+        self._local = TTLCache(maxsize=10000, ttl=self.ttl)
+        self._local_lock = threading.Lock()
+
+    def _refill(self, state, now):
+        if state is None:
+            return float(self.capacity)
+        tokens, updated_at = state
+        return min(float(self.capacity), tokens + (now - updated_at) * self.rate)
+
+    def _spend(self, tokens, now):
+        """
+        Return ``(new state, retry_after)``; retry_after is 0 when a token was spent.
+        """
+        if tokens >= 1:
+            return (tokens - 1, now), 0
+        return (tokens, now), math.ceil((1 - tokens) / self.rate)
+
+    def consume(self, key):
+        """
+        Spend a token for ``key``. Returns 0 when allowed, otherwise the number of
+        seconds to wait before retrying.
+        """
+        cache_key = f'ratelimit:{self.name}:{key}'
+        now = time.time()
+        try:
+            state, retry_after = self._spend(self._refill(cache.get(cache_key), now), now)
+            cache.set(cache_key, state, self.ttl)
+        except Exception:
+            logger.warning('Rate limit cache unavailable, using local buckets', exc_info=True)
+            with self._local_lock:
+                state, retry_after = self._spend(self._refill(self._local.get(cache_key), now), now)
+                self._local.set(cache_key, state)
+        return retry_after
+
+    def reset(self, key):
+        cache_key = f'ratelimit:{self.name}:{key}'
+        self._local.delete(cache_key)
+        try:
+            cache.delete(cache_key)
+        except Exception:
+            pass
+
+
+def check_limits(limits):
+    """
+    Spend a token from every ``(bucket, key)`` pair (keys that are None are
+    skipped) and return the longest wait among the rejecting buckets, or 0.
+    """
+    return max((bucket.consume(key) for bucket, key in limits if key is not None), default=0)
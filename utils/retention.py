@@ -0,0 +1,55 @@
+"""
+Batched retention jobs: delete (or reset) expired rows a bounded batch at a time.
+
+Each batch is a single statement on the primary key, such as
+``DELETE ... WHERE id IN (SELECT id ... ORDER BY id LIMIT n)``, run in its own
+transaction, with a short pause between batches so that a large backlog never
+holds long locks or starves other queries.
+"""
+import logging
+import time
+from django.db.models import Subquery
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_PAUSE = 0.1
+
+
+def _batch(queryset, batch_size):
+    return Subquery(queryset.order_by('pk').values('pk')[:batch_size])
+
+
+def purge(queryset, batch_size=DEFAULT_BATCH_SIZE, pause=DEFAULT_PAUSE):
+    """
+    Delete the rows of ``queryset`` in batches. Returns the number of rows
+    deleted from the queryset's table (cascaded rows are not counted).
+    """
+    model = queryset.model
+    purged = 0
+    while True:
+        _, deleted = model._base_manager.filter(pk__in=_batch(queryset, batch_size)).delete()
+        count = deleted.get(model._meta.label, 0)
+        purged += count
+        if count < batch_size:
+            break
+        time.sleep(pause)
+    logger.info('Purged %s %s rows', purged, model._meta.label)
+    return purged
+
+
+def update(queryset, values, batch_size=DEFAULT_BATCH_SIZE, pause=DEFAULT_PAUSE):
+    """
+    Apply ``values`` to the rows of ``queryset`` in batches. The queryset must no
+    longer match a row once it is updated. Returns the number of rows updated.
+    """
+    model = queryset.model
+    updated = 0
+    while True:
+        count = model._base_manager.filter(pk__in=_batch(queryset, batch_size)).update(**values)
+        updated += count
+        if count < batch_size:
+            break
+        time.sleep(pause)
+    logger.info('Updated %s %s rows', updated, model._meta.label)
+    return updated
@@ -0,0 +1,21 @@
+import unicodedata
+
+# Letters without a Unicode decomposition, spelled the way they are usually transliterated.
+_TRANSLITERATIONS = str.maketrans({
+    'đ': 'dj', 'Đ': 'Dj',
+    'ł': 'l', 'Ł': 'L',
+    'ø': 'o', 'Ø': 'O',
+    'ß': 'ss',
+    'æ': 'ae', 'Æ': 'Ae',
+})
+
+
+def normalize_search_text(value):
+    """
+    Lowercase and strip accents so that e.g. "Karađorđeva šnicla" and
+    "Karadjordjeva snicla" normalize to the same text.
+    """
+    if not value:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', value.translate(_TRANSLITERATIONS))
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).lower()
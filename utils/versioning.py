@@ -0,0 +1,34 @@
+"""
+Version counters kept in the shared cache, used to invalidate derived data
+(cached pages, in-process indexes) with a single increment.
+"""
+import time
+from django.core.cache import cache
+from django.db import transaction
+
+
+def get_version(key):
+    version = cache.get(key)
+    if version is None:
+        # Start from the clock so that a lost counter never reuses an old version.
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(key):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), timeout=None)
+        return cache.get(key)
+
+
+def bump_version_on_change(key):
+    """
+    Bump ``key`` now and again once the current transaction commits: data derived
+    from the previous state before the commit would otherwise be stored under
+    the new version.
+    """
+    bump_version(key)
+    transaction.on_commit(lambda: bump_version(key))